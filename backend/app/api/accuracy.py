@@ -1,8 +1,10 @@
 """Prediction accuracy dashboard API endpoints"""
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, desc
+from sqlalchemy import func, and_, desc, Integer, Float
 from app.database import get_db
+from app.services.cache import ACCURACY_DASHBOARD_TTL
+from app.services.http_cache import cached_json_response, is_not_modified, make_etag, not_modified_response
 from app.models.prediction_validation import PredictionValidation, ModelAccuracy
 from app.models.prediction import Prediction
 from datetime import datetime, date, timedelta
@@ -175,14 +177,26 @@ def get_accuracy_time_series(
 
 @router.get("/dashboard", response_model=AccuracyDashboardResponse)
 def get_accuracy_dashboard(
+    request: Request,
     days: int = Query(30, ge=7, le=365),
     db: Session = Depends(get_db)
 ):
-    """Get complete accuracy dashboard data"""
+    """Get complete accuracy dashboard data (ETag revalidation, 1 hour Cache-Control)"""
+
+    # Data version: the validations in the window only grow, so count and newest id identify it
+    cutoff_date = date.today() - timedelta(days=days)
+    count, newest_id = (
+        db.query(func.count(PredictionValidation.id), func.max(PredictionValidation.id))
+        .filter(PredictionValidation.validation_date >= cutoff_date)
+        .one()
+    )
+    etag = make_etag("accuracy_dashboard", days, cutoff_date, count, newest_id)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, ACCURACY_DASHBOARD_TTL)
 
     overall = get_overall_accuracy(days=days, db=db)
-    by_ticker = get_accuracy_by_ticker(days=days, db=db)
-    time_series = get_accuracy_time_series(days=days, db=db)
+    by_ticker = get_accuracy_by_ticker(days=days, min_predictions=5, db=db)
+    time_series = get_accuracy_time_series(days=days, ticker=None, db=db)
 
     # Top 5 performers
     top = sorted(by_ticker, key=lambda x: x.overall_score, reverse=True)[:5]
@@ -190,13 +204,16 @@ def get_accuracy_dashboard(
     # Bottom 5 performers (but still have enough predictions)
     worst = sorted(by_ticker, key=lambda x: x.overall_score)[:5]
 
-    return AccuracyDashboardResponse(
+    dashboard = AccuracyDashboardResponse(
         overall_metrics=overall,
         by_ticker=by_ticker,
         time_series=time_series,
         top_performers=top,
         worst_performers=worst
     )
+    return cached_json_response(
+        request, dashboard.model_dump(mode="json"), max_age=ACCURACY_DASHBOARD_TTL, etag=etag
+    )
 
 
 @router.get("/ticker/{ticker}", response_model=TickerAccuracy)
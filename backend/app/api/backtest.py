@@ -1,24 +1,45 @@
 """Backtesting API endpoints"""
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from datetime import date, datetime, timedelta
 from pydantic import BaseModel
+import asyncio
 import json
-
-from app.database import get_db
-from app.models.backtest import BacktestStrategy, BacktestRun
-from app.services.backtest_engine import BacktestEngine
+import numpy as np
+
+from app.database import SessionLocal, get_db
+from app.models.backtest import BacktestStrategy, BacktestRun, BacktestSweep
+from app.services.backtest_core import bootstrap_metrics, daily_returns, drawdown_series, sharpe_ratio
+from app.services.backtest_engine import BacktestEngine, load_equity_series
+from app.services.backtest_jobs import (
+    FINISHED_STATUSES, backtest_progress, submit_backtest, submit_backtests,
+)
+from app.services.backtest_sweep import BacktestSweepService
+from app.services.cache import BACKTEST_RESULT_TTL
+from app.services.http_cache import cached_json_response, is_not_modified, make_etag, not_modified_response
+from app.services.pagination import PaginationError, estimate_count, isoformat, keyset_page, page_headers, parse_fields
+from app.services.portfolio_backtest import PortfolioBacktestService
+from app.services.strategy_dsl import StrategyExpressionError, validate_expression_parameters
+from app.services.series_storage import lttb_indices, series_to_points, slice_range
 
 router = APIRouter()
 
+# Upper bound on runs submitted by one batch request
+MAX_BATCH_RUNS = 200
+
+# How often an SSE stream checks for new progress
+SSE_POLL_SECONDS = 0.5
+
 
 # Request models
 class CreateStrategyRequest(BaseModel):
     name: str
     description: Optional[str] = None
-    strategy_type: str  # BUY_AND_HOLD, MOVING_AVERAGE, PREDICTION_BASED
-    parameters: Optional[dict] = None
+    strategy_type: str  # BUY_AND_HOLD, MOVING_AVERAGE, PREDICTION_BASED, EXPRESSION
+    parameters: Optional[dict] = None  # EXPRESSION: {"entry": "...", "exit": "...", <params>}
     initial_capital: float = 100000.0
     position_size_pct: float = 10.0
     stop_loss_pct: Optional[float] = None
@@ -32,6 +53,39 @@ class RunBacktestRequest(BaseModel):
     end_date: datetime
 
 
+class BatchBacktestRequest(BaseModel):
+    strategy_ids: List[int]
+    tickers: List[str]
+    start_date: datetime
+    end_date: datetime
+
+
+class SweepRequest(BaseModel):
+    strategy_type: str  # BUY_AND_HOLD, MOVING_AVERAGE, PREDICTION_BASED, EXPRESSION
+    tickers: List[str]
+    parameter_grid: Dict[str, List]  # e.g. {"short_window": [10, 20], "long_window": [50, 100]}
+    base_parameters: Optional[dict] = None  # fixed values, e.g. {"entry": "sma(close, fast) > sma(close, slow)"}
+    start_date: datetime
+    end_date: datetime
+    initial_capital: float = 100000.0
+    position_size_pct: float = 100.0
+    rank_by: str = "sharpe_ratio"
+
+
+class PortfolioBacktestRequest(BaseModel):
+    # Exactly one weight source: explicit weights, a portfolio's holdings or a rebalance proposal
+    weights: Optional[Dict[str, float]] = None
+    portfolio_id: Optional[int] = None
+    proposal_id: Optional[int] = None
+    start_date: datetime
+    end_date: datetime
+    rebalance: str = "monthly"  # none, daily, weekly, monthly, quarterly, annually, threshold
+    threshold_pct: float = 5.0
+    initial_capital: float = 100000.0
+    transaction_cost_bps: float = 0.0
+    base_currency: str = "USD"
+
+
 # Response models
 class StrategyResponse(BaseModel):
     id: int
@@ -125,7 +179,12 @@ class BacktestDetailResponse(BaseModel):
         from_attributes = True
 
     @classmethod
-    def from_orm(cls, run: BacktestRun):
+    def from_orm(cls, run: BacktestRun, max_points: Optional[int] = None):
+        days, values = load_equity_series(run)
+        if max_points:
+            keep = lttb_indices(values, max_points)
+            days, values = days[keep], values[keep]
+
         data = {
             'id': run.id,
             'strategy_id': run.strategy_id,
@@ -146,7 +205,7 @@ class BacktestDetailResponse(BaseModel):
             'benchmark_return': run.benchmark_return,
             'alpha': run.alpha,
             'trades': json.loads(run.trades) if run.trades else [],
-            'equity_curve': json.loads(run.equity_curve) if run.equity_curve else [],
+            'equity_curve': series_to_points(days, values),
             'status': run.status
         }
         return cls(**data)
@@ -160,6 +219,8 @@ def create_strategy(
 ):
     """Create a new backtesting strategy"""
 
+    _validate_strategy_parameters(request)
+
     strategy = BacktestStrategy(
         name=request.name,
         description=request.description,
@@ -227,6 +288,8 @@ def update_strategy(
     if not strategy:
         raise HTTPException(status_code=404, detail="Strategy not found")
 
+    _validate_strategy_parameters(request)
+
     strategy.name = request.name
     strategy.description = request.description
     strategy.strategy_type = request.strategy_type
@@ -268,7 +331,12 @@ def run_backtest(
     request: RunBacktestRequest,
     db: Session = Depends(get_db)
 ):
-    """Execute a backtest"""
+    """
+    Submit a backtest job
+
+    Returns immediately with the queued run; follow it via
+    /backtest/runs/{run_id}/status or /backtest/runs/{run_id}/events.
+    """
 
     # Validate strategy exists
     strategy = db.query(BacktestStrategy).filter(
@@ -278,39 +346,297 @@ def run_backtest(
     if not strategy:
         raise HTTPException(status_code=404, detail="Strategy not found")
 
-    # Validate date range
-    if request.start_date >= request.end_date:
-        raise HTTPException(status_code=400, detail="Start date must be before end date")
-
-    if request.end_date > datetime.utcnow():
-        raise HTTPException(status_code=400, detail="End date cannot be in the future")
+    _validate_date_range(request.start_date, request.end_date)
 
-    # Run backtest
-    engine = BacktestEngine(db)
-    result = engine.run_backtest(
+    run = BacktestEngine(db).create_run(
         strategy_id=request.strategy_id,
         ticker=request.ticker,
         start_date=request.start_date,
         end_date=request.end_date
     )
+    submit_backtest(run.id)
 
-    if not result:
+    return BacktestResultResponse.model_validate(run)
+
+
+@router.post("/backtest/run-batch", response_model=List[BacktestResultResponse])
+def run_backtest_batch(
+    request: BatchBacktestRequest,
+    db: Session = Depends(get_db)
+):
+    """Submit one job per (strategy, ticker) pair on the shared worker pool"""
+
+    if not request.strategy_ids or not request.tickers:
+        raise HTTPException(status_code=400, detail="At least one strategy and one ticker are required")
+
+    total = len(request.strategy_ids) * len(request.tickers)
+    if total > MAX_BATCH_RUNS:
+        raise HTTPException(status_code=400, detail=f"Batch too large: {total} runs (max {MAX_BATCH_RUNS})")
+
+    found = {
+        s.id for s in db.query(BacktestStrategy.id).filter(
+            BacktestStrategy.id.in_(request.strategy_ids)
+        ).all()
+    }
+    missing = [sid for sid in request.strategy_ids if sid not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Strategies not found: {missing}")
+
+    _validate_date_range(request.start_date, request.end_date)
+
+    engine = BacktestEngine(db)
+    runs = [
+        engine.create_run(
+            strategy_id=strategy_id,
+            ticker=ticker,
+            start_date=request.start_date,
+            end_date=request.end_date
+        )
+        for strategy_id in request.strategy_ids
+        for ticker in request.tickers
+    ]
+    submit_backtests([run.id for run in runs])
+
+    return [BacktestResultResponse.model_validate(run) for run in runs]
+
+
+@router.get("/backtest/runs/{run_id}/status")
+def get_backtest_status(
+    run_id: int,
+    db: Session = Depends(get_db)
+):
+    """Current status and progress of a backtest run"""
+
+    status = _run_status(db, run_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Backtest result not found")
+
+    return status
+
+
+@router.get("/backtest/runs/{run_id}/events")
+async def stream_backtest_events(run_id: int):
+    """
+    Server-Sent Events stream of a run's progress
+
+    Emits a ``progress`` event whenever the snapshot changes and a final
+    ``completed`` or ``failed`` event, then closes.
+    """
+
+    db = SessionLocal()
+    try:
+        initial = await run_in_threadpool(_run_status, db, run_id)
+    finally:
+        db.close()
+
+    if initial is None:
+        raise HTTPException(status_code=404, detail="Backtest result not found")
+
+    async def event_stream():
+        last = None
+        status = initial
+        while True:
+            payload = json.dumps(status, default=str)
+            if payload != last:
+                event = status['status'] if status['status'] in FINISHED_STATUSES else 'progress'
+                yield f"event: {event}\ndata: {payload}\n\n"
+                last = payload
+            if status['status'] in FINISHED_STATUSES:
+                break
+
+            await asyncio.sleep(SSE_POLL_SECONDS)
+            progress = backtest_progress.get(run_id)
+            if progress is None or progress['status'] in FINISHED_STATUSES:
+                # Final metrics and error messages live in the database
+                db = SessionLocal()
+                try:
+                    status = await run_in_threadpool(_run_status, db, run_id)
+                finally:
+                    db.close()
+            else:
+                status = progress
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _validate_strategy_parameters(request: CreateStrategyRequest):
+    """Reject EXPRESSION strategies whose expressions do not compile"""
+    if request.strategy_type != "EXPRESSION":
+        return
+    try:
+        validate_expression_parameters(request.parameters or {})
+    except StrategyExpressionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _validate_date_range(start_date: datetime, end_date: datetime):
+    """Reject inverted or future backtest windows"""
+    if start_date >= end_date:
+        raise HTTPException(status_code=400, detail="Start date must be before end date")
+
+    if end_date > datetime.utcnow():
+        raise HTTPException(status_code=400, detail="End date cannot be in the future")
+
+
+def _run_status(db: Session, run_id: int) -> Optional[Dict]:
+    """Progress snapshot merged with the persisted run state"""
+    run = db.query(BacktestRun).filter(BacktestRun.id == run_id).first()
+    if not run:
+        return None
+
+    status = {
+        'run_id': run.id,
+        'status': run.status,
+        'stage': run.status,
+        'bars_processed': None,
+        'total_bars': None,
+        'current_equity': None,
+    }
+
+    progress = backtest_progress.get(run_id)
+    if progress:
+        status.update(progress)
+        status['status'] = run.status if run.status in FINISHED_STATUSES else progress['status']
+
+    if run.status in FINISHED_STATUSES:
+        status.update({
+            'stage': run.status,
+            'current_equity': run.final_capital,
+            'total_return': run.total_return,
+            'error_message': run.error_message,
+            'completed_at': run.completed_at.isoformat() if run.completed_at else None,
+        })
+        backtest_progress.discard(run_id)
+
+    return status
+
+
+@router.post("/backtest/sweep")
+def run_parameter_sweep(
+    request: SweepRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Run a parameter grid over one or more tickers
+
+    Each ticker's history is loaded once and grid cells are evaluated in a
+    process pool. Returns a ranked results table plus a heatmap matrix; only
+    a summary is persisted.
+    """
+
+    _validate_date_range(request.start_date, request.end_date)
+
+    service = BacktestSweepService(db)
+    try:
+        return service.run_sweep(
+            strategy_type=request.strategy_type,
+            tickers=[t.strip().upper() for t in request.tickers if t.strip()],
+            parameter_grid=request.parameter_grid,
+            start_date=request.start_date,
+            end_date=request.end_date,
+            initial_capital=request.initial_capital,
+            position_size_pct=request.position_size_pct,
+            rank_by=request.rank_by,
+            base_parameters=request.base_parameters
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/backtest/portfolio")
+def run_portfolio_backtest(
+    request: PortfolioBacktestRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Backtest a multi-asset portfolio with periodic rebalancing
+
+    Weights come from the request, a portfolio's current holdings, or the
+    target weights of a rebalancing proposal. All series are downloaded in
+    one batch and aligned into a single FX-converted price matrix.
+    """
+
+    _validate_date_range(request.start_date, request.end_date)
+
+    service = PortfolioBacktestService(db)
+
+    if request.weights:
+        weights = request.weights
+    elif request.proposal_id:
+        weights = service.proposal_weights(request.proposal_id)
+        if weights is None:
+            raise HTTPException(status_code=404, detail="Rebalance proposal not found")
+    elif request.portfolio_id:
+        weights = service.holdings_weights(request.portfolio_id)
+    else:
         raise HTTPException(
-            status_code=500,
-            detail="Backtest execution failed. Check if historical data is available for this ticker."
+            status_code=400,
+            detail="Provide one of weights, portfolio_id or proposal_id"
         )
 
-    return BacktestResultResponse.from_attributes(result)
+    try:
+        return service.run_portfolio_backtest(
+            weights=weights,
+            start_date=request.start_date,
+            end_date=request.end_date,
+            rebalance=request.rebalance,
+            threshold_pct=request.threshold_pct,
+            initial_capital=request.initial_capital,
+            transaction_cost_bps=request.transaction_cost_bps,
+            base_currency=request.base_currency.upper()
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/backtest/sweeps/{sweep_id}")
+def get_sweep_summary(
+    sweep_id: int,
+    db: Session = Depends(get_db)
+):
+    """Get a persisted parameter sweep summary"""
+
+    sweep = db.query(BacktestSweep).filter(BacktestSweep.id == sweep_id).first()
+
+    if not sweep:
+        raise HTTPException(status_code=404, detail="Sweep not found")
+
+    summary = json.loads(sweep.summary) if sweep.summary else {}
+
+    return {
+        "sweep_id": sweep.id,
+        "strategy_type": sweep.strategy_type,
+        "tickers": json.loads(sweep.tickers),
+        "parameter_grid": json.loads(sweep.parameter_grid),
+        "base_parameters": summary.get("base_parameters"),
+        "start_date": sweep.start_date,
+        "end_date": sweep.end_date,
+        "rank_by": sweep.rank_by,
+        "total_runs": sweep.total_runs,
+        "best_ticker": sweep.best_ticker,
+        "best_parameters": json.loads(sweep.best_parameters) if sweep.best_parameters else None,
+        "best_sharpe_ratio": sweep.best_sharpe_ratio,
+        "best_total_return": sweep.best_total_return,
+        "top_results": summary.get("top_results", []),
+        "heatmap": summary.get("heatmap"),
+        "created_at": sweep.created_at
+    }
 
 
 @router.get("/backtest/results", response_model=List[BacktestResultResponse])
 def list_backtest_results(
     strategy_id: Optional[int] = Query(None, description="Filter by strategy"),
     ticker: Optional[str] = Query(None, description="Filter by ticker"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
     limit: int = Query(20, ge=1, le=100, description="Number of results"),
+    fields: Optional[str] = Query(None, description="Comma separated fields to return (default: all)"),
     db: Session = Depends(get_db)
 ):
-    """List backtest results"""
+    """List backtest results, newest first (keyset pagination via X-Next-Cursor)"""
 
     query = db.query(BacktestRun)
 
@@ -320,14 +646,29 @@ def list_backtest_results(
     if ticker:
         query = query.filter(BacktestRun.ticker == ticker)
 
-    results = query.order_by(BacktestRun.created_at.desc()).limit(limit).all()
+    try:
+        selected = parse_fields(fields, list(BacktestResultResponse.model_fields))
+        results, next_cursor = keyset_page(
+            query,
+            {name: getattr(BacktestRun, name) for name in selected},
+            BacktestRun.created_at,
+            BacktestRun.id,
+            limit,
+            cursor,
+            serializers={name: isoformat for name in ("start_date", "end_date", "created_at", "completed_at")},
+        )
+    except PaginationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return [BacktestResultResponse.from_attributes(r) for r in results]
+    total = estimate_count(query, BacktestRun.id)
+    return JSONResponse(content=results, headers=page_headers(next_cursor, total))
 
 
 @router.get("/backtest/results/{run_id}", response_model=BacktestDetailResponse)
 def get_backtest_result(
     run_id: int,
+    request: Request,
+    max_points: Optional[int] = Query(None, ge=3, le=5000, description="Downsample the equity curve (LTTB)"),
     db: Session = Depends(get_db)
 ):
     """Get detailed backtest result with trades and equity curve"""
@@ -337,7 +678,130 @@ def get_backtest_result(
     if not result:
         raise HTTPException(status_code=404, detail="Backtest result not found")
 
-    return BacktestDetailResponse.from_orm(result)
+    # A completed run never changes; revalidate before loading the equity curve
+    completed = result.status == "completed"
+    max_age = BACKTEST_RESULT_TTL if completed else 0
+    etag = make_etag("backtest_result", run_id, result.status, result.completed_at, max_points)
+    if is_not_modified(request, etag, result.completed_at):
+        return not_modified_response(etag, max_age, result.completed_at)
+
+    detail = BacktestDetailResponse.from_orm(result, max_points=max_points)
+    return cached_json_response(
+        request, detail.model_dump(mode="json"), max_age=max_age,
+        etag=etag, last_modified=result.completed_at,
+    )
+
+
+@router.get("/backtest/results/{run_id}/equity-curve")
+def get_backtest_equity_curve(
+    run_id: int,
+    start_date: Optional[date] = Query(None, description="First date (inclusive)"),
+    end_date: Optional[date] = Query(None, description="Last date (inclusive)"),
+    max_points: Optional[int] = Query(None, ge=3, le=5000, description="Downsample to N points (LTTB)"),
+    db: Session = Depends(get_db)
+):
+    """Equity curve of a run, sliced by date range and downsampled for charts"""
+
+    result = db.query(BacktestRun).filter(BacktestRun.id == run_id).first()
+
+    if not result:
+        raise HTTPException(status_code=404, detail="Backtest result not found")
+
+    days, values = load_equity_series(result)
+    total_points = len(days)
+    days, values = slice_range(days, values, start_date, end_date)
+    if max_points:
+        keep = lttb_indices(values, max_points)
+        days, values = days[keep], values[keep]
+
+    return {
+        "run_id": run_id,
+        "total_points": total_points,
+        "returned_points": len(days),
+        "equity_curve": series_to_points(days, values)
+    }
+
+
+@router.get("/backtest/results/{run_id}/trades")
+def get_backtest_trades(
+    run_id: int,
+    offset: int = Query(0, ge=0, description="Number of trades to skip"),
+    limit: int = Query(50, ge=1, le=500, description="Number of trades"),
+    db: Session = Depends(get_db)
+):
+    """Paginated trades of a run"""
+
+    result = db.query(BacktestRun).filter(BacktestRun.id == run_id).first()
+
+    if not result:
+        raise HTTPException(status_code=404, detail="Backtest result not found")
+
+    trades = json.loads(result.trades) if result.trades else []
+
+    return {
+        "run_id": run_id,
+        "total": len(trades),
+        "offset": offset,
+        "limit": limit,
+        "trades": trades[offset:offset + limit]
+    }
+
+
+@router.get("/backtest/results/{run_id}/robustness")
+def get_backtest_robustness(
+    run_id: int,
+    paths: int = Query(10000, ge=100, le=50000, description="Number of bootstrap paths"),
+    block_size: Optional[float] = Query(None, ge=1, description="Mean block length in days (default n^(1/3))"),
+    confidence: float = Query(0.95, gt=0.5, lt=1.0, description="Confidence level of the intervals"),
+    seed: Optional[int] = Query(None, description="Random seed for reproducible results"),
+    db: Session = Depends(get_db)
+):
+    """
+    Stationary block bootstrap of a run's daily returns
+
+    Resamples the stored equity curve's returns and reports confidence
+    intervals for total return, Sharpe ratio and max drawdown.
+    """
+
+    result = db.query(BacktestRun).filter(BacktestRun.id == run_id).first()
+
+    if not result:
+        raise HTTPException(status_code=404, detail="Backtest result not found")
+
+    _, values = load_equity_series(result)
+    if len(values) < 3 or np.any(values <= 0):
+        raise HTTPException(status_code=400, detail="Equity curve is too short or non-positive for resampling")
+
+    returns = daily_returns(values)
+    samples = bootstrap_metrics(returns, n_paths=paths, mean_block=block_size, seed=seed)
+
+    tail = (1 - confidence) / 2 * 100
+    observed = {
+        'total_return': (values[-1] / values[0] - 1) * 100,
+        'sharpe_ratio': sharpe_ratio(returns),
+        'max_drawdown': float(np.max(drawdown_series(values))),
+    }
+
+    metrics = {}
+    for name, sample in samples.items():
+        low, median, high = np.percentile(sample, [tail, 50, 100 - tail])
+        metrics[name] = {
+            'observed': round(float(observed[name]), 4),
+            'mean': round(float(sample.mean()), 4),
+            'median': round(float(median), 4),
+            'lower': round(float(low), 4),
+            'upper': round(float(high), 4),
+        }
+
+    return {
+        "run_id": run_id,
+        "paths": paths,
+        "observations": len(returns),
+        "block_size": round(block_size or max(1.0, len(returns) ** (1 / 3)), 2),
+        "confidence": confidence,
+        "probability_of_loss": round(float((samples['total_return'] < 0).mean()), 4),
+        "metrics": metrics
+    }
 
 
 @router.get("/backtest/compare")
@@ -371,7 +835,7 @@ def compare_strategies(
         ).first()
 
         if existing:
-            results.append(BacktestResultResponse.from_attributes(existing))
+            results.append(BacktestResultResponse.model_validate(existing))
         else:
             # Run new backtest
             result = engine.run_backtest(
@@ -381,7 +845,7 @@ def compare_strategies(
                 end_date=end_date
             )
             if result:
-                results.append(BacktestResultResponse.from_attributes(result))
+                results.append(BacktestResultResponse.model_validate(result))
 
     if not results:
         raise HTTPException(
@@ -435,5 +899,5 @@ def get_strategy_performance(
         "avg_sharpe_ratio": avg_sharpe,
         "avg_max_drawdown": avg_max_drawdown,
         "avg_win_rate": avg_win_rate,
-        "recent_runs": [BacktestResultResponse.from_attributes(r) for r in runs[:5]]
+        "recent_runs": [BacktestResultResponse.model_validate(r) for r in runs[:5]]
     }
@@ -1,11 +1,12 @@
 """Education API endpoints"""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
 from typing import List, Optional
 from pydantic import BaseModel
 from app.database import get_db
 from app.models.education import EducationArticle, UserProgress
+from app.services.pagination import PaginationError, estimate_count, keyset_page, page_headers, parse_fields
 import json
 
 router = APIRouter(tags=["education"])
@@ -36,9 +37,12 @@ class ArticleResponse(BaseModel):
 def get_articles(
     level: Optional[str] = None,
     category: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    limit: int = Query(50, ge=1, le=100),
+    fields: Optional[str] = Query(None, description="Comma separated fields, e.g. id,title,level (omit content for list views)"),
     db: Session = Depends(get_db)
 ):
-    """Get all education articles with optional filters"""
+    """Get education articles with optional filters, newest first (keyset pagination via X-Next-Cursor)"""
     query = db.query(EducationArticle)
     
     if level:
@@ -46,20 +50,22 @@ def get_articles(
     if category:
         query = query.filter(EducationArticle.category == category)
     
-    articles = query.order_by(desc(EducationArticle.created_at)).all()
-    
-    return [
-        ArticleResponse(
-            id=article.id,
-            title=article.title,
-            category=article.category,
-            level=article.level,
-            content=article.content,
-            views=article.views,
-            created_at=article.created_at.isoformat() if article.created_at else ""
+    try:
+        selected = parse_fields(fields, list(ArticleResponse.model_fields))
+        articles, next_cursor = keyset_page(
+            query,
+            {name: getattr(EducationArticle, name) for name in selected},
+            EducationArticle.created_at,
+            EducationArticle.id,
+            limit,
+            cursor,
+            serializers={"created_at": lambda value: value.isoformat() if value else ""},
         )
-        for article in articles
-    ]
+    except PaginationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    total = estimate_count(query, EducationArticle.id)
+    return JSONResponse(content=articles, headers=page_headers(next_cursor, total))
 
 
 @router.get("/articles/{article_id}", response_model=ArticleResponse)
@@ -1,7 +1,8 @@
 """Notification API endpoints"""
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_, or_
+from sqlalchemy import and_, or_
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
@@ -9,6 +10,7 @@ import json
 
 from app.database import get_db
 from app.models.notification import Notification, NotificationSetting
+from app.services.pagination import PaginationError, estimate_count, isoformat, keyset_page, page_headers, parse_fields
 
 router = APIRouter(tags=["notifications"])
 
@@ -74,11 +76,17 @@ def get_notifications(
     user_id: Optional[int] = Query(None),
     is_read: Optional[bool] = Query(None),
     type: Optional[str] = Query(None),
-    limit: int = Query(50, le=100),
-    offset: int = Query(0),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    limit: int = Query(50, ge=1, le=100),
+    fields: Optional[str] = Query(None, description="Comma separated fields to return (default: all)"),
     db: Session = Depends(get_db)
 ):
-    """Get notifications with filters"""
+    """
+    Get notifications with filters, newest first
+
+    Keyset pagination: the next page's cursor is returned in X-Next-Cursor
+    and a capped total in X-Total-Estimate / X-Total-Exact.
+    """
     query = db.query(Notification)
 
     # Filter by user_id or system-wide
@@ -94,24 +102,25 @@ def get_notifications(
     if type:
         query = query.filter(Notification.type == type)
 
-    notifications = query.order_by(desc(Notification.created_at)).offset(offset).limit(limit).all()
-
-    return [
-        NotificationResponse(
-            id=n.id,
-            user_id=n.user_id,
-            ticker=n.ticker,
-            type=n.type,
-            title=n.title,
-            message=n.message,
-            severity=n.severity,
-            is_read=n.is_read,
-            data=n.data,
-            created_at=n.created_at.isoformat() if n.created_at else "",
-            read_at=n.read_at.isoformat() if n.read_at else None
+    try:
+        selected = parse_fields(fields, list(NotificationResponse.model_fields))
+        notifications, next_cursor = keyset_page(
+            query,
+            {name: getattr(Notification, name) for name in selected},
+            Notification.created_at,
+            Notification.id,
+            limit,
+            cursor,
+            serializers={
+                "created_at": lambda value: value.isoformat() if value else "",
+                "read_at": isoformat,
+            },
         )
-        for n in notifications
-    ]
+    except PaginationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    total = estimate_count(query, Notification.id)
+    return JSONResponse(content=notifications, headers=page_headers(next_cursor, total))
 
 
 @router.get("/notifications/unread-count")
@@ -115,23 +115,14 @@ def get_risk_metrics(portfolio_id: int, db: Session = Depends(get_db)):
 @router.get("/{portfolio_id}/summary", response_model=Dict)
 def get_portfolio_summary(portfolio_id: int, db: Session = Depends(get_db)):
     """포트폴리오 종합 요약 (모든 분석 데이터)"""
-    performance = PortfolioPerformanceService.calculate_portfolio_performance(db, portfolio_id)
-    if not performance:
+    summary = PortfolioPerformanceService.calculate_summary(db, portfolio_id)
+    if not summary:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Portfolio with id {portfolio_id} not found",
         )
 
-    allocation = PortfolioPerformanceService.calculate_asset_allocation(db, portfolio_id)
-    dividends = PortfolioPerformanceService.calculate_dividend_income(db, portfolio_id)
-    risk = PortfolioPerformanceService.calculate_risk_metrics(db, portfolio_id)
-
-    return {
-        "performance": performance,
-        "allocation": allocation,
-        "dividends": dividends,
-        "risk": risk,
-    }
+    return summary
 
 
 # 고급 분석 API들
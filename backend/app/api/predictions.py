@@ -1,11 +1,20 @@
 """Prediction API endpoints"""
-from fastapi import APIRouter, HTTPException, status, Depends, BackgroundTasks, Query
+from fastapi import APIRouter, HTTPException, status, Depends, BackgroundTasks, Query, Request
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from pydantic import BaseModel
 from app.ml.predictor import StockPredictor
 from app.services.data_fetcher import StockDataFetcher
 from app.services.prediction_validator import PredictionValidator
-from app.services.cache import stock_info_cache, STOCK_INFO_TTL
+from app.services.walk_forward import WalkForwardEvaluator
+from app.services.cache import stock_info_cache, STOCK_INFO_TTL, PREDICTION_SUMMARY_TTL
+from app.services.http_cache import cached_json_response, is_not_modified, make_etag, not_modified_response
+from app.services.prediction_snapshot import (
+    load_prediction_summary,
+    load_sector_analysis,
+)
+from app.models.prediction_snapshot import PredictionSnapshot, SectorSnapshot
+from app.services.pagination import PaginationError, estimate_count, isoformat, keyset_page, parse_fields
 from app.models.prediction_cache import PredictionCache
 from app.models.daily_prediction import DailyPrediction
 from app.models.validation_history import ValidationHistory
@@ -45,104 +54,36 @@ class DailyPredictionUpdate(BaseModel):
 
 
 @router.get("/summary")
-def get_predictions_summary(db: Session = Depends(get_db)):
+def get_predictions_summary(request: Request, db: Session = Depends(get_db)):
     """
     Get prediction summary for all trained models (for Treemap visualization)
 
-    Returns predictions grouped by action (BUY/SELL/HOLD) with company info
+    Returns predictions grouped by action (BUY/SELL/HOLD) with company info.
+    Served from the prediction snapshot, rebuilt after each cache refresh.
     """
-    from app.api.stocks import get_stock_info
-
-    if not os.path.exists(MODEL_DIR):
-        return {"predictions": [], "count": 0}
-
-    predictions = []
-
-    # Get all trained models
-    for file in os.listdir(MODEL_DIR):
-        if file.endswith("_model.h5"):
-            # Extract base ticker (remove model type suffix like .LSTM, .GRU)
-            ticker_with_model = file.replace("_model.h5", "").replace("_", ".")
-
-            # Remove model type suffix to get clean ticker
-            ticker = ticker_with_model
-            for model_type in ['.LSTM', '.GRU', '.TRANSFORMER', '.CNN.LSTM', '.ENSEMBLE', '.PROPHET', '.XGBOOST']:
-                if ticker.endswith(model_type):
-                    ticker = ticker[:-len(model_type)]
-                    break
-
-            # Skip if we already have this ticker
-            if any(p['ticker'] == ticker for p in predictions):
-                continue
+    computed_at = _snapshot_version(db, PredictionSnapshot.computed_at)
+    etag = make_etag("prediction_summary", computed_at)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, PREDICTION_SUMMARY_TTL)
+
+    summary = load_prediction_summary(db) or {
+        'predictions': [],
+        'grouped': {'BUY': [], 'SELL': [], 'HOLD': []},
+        'count': 0,
+        'summary': {'buy_count': 0, 'sell_count': 0, 'hold_count': 0},
+        'computed_at': None,
+    }
+    return cached_json_response(request, summary, max_age=PREDICTION_SUMMARY_TTL, etag=etag)
 
-            try:
-                # Get cached prediction
-                cached_prediction = (
-                    db.query(PredictionCache)
-                    .filter(PredictionCache.ticker == ticker)
-                    .filter(PredictionCache.expires_at > datetime.utcnow())
-                    .first()
-                )
-
-                if not cached_prediction:
-                    # Try to get fresh prediction
-                    try:
-                        pred_data = predict_stock_price(ticker, db)
-                        if pred_data:
-                            cached_prediction = (
-                                db.query(PredictionCache)
-                                .filter(PredictionCache.ticker == ticker)
-                                .filter(PredictionCache.expires_at > datetime.utcnow())
-                                .first()
-                            )
-                    except:
-                        continue
-
-                if cached_prediction:
-                    # Get stock info
-                    try:
-                        stock_info = get_stock_info(ticker, db)
-                        company_name = stock_info.get('name', ticker)
-                        sector = stock_info.get('sector', 'Unknown')
-                        market_cap = stock_info.get('market_cap', 0)
-                    except:
-                        company_name = ticker
-                        sector = 'Unknown'
-                        market_cap = 0
-
-                    predictions.append({
-                        'ticker': ticker,
-                        'name': company_name,
-                        'action': cached_prediction.action,
-                        'confidence': float(cached_prediction.confidence),
-                        'change_percent': float(cached_prediction.change_percent),
-                        'predicted_price': float(cached_prediction.predicted_price),
-                        'current_price': float(cached_prediction.current_price),
-                        'sector': sector,
-                        'market_cap': market_cap,
-                        'market': 'KRX' if (ticker.endswith('.KS') or ticker.endswith('.KQ')) else 'US'
-                    })
-            except Exception as e:
-                print(f"Error getting prediction for {ticker}: {e}")
-                continue
 
-    # Group by action for easier filtering
-    grouped = {
-        'BUY': [p for p in predictions if p['action'] == 'BUY'],
-        'SELL': [p for p in predictions if p['action'] == 'SELL'],
-        'HOLD': [p for p in predictions if p['action'] == 'HOLD']
-    }
+def _snapshot_version(db: Session, computed_at_column) -> Optional[datetime]:
+    """
+    Snapshot build time, None before the first build
 
-    return {
-        'predictions': predictions,
-        'grouped': grouped,
-        'count': len(predictions),
-        'summary': {
-            'buy_count': len(grouped['BUY']),
-            'sell_count': len(grouped['SELL']),
-            'hold_count': len(grouped['HOLD'])
-        }
-    }
+    Snapshots are built only by the scheduler (at startup when missing and
+    after each cache refresh), never on a GET.
+    """
+    return db.query(func.max(computed_at_column)).scalar()
 
 
 @router.post("/daily/save")
@@ -248,15 +189,32 @@ def save_daily_predictions_batch(
         )
 
 
+# Fields a daily prediction list can project
+DAILY_PREDICTION_FIELDS = (
+    "id", "ticker", "prediction_date", "target_date", "predicted_price", "current_price",
+    "predicted_change", "predicted_change_percent", "confidence", "action", "actual_price",
+    "actual_change", "actual_change_percent", "price_error", "price_error_percent",
+    "direction_correct", "model_type", "created_at",
+)
+
+
 @router.get("/daily")
 def get_daily_predictions(
     ticker: Optional[str] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     has_actuals: Optional[bool] = None,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=500),
+    fields: Optional[str] = Query(None, description="Comma separated fields to return (default: all)"),
     db: Session = Depends(get_db)
 ):
-    """Get daily predictions with optional filters"""
+    """Get daily predictions with optional filters, newest first (keyset pagination)"""
+    try:
+        selected = parse_fields(fields, DAILY_PREDICTION_FIELDS)
+    except PaginationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     try:
         query = db.query(DailyPrediction)
 
@@ -276,35 +234,26 @@ def get_daily_predictions(
             else:
                 query = query.filter(DailyPrediction.actual_price.is_(None))
 
-        # Order by date descending
-        predictions = query.order_by(DailyPrediction.prediction_date.desc()).all()
+        predictions, next_cursor = keyset_page(
+            query,
+            {name: getattr(DailyPrediction, name) for name in selected},
+            DailyPrediction.created_at,
+            DailyPrediction.id,
+            limit,
+            cursor,
+            serializers={"prediction_date": isoformat, "target_date": isoformat, "created_at": isoformat},
+        )
+        total, exact = estimate_count(query, DailyPrediction.id)
 
         return {
             "count": len(predictions),
-            "predictions": [
-                {
-                    "id": p.id,
-                    "ticker": p.ticker,
-                    "prediction_date": p.prediction_date.isoformat(),
-                    "target_date": p.target_date.isoformat(),
-                    "predicted_price": p.predicted_price,
-                    "current_price": p.current_price,
-                    "predicted_change": p.predicted_change,
-                    "predicted_change_percent": p.predicted_change_percent,
-                    "confidence": p.confidence,
-                    "action": p.action,
-                    "actual_price": p.actual_price,
-                    "actual_change": p.actual_change,
-                    "actual_change_percent": p.actual_change_percent,
-                    "price_error": p.price_error,
-                    "price_error_percent": p.price_error_percent,
-                    "direction_correct": p.direction_correct,
-                    "model_type": p.model_type,
-                    "created_at": p.created_at.isoformat() if p.created_at else None
-                }
-                for p in predictions
-            ]
+            "predictions": predictions,
+            "next_cursor": next_cursor,
+            "total_estimate": total,
+            "total_is_exact": exact,
         }
+    except PaginationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -1159,7 +1108,7 @@ def get_training_status(db: Session = Depends(get_db)):
 # ============================================
 
 @router.get("/sectors/analysis")
-def get_sector_analysis(db: Session = Depends(get_db)):
+def get_sector_analysis(request: Request, db: Session = Depends(get_db)):
     """
     Analyze sector performance based on AI predictions
 
@@ -1168,140 +1117,23 @@ def get_sector_analysis(db: Session = Depends(get_db)):
     - Stock count and distribution
     - BUY/SELL/HOLD recommendations per sector
     - Market breakdown (US vs KR)
-    """
-    from app.api.stocks import get_stock_info
-
-    if not os.path.exists(MODEL_DIR):
-        return {
-            "sectors": [],
-            "total_sectors": 0,
-            "us_sectors": [],
-            "kr_sectors": []
-        }
-
-    # Collect all predictions with sector info
-    sector_data = {}
-
-    for file in os.listdir(MODEL_DIR):
-        if file.endswith("_model.h5"):
-            ticker = file.replace("_model.h5", "").replace("_", ".")
-
-            try:
-                # Get cached prediction
-                cached_prediction = (
-                    db.query(PredictionCache)
-                    .filter(PredictionCache.ticker == ticker)
-                    .filter(PredictionCache.expires_at > datetime.utcnow())
-                    .first()
-                )
-
-                if not cached_prediction:
-                    continue
-
-                # Get stock info for sector
-                try:
-                    stock_info = get_stock_info(ticker, db)
-                    sector = stock_info.get('sector', 'Unknown')
-                    market = 'KRX' if (ticker.endswith('.KS') or ticker.endswith('.KQ')) else 'US'
-                except:
-                    sector = 'Unknown'
-                    market = 'US'
-
-                # Initialize sector data
-                if sector not in sector_data:
-                    sector_data[sector] = {
-                        'sector': sector,
-                        'stocks': [],
-                        'avg_change_percent': 0,
-                        'total_stocks': 0,
-                        'buy_count': 0,
-                        'sell_count': 0,
-                        'hold_count': 0,
-                        'us_count': 0,
-                        'kr_count': 0,
-                        'momentum_score': 0  # Calculated later
-                    }
-
-                # Add stock data
-                sector_data[sector]['stocks'].append({
-                    'ticker': ticker,
-                    'action': cached_prediction.action,
-                    'change_percent': float(cached_prediction.change_percent),
-                    'confidence': float(cached_prediction.confidence),
-                    'market': market
-                })
-
-                sector_data[sector]['total_stocks'] += 1
-
-                # Count actions
-                if cached_prediction.action == 'BUY':
-                    sector_data[sector]['buy_count'] += 1
-                elif cached_prediction.action == 'SELL':
-                    sector_data[sector]['sell_count'] += 1
-                else:
-                    sector_data[sector]['hold_count'] += 1
 
-                # Count markets
-                if market == 'US':
-                    sector_data[sector]['us_count'] += 1
-                else:
-                    sector_data[sector]['kr_count'] += 1
-
-            except Exception as e:
-                print(f"Error analyzing sector for {ticker}: {e}")
-                continue
-
-    # Calculate sector metrics
-    sectors = []
-    for sector, data in sector_data.items():
-        # Average change percent
-        avg_change = sum(s['change_percent'] for s in data['stocks']) / len(data['stocks']) if data['stocks'] else 0
-        data['avg_change_percent'] = round(avg_change, 2)
-
-        # Momentum score: combination of avg change and buy ratio
-        buy_ratio = data['buy_count'] / data['total_stocks'] if data['total_stocks'] > 0 else 0
-        sell_ratio = data['sell_count'] / data['total_stocks'] if data['total_stocks'] > 0 else 0
-
-        # Score: positive change + high buy ratio - sell ratio
-        momentum = (avg_change * 0.6) + (buy_ratio * 30) - (sell_ratio * 20)
-        data['momentum_score'] = round(momentum, 2)
-
-        # Recommendation
-        if momentum > 5 and buy_ratio > 0.4:
-            data['recommendation'] = 'STRONG_BUY'
-        elif momentum > 2 and buy_ratio > 0.3:
-            data['recommendation'] = 'BUY'
-        elif momentum < -5 or sell_ratio > 0.5:
-            data['recommendation'] = 'AVOID'
-        else:
-            data['recommendation'] = 'NEUTRAL'
-
-        # Remove detailed stocks from response (too much data)
-        data['top_picks'] = sorted(
-            [s for s in data['stocks'] if s['action'] == 'BUY'],
-            key=lambda x: x['change_percent'],
-            reverse=True
-        )[:3]  # Top 3 buy recommendations
-
-        del data['stocks']  # Remove full stock list
-
-        sectors.append(data)
-
-    # Sort by momentum score
-    sectors.sort(key=lambda x: x['momentum_score'], reverse=True)
-
-    # Separate US and KR sectors
-    us_sectors = [s for s in sectors if s['us_count'] > 0]
-    kr_sectors = [s for s in sectors if s['kr_count'] > 0]
-
-    return {
-        'sectors': sectors,
-        'total_sectors': len(sectors),
-        'us_sectors': us_sectors,
-        'kr_sectors': kr_sectors,
-        'top_momentum_sectors': sectors[:3] if len(sectors) >= 3 else sectors,
-        'generated_at': datetime.utcnow().isoformat()
+    Served from the sector snapshot, rebuilt after each cache refresh.
+    """
+    computed_at = _snapshot_version(db, SectorSnapshot.computed_at)
+    etag = make_etag("sector_analysis", computed_at)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, PREDICTION_SUMMARY_TTL)
+
+    analysis = load_sector_analysis(db) or {
+        'sectors': [],
+        'total_sectors': 0,
+        'us_sectors': [],
+        'kr_sectors': [],
+        'top_momentum_sectors': [],
+        'generated_at': None,
     }
+    return cached_json_response(request, analysis, max_age=PREDICTION_SUMMARY_TTL, etag=etag)
 
 
 # ============================================
@@ -1663,6 +1495,41 @@ def get_validation_history(
     return history
 
 
+@router.get("/{ticker}/signals")
+def get_model_signals(
+    ticker: str,
+    start_date: Optional[date] = Query(None, description="First signal date"),
+    end_date: Optional[date] = Query(None, description="Last signal date"),
+    refresh: bool = Query(True, description="Replay the model if stored signals are stale"),
+    db: Session = Depends(get_db)
+):
+    """
+    Walk-forward signal series: what the trained model would have predicted
+    on each historical trading day, computed in one batched inference call
+    and stored until the model is retrained
+    """
+    evaluator = WalkForwardEvaluator(db)
+    if evaluator.model_version(ticker) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No trained model found for {ticker}. Please train the model first."
+        )
+
+    try:
+        signals = evaluator.get_signals(ticker, start_date, end_date, refresh=refresh)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "ticker": ticker,
+        "count": len(signals),
+        "signals": [
+            {"date": signal_date.isoformat(), **row}
+            for signal_date, row in zip(signals.index, signals.to_dict("records"))
+        ]
+    }
+
+
 @router.get("/{ticker}/backtest")
 def backtest_prediction(
     ticker: str,
@@ -1672,6 +1539,11 @@ def backtest_prediction(
     """
     Backtest AI predictions against actual historical performance with caching (1 hour TTL)
 
+    Uses the stored walk-forward signals (refreshed by the scheduled
+    refresh_model_signals job, never replayed here): each day's BUY/SELL
+    call is compared with the price forecast_days later; HOLD days are
+    not traded, like the live recommendation.
+
     Returns:
     - Win rate (% of correct predictions)
     - Average return when following AI recommendations
@@ -1686,10 +1558,8 @@ def backtest_prediction(
         print(f"✅ Returning cached backtest for {ticker} ({period})")
         return cached_backtest
 
-    import yfinance as yf
-    import pandas as pd
     import numpy as np
-    from datetime import timedelta
+    import pandas as pd
 
     # Convert period to days
     period_days = {
@@ -1701,68 +1571,70 @@ def backtest_prediction(
 
     days = period_days.get(period, 90)
 
+    evaluator = WalkForwardEvaluator(db)
+    if evaluator.model_version(ticker) is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No trained model found for {ticker}. Please train the model first."
+        )
+
     try:
-        # Fetch historical data
-        stock = yf.Ticker(ticker)
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
+        start_date = (datetime.now() - timedelta(days=days)).date()
+        signals = evaluator.get_signals(ticker, start_date=start_date, refresh=False)
 
-        hist = stock.history(start=start_date, end=end_date)
+        if signals.empty:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Walk-forward signals for {ticker} are not computed yet; "
+                       f"they are refreshed by the scheduled refresh_model_signals job"
+            )
 
-        if hist.empty:
+        # Each signal is settled at the close forecast_days trading days later
+        prediction_window = int(signals['forecast_days'].iloc[0])
+        closes = signals['current_price'].to_numpy()
+        settled = len(signals) - prediction_window
+        if settled <= 0:
             raise HTTPException(
-                status_code=404,
-                detail=f"No historical data found for {ticker}"
+                status_code=400,
+                detail=f"Not enough history in {period} to settle predictions"
             )
 
-        # Simulate predictions on historical data
-        # We'll use a rolling window approach
-        trades = []
-        win_count = 0
-        loss_count = 0
-        total_return = 0.0
-
-        # Use 5-day prediction window
-        prediction_window = 5
-
-        for i in range(len(hist) - prediction_window):
-            entry_date = hist.index[i]
-            entry_price = hist['Close'].iloc[i]
-            exit_date = hist.index[min(i + prediction_window, len(hist) - 1)]
-            exit_price = hist['Close'].iloc[min(i + prediction_window, len(hist) - 1)]
-
-            actual_return = ((exit_price - entry_price) / entry_price) * 100
-
-            # Simple prediction logic based on recent trend
-            # In real backtest, we'd use the actual model predictions if available
-            recent_prices = hist['Close'].iloc[max(0, i-5):i+1]
-            trend = (recent_prices.iloc[-1] - recent_prices.iloc[0]) / recent_prices.iloc[0]
-
-            # Predict BUY if uptrend, SELL if downtrend
-            predicted_action = "BUY" if trend > 0 else "SELL"
-
-            # Calculate if prediction was correct
-            if predicted_action == "BUY" and actual_return > 0:
-                win_count += 1
-                total_return += actual_return
-            elif predicted_action == "SELL" and actual_return < 0:
-                win_count += 1
-                total_return += abs(actual_return)  # Profit from shorting
-            else:
-                loss_count += 1
-                total_return += actual_return if predicted_action == "BUY" else -actual_return
-
-            trades.append({
-                "entry_date": entry_date.strftime("%Y-%m-%d"),
-                "exit_date": exit_date.strftime("%Y-%m-%d"),
-                "entry_price": float(entry_price),
-                "exit_price": float(exit_price),
-                "predicted_action": predicted_action,
-                "actual_return": float(actual_return),
-                "profit": float(actual_return if predicted_action == "BUY" else -actual_return)
-            })
+        # Trade only the days the stored action was BUY or SELL (HOLD band: ±2%)
+        actions = signals['action'].to_numpy()[:settled]
+        traded = np.flatnonzero(actions != "HOLD")
+
+        entry_dates = signals.index[:settled][traded]
+        exit_dates = signals.index[prediction_window:][traded]
+        entry_prices = closes[:settled][traded]
+        exit_prices = closes[prediction_window:][traded]
+        confidences = signals['confidence'].to_numpy()[:settled][traded]
+        predicted_change = signals['predicted_change_percent'].to_numpy()[:settled][traded]
+        actions = actions[traded]
+
+        actual_returns = ((exit_prices - entry_prices) / entry_prices) * 100
+        is_buy = actions == "BUY"
+        profits = np.where(is_buy, actual_returns, -actual_returns)
+
+        win_count = int((profits > 0).sum())
+        total_trades = len(traded)
+        loss_count = total_trades - win_count
+        total_return = float(profits.sum())
+
+        trades = [
+            {
+                "entry_date": entry_dates[i].strftime("%Y-%m-%d"),
+                "exit_date": exit_dates[i].strftime("%Y-%m-%d"),
+                "entry_price": float(entry_prices[i]),
+                "exit_price": float(exit_prices[i]),
+                "predicted_action": str(actions[i]),
+                "predicted_change": float(predicted_change[i]),
+                "confidence": float(confidences[i]),
+                "actual_return": float(actual_returns[i]),
+                "profit": float(profits[i])
+            }
+            for i in range(total_trades)
+        ]
 
-        total_trades = win_count + loss_count
         win_rate = (win_count / total_trades * 100) if total_trades > 0 else 0
         avg_return = total_return / total_trades if total_trades > 0 else 0
 
@@ -1772,24 +1644,28 @@ def backtest_prediction(
         worst_trades = sorted_trades[-5:]
 
         # Calculate monthly performance
-        df = pd.DataFrame(trades)
-        df['entry_date'] = pd.to_datetime(df['entry_date'])
-        df['month'] = df['entry_date'].dt.to_period('M')
-
-        monthly_performance = []
-        for month in df['month'].unique():
-            month_trades = df[df['month'] == month]
-            monthly_performance.append({
+        df = pd.DataFrame({
+            'month': pd.to_datetime(pd.Series(entry_dates)).dt.to_period('M'),
+            'profit': profits
+        })
+        monthly = df.groupby('month', sort=True)['profit'].agg(['count', 'sum', 'mean'])
+        wins = df[df['profit'] > 0].groupby('month')['profit'].count()
+
+        monthly_performance = [
+            {
                 "month": str(month),
-                "trades": len(month_trades),
-                "wins": len(month_trades[month_trades['profit'] > 0]),
-                "total_return": float(month_trades['profit'].sum()),
-                "avg_return": float(month_trades['profit'].mean())
-            })
+                "trades": int(row['count']),
+                "wins": int(wins.get(month, 0)),
+                "total_return": float(row['sum']),
+                "avg_return": float(row['mean'])
+            }
+            for month, row in monthly.iterrows()
+        ]
 
         result = {
             "ticker": ticker,
             "period": period,
+            "source": "walk_forward",
             "summary": {
                 "total_trades": total_trades,
                 "wins": win_count,
@@ -1810,6 +1686,8 @@ def backtest_prediction(
 
         return result
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
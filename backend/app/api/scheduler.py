@@ -1,15 +1,21 @@
 """Scheduler API endpoints for viewing scheduler logs and status"""
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
 from typing import Optional
 from datetime import datetime, timedelta
 from app.database import get_db
 from app.models.scheduler_log import SchedulerLog
-from app.services.scheduler import scheduler
+from app.services.pagination import PaginationError, estimate_count, isoformat, keyset_page, parse_fields
+from app.services.scheduler import scheduler, scheduler_elector
 
 router = APIRouter(prefix="/scheduler", tags=["scheduler"])
 
+# Fields a log list can project (see SchedulerLog.to_dict)
+LOG_FIELDS = (
+    "id", "job_id", "job_name", "status", "message", "success_count", "failed_count",
+    "started_at", "completed_at", "duration_seconds",
+)
+
 
 @router.get("/logs")
 def get_scheduler_logs(
@@ -17,9 +23,11 @@ def get_scheduler_logs(
     job_id: Optional[str] = Query(None, description="Filter by job ID"),
     status: Optional[str] = Query(None, description="Filter by status"),
     days: int = Query(7, description="Number of days to fetch"),
-    limit: int = Query(100, description="Maximum number of logs to return"),
+    limit: int = Query(100, ge=1, le=500, description="Maximum number of logs to return"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma separated fields to return (default: all)"),
 ):
-    """Get scheduler execution logs"""
+    """Get scheduler execution logs, most recent first (keyset pagination)"""
     query = db.query(SchedulerLog)
 
     # Filter by date range
@@ -34,12 +42,28 @@ def get_scheduler_logs(
     if status:
         query = query.filter(SchedulerLog.status == status)
 
-    # Order by most recent first
-    logs = query.order_by(desc(SchedulerLog.started_at)).limit(limit).all()
+    try:
+        selected = parse_fields(fields, LOG_FIELDS)
+        logs, next_cursor = keyset_page(
+            query,
+            {name: getattr(SchedulerLog, name) for name in selected},
+            SchedulerLog.started_at,
+            SchedulerLog.id,
+            limit,
+            cursor,
+            serializers={"started_at": isoformat, "completed_at": isoformat},
+        )
+    except PaginationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    total_estimate, exact = estimate_count(query, SchedulerLog.id)
 
     return {
-        "logs": [log.to_dict() for log in logs],
+        "logs": logs,
         "total": len(logs),
+        "next_cursor": next_cursor,
+        "total_estimate": total_estimate,
+        "total_is_exact": exact,
         "filters": {
             "job_id": job_id,
             "status": status,
@@ -50,7 +74,10 @@ def get_scheduler_logs(
 
 @router.get("/status")
 def get_scheduler_status():
-    """Get current scheduler status and job information"""
+    """Get current scheduler status and job information
+
+    ``running`` is for this process; only the elected leader runs jobs.
+    """
     jobs = []
 
     if scheduler.running:
@@ -63,10 +90,19 @@ def get_scheduler_status():
                 "trigger": str(job.trigger),
             })
 
+    try:
+        lease = scheduler_elector.db_lock.current()
+    except Exception:
+        lease = None
+
     return {
-        "running": scheduler.running,
+        "running": scheduler.running and scheduler_elector.is_leader,
         "jobs": jobs,
         "job_count": len(jobs),
+        "leader": {
+            **scheduler_elector.status(),
+            "lease": lease.to_dict() if lease else None,
+        },
     }
 
 
@@ -123,6 +159,13 @@ def get_scheduled_jobs():
             "schedule": "월-금 09:00-17:00 매 30분",
             "cron": "day_of_week='mon-fri', hour='9-17', minute='0,30'",
         },
+        {
+            "id": "refresh_model_signals",
+            "name": "모델 신호 갱신",
+            "description": "재훈련된 모델의 워크포워드 신호를 다시 계산합니다 (백테스트용)",
+            "schedule": "월-금 12:00",
+            "cron": "day_of_week='mon-fri', hour=12, minute=0",
+        },
     ]
 
     # Add runtime information if scheduler is running
@@ -1,8 +1,16 @@
 """Stock API endpoints"""
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
-from app.schemas.stock import StockInfo, StockQuote, AnalystPriceTarget, AnalystRecommendation, StockFundamentals
+from app.schemas.stock import (
+    StockInfo,
+    StockQuote,
+    StockInfoBatch,
+    StockQuoteBatch,
+    AnalystPriceTarget,
+    AnalystRecommendation,
+    StockFundamentals,
+)
 from app.services.data_fetcher import StockDataFetcher
 from app.services.cache import (
     stock_info_cache,
@@ -12,6 +20,17 @@ from app.services.cache import (
     STOCK_QUOTE_TTL,
     ANALYST_TARGETS_TTL,
 )
+from app.services.price_history import (
+    HISTORY_FORMATS,
+    HISTORY_INTERVALS,
+    period_covering,
+    prepare_history,
+    slice_history,
+    resample_history,
+    downsample_history,
+    history_payload,
+)
+from app.services.http_cache import cached_json_response
 from app.database import get_db
 from app.models.sector import StockInfo as StockInfoModel
 import httpx
@@ -20,10 +39,30 @@ import json
 import re
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from typing import Optional
 
 router = APIRouter()
 
+# Upper bound on tickers per batch quote/info request
+MAX_BATCH_TICKERS = 100
+
+
+def _parse_tickers(tickers: str) -> list:
+    """Split a comma separated ticker list, dropping blanks and duplicates"""
+    parsed = list(dict.fromkeys(t.strip() for t in tickers.split(",") if t.strip()))
+    if not parsed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one ticker is required",
+        )
+    if len(parsed) > MAX_BATCH_TICKERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BATCH_TICKERS} tickers per request",
+        )
+    return parsed
+
 
 @router.get("/{ticker}/info", response_model=StockInfo)
 def get_stock_info(ticker: str, db: Session = Depends(get_db)):
@@ -119,41 +158,161 @@ def get_stock_quote(ticker: str):
         )
 
 
+@router.get("/infos", response_model=StockInfoBatch)
+def get_stock_infos(
+    tickers: str = Query(..., description="Comma separated tickers, e.g. AAPL,005930.KS"),
+    db: Session = Depends(get_db),
+):
+    """Get stock information for many tickers in one request (1 hour TTL per ticker)"""
+    ticker_list = _parse_tickers(tickers)
+
+    cached = stock_info_cache.get_many(f"stock_info_{t}" for t in ticker_list)
+    infos = {t: cached[f"stock_info_{t}"] for t in ticker_list if f"stock_info_{t}" in cached}
+    misses = [t for t in ticker_list if t not in infos]
+    print(f"✅ Stock infos: {len(infos)} cached, {len(misses)} to fetch")
+
+    if misses:
+        fetched = StockDataFetcher.get_stock_infos(misses)
+
+        # Korean names from the database in one query (optional - table may not exist)
+        korean = [t for t in fetched if t.endswith('.KS') or t.endswith('.KQ')]
+        if korean:
+            try:
+                for db_stock in db.query(StockInfoModel).filter(StockInfoModel.ticker.in_(korean)).all():
+                    fetched[db_stock.ticker]['name'] = db_stock.name
+                    if db_stock.sector:
+                        fetched[db_stock.ticker]['sector'] = db_stock.sector.value
+            except Exception as e:
+                print(f"⚠️ Database lookup skipped for {len(korean)} Korean tickers: {str(e)}")
+
+        stock_info_cache.set_many(
+            {f"stock_info_{t}": info for t, info in fetched.items()}, STOCK_INFO_TTL
+        )
+        infos.update(fetched)
+
+    return StockInfoBatch(
+        infos={t: infos[t] for t in ticker_list if t in infos},
+        missing=[t for t in ticker_list if t not in infos],
+    )
+
+
+@router.get("/quotes", response_model=StockQuoteBatch)
+def get_stock_quotes(
+    tickers: str = Query(..., description="Comma separated tickers, e.g. AAPL,005930.KS"),
+):
+    """Get current prices for many tickers with one batched download (5 min TTL per ticker)"""
+    ticker_list = _parse_tickers(tickers)
+
+    cached = stock_quote_cache.get_many(f"stock_quote_{t}" for t in ticker_list)
+    quotes = {t: cached[f"stock_quote_{t}"] for t in ticker_list if f"stock_quote_{t}" in cached}
+    misses = [t for t in ticker_list if t not in quotes]
+    print(f"✅ Stock quotes: {len(quotes)} cached, {len(misses)} to fetch")
+
+    if misses:
+        timestamp = datetime.now().isoformat()
+        fetched = {}
+        for ticker, data in StockDataFetcher.get_quotes(misses).items():
+            change = data["current_price"] - data["previous_close"]
+            change_percent = (change / data["previous_close"]) * 100 if data["previous_close"] else 0.0
+            fetched[ticker] = StockQuote(
+                ticker=ticker,
+                current_price=data["current_price"],
+                change=change,
+                change_percent=change_percent,
+                volume=data["volume"],
+                timestamp=timestamp,
+            )
+
+        stock_quote_cache.set_many(
+            {f"stock_quote_{t}": quote for t, quote in fetched.items()}, STOCK_QUOTE_TTL
+        )
+        quotes.update(fetched)
+
+    return StockQuoteBatch(
+        quotes={t: quotes[t] for t in ticker_list if t in quotes},
+        missing=[t for t in ticker_list if t not in quotes],
+    )
+
+
 @router.get("/{ticker}/history")
-def get_stock_history(ticker: str, period: str = "1mo"):
+def get_stock_history(
+    ticker: str,
+    request: Request,
+    period: str = "1mo",
+    start: Optional[date] = Query(None, description="First trading date (inclusive); overrides period"),
+    end: Optional[date] = Query(None, description="Last trading date (inclusive)"),
+    interval: str = Query("1d", description="Bar size: 1d, 1wk or 1mo"),
+    max_points: Optional[int] = Query(None, ge=2, description="Merge bars down to at most this many points"),
+    format: str = Query("records", description="records (one object per bar) or columnar (one array per field)"),
+):
     """
-    Get historical stock data with caching (1 hour TTL)
+    Get historical stock data with caching (1 hour TTL, ETag revalidation)
 
     Args:
         ticker: Stock ticker symbol
         period: Valid periods: 1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max
+        start/end: Date range; when start is given, the shortest period covering it is fetched
+        interval: Resample daily bars into weekly (1wk) or monthly (1mo) bars
+        max_points: Downsample by merging consecutive bars (high/low/volume preserved)
+        format: records or columnar
     """
-    # Check cache first
+    if interval not in HISTORY_INTERVALS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid interval '{interval}'. Available: {list(HISTORY_INTERVALS)}",
+        )
+    if format not in HISTORY_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format '{format}'. Available: {list(HISTORY_FORMATS)}",
+        )
+    if start and end and start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must not be after end",
+        )
+
+    if start:
+        period = period_covering(start)
+
+    # The daily frame is cached once per ticker and period; every view is derived from it
     cache_key = f"stock_history_{ticker}_{period}"
-    cached_history = stock_info_cache.get(cache_key)
+    frame = stock_info_cache.get(cache_key)
 
-    if cached_history:
+    if frame is not None:
         print(f"✅ Returning cached history for {ticker} ({period})")
-        return cached_history
+    else:
+        # Fetch from API
+        df = StockDataFetcher.fetch_yahoo_finance(ticker, period)
 
-    # Fetch from API
-    df = StockDataFetcher.fetch_yahoo_finance(ticker, period)
-
-    if df is None or df.empty:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"No historical data found for ticker {ticker}",
-        )
+        if df is None or df.empty:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No historical data found for ticker {ticker}",
+            )
 
-    # Convert DataFrame to list of dicts
-    records = df.to_dict("records")
-    result = {"ticker": ticker, "period": period, "data": records}
+        frame = prepare_history(df)
 
-    # Cache the result
-    stock_info_cache.set(cache_key, result, STOCK_INFO_TTL)
-    print(f"💾 Cached stock history for {ticker} ({period}) (1 hour TTL)")
+        # Cache the result
+        stock_info_cache.set(cache_key, frame, STOCK_INFO_TTL)
+        print(f"💾 Cached stock history for {ticker} ({period}) (1 hour TTL)")
+
+    frame = slice_history(frame, start, end)
+    frame = resample_history(frame, interval)
+    if max_points:
+        frame = downsample_history(frame, max_points)
+
+    result = {
+        "ticker": ticker,
+        "period": period,
+        "interval": interval,
+        "format": format,
+        "count": len(frame),
+        "data": history_payload(frame, format),
+    }
 
-    return result
+    # Plain lists of floats and strings; skip Pydantic validation and encode directly
+    return cached_json_response(request, result, max_age=STOCK_INFO_TTL)
 
 
 @router.get("/{ticker}/analyst-targets", response_model=AnalystPriceTarget)
@@ -8,10 +8,23 @@ from app.models.portfolio import Portfolio
 from app.services.portfolio_analyzer import PortfolioAnalyzer
 from app.services.recommendation_engine import RecommendationEngine
 from app.services.rebalancer import Rebalancer
+from app.services.portfolio_optimizer import OPTIMIZATION_METHODS
+from app.services.blocking import run_blocking
+from app.services.portfolio_insights import PortfolioInsightsService
 
 router = APIRouter()
 
 
+async def _get_portfolio_or_404(db: Session, portfolio_id: int) -> Portfolio:
+    """포트폴리오 조회 (워커 풀에서 실행), 없으면 404"""
+    portfolio = await run_blocking(
+        lambda: db.query(Portfolio).filter(Portfolio.id == portfolio_id).first()
+    )
+    if not portfolio:
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+    return portfolio
+
+
 @router.get("/portfolios/{portfolio_id}/analytics")
 async def get_portfolio_analytics(
     portfolio_id: int,
@@ -26,9 +39,7 @@ async def get_portfolio_analytics(
         - Holdings analysis (종목별 상세)
     """
     # 포트폴리오 존재 확인
-    portfolio = db.query(Portfolio).filter(Portfolio.id == portfolio_id).first()
-    if not portfolio:
-        raise HTTPException(status_code=404, detail="Portfolio not found")
+    portfolio = await _get_portfolio_or_404(db, portfolio_id)
 
     # 분석 실행
     analyzer = PortfolioAnalyzer(db)
@@ -52,9 +63,7 @@ async def save_analytics_snapshot(
     일별 또는 정기적으로 포트폴리오 분석 결과를 저장하여
     성과 추이를 추적할 수 있습니다.
     """
-    portfolio = db.query(Portfolio).filter(Portfolio.id == portfolio_id).first()
-    if not portfolio:
-        raise HTTPException(status_code=404, detail="Portfolio not found")
+    portfolio = await _get_portfolio_or_404(db, portfolio_id)
 
     analyzer = PortfolioAnalyzer(db)
     snapshot = await analyzer.save_analytics_snapshot(portfolio_id)
@@ -92,9 +101,7 @@ async def get_stock_recommendations(
     """
     # 포트폴리오 확인
     if portfolio_id:
-        portfolio = db.query(Portfolio).filter(Portfolio.id == portfolio_id).first()
-        if not portfolio:
-            raise HTTPException(status_code=404, detail="Portfolio not found")
+        portfolio = await _get_portfolio_or_404(db, portfolio_id)
 
     # 섹터 파싱
     sectors = None
@@ -161,9 +168,7 @@ async def check_rebalancing_needed(
     포트폴리오가 리밸런싱이 필요한지 확인하고,
     필요하다면 어떤 이유 때문인지 알려줍니다.
     """
-    portfolio = db.query(Portfolio).filter(Portfolio.id == portfolio_id).first()
-    if not portfolio:
-        raise HTTPException(status_code=404, detail="Portfolio not found")
+    portfolio = await _get_portfolio_or_404(db, portfolio_id)
 
     rebalancer = Rebalancer(db)
     check_result = await rebalancer.check_rebalancing_needed(portfolio_id)
@@ -180,6 +185,7 @@ async def check_rebalancing_needed(
 async def propose_rebalancing(
     portfolio_id: int,
     proposal_type: str = Query("AUTO", description="SECTOR_REBALANCE | RISK_REDUCTION | PERIODIC | AUTO"),
+    optimization_method: Optional[str] = Query(None, description="MIN_VARIANCE | MEAN_VARIANCE | RISK_PARITY"),
     db: Session = Depends(get_db)
 ):
     """리밸런싱 제안 생성
@@ -194,15 +200,24 @@ async def propose_rebalancing(
             - SECTOR_REBALANCE: 섹터 균형 조정
             - RISK_REDUCTION: 리스크 축소
             - PERIODIC: 정기 리밸런싱
+        optimization_method: 최적화 목표 비중 사용 (개별 종목 최대 비중 제약)
+            - MIN_VARIANCE: 최소 분산
+            - MEAN_VARIANCE: 평균-분산
+            - RISK_PARITY: 리스크 패리티
     """
-    portfolio = db.query(Portfolio).filter(Portfolio.id == portfolio_id).first()
-    if not portfolio:
-        raise HTTPException(status_code=404, detail="Portfolio not found")
+    if optimization_method and optimization_method not in OPTIMIZATION_METHODS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"optimization_method must be one of {list(OPTIMIZATION_METHODS)}"
+        )
+
+    portfolio = await _get_portfolio_or_404(db, portfolio_id)
 
     rebalancer = Rebalancer(db)
     proposal = await rebalancer.generate_rebalancing_proposal(
         portfolio_id=portfolio_id,
-        proposal_type=proposal_type
+        proposal_type=proposal_type,
+        optimization_method=optimization_method
     )
 
     if not proposal:
@@ -272,79 +287,18 @@ async def get_portfolio_insights(
 
     분석, 추천, 리밸런싱을 한 번에 조회하여
     포트폴리오에 대한 전체적인 인사이트를 제공합니다.
-    """
-    portfolio = db.query(Portfolio).filter(Portfolio.id == portfolio_id).first()
-    if not portfolio:
-        raise HTTPException(status_code=404, detail="Portfolio not found")
-
-    # 1. 포트폴리오 분석
-    analyzer = PortfolioAnalyzer(db)
-    analysis = await analyzer.analyze_portfolio(portfolio_id)
 
-    # 2. 추천 생성
-    engine = RecommendationEngine(db)
-    recommendations = await engine.generate_recommendations(
-        portfolio_id=portfolio_id,
-        max_recommendations=5
-    )
+    추천이 마감 시간 내에 끝나지 않으면 추천 없이 응답하며
+    partial=true, pending=["recommendations"]로 표시합니다.
+    """
+    portfolio = await _get_portfolio_or_404(db, portfolio_id)
 
-    # 3. 리밸런싱 체크
-    rebalancer = Rebalancer(db)
-    rebalance_check = await rebalancer.check_rebalancing_needed(portfolio_id)
-
-    # 종합 점수 계산
-    overall_score = 0.0
-    strengths = []
-    warnings = []
-    suggestions = []
-
-    # 성과 평가
-    total_return = analysis['performance'].get('total_return', 0)
-    if total_return > 10:
-        overall_score += 30
-        strengths.append(f"높은 수익률: {total_return:.1f}%")
-    elif total_return < 0:
-        warnings.append(f"마이너스 수익률: {total_return:.1f}%")
-
-    # 리스크 평가
-    sharpe_ratio = analysis['risk'].get('sharpe_ratio', 0)
-    if sharpe_ratio > 1.0:
-        overall_score += 25
-        strengths.append(f"우수한 샤프 비율: {sharpe_ratio:.2f}")
-    elif sharpe_ratio < 0.5:
-        warnings.append(f"낮은 샤프 비율: {sharpe_ratio:.2f}")
-
-    # 다각화 평가
-    sector_diversity = analysis['diversification'].get('sector_diversity_score', 0)
-    if sector_diversity > 60:
-        overall_score += 25
-        strengths.append(f"우수한 섹터 다각화: {sector_diversity:.1f}")
-    elif sector_diversity < 40:
-        warnings.append(f"낮은 섹터 다각화: {sector_diversity:.1f}")
-        suggestions.append("다양한 섹터의 종목을 추가하세요")
-
-    # 리밸런싱 필요성
-    if rebalance_check['needs_rebalancing']:
-        if rebalance_check['severity'] == 'HIGH':
-            warnings.append("리밸런싱 긴급 필요")
-            suggestions.append("즉시 리밸런싱을 실행하세요")
-        elif rebalance_check['severity'] == 'MEDIUM':
-            suggestions.append("리밸런싱을 고려하세요")
-    else:
-        overall_score += 20
-        strengths.append("포트폴리오 균형 양호")
+    # 분석은 한 번만 계산해 리밸런싱 체크와 공유, 추천은 동시에 실행
+    insights = await PortfolioInsightsService(db).build(portfolio_id)
 
     return {
         "success": True,
         "portfolio_id": portfolio_id,
         "portfolio_name": portfolio.name,
-        "overall_score": min(100, overall_score),
-        "summary": {
-            "strengths": strengths,
-            "warnings": warnings,
-            "suggestions": suggestions
-        },
-        "analysis": analysis,
-        "top_recommendations": recommendations[:3],
-        "rebalancing": rebalance_check
+        **insights
     }
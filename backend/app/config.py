@@ -29,6 +29,14 @@ class Settings(BaseSettings):
     # CORS
     cors_origins: str = "http://localhost:3000"
 
+    # Tracing (full traces are kept only for requests slower than the threshold)
+    trace_slow_request_ms: int = 1000
+    trace_export_path: str = "logs/slow_traces.jsonl"
+
+    # Scheduler leader election (one process per deployment runs the cron jobs)
+    scheduler_lock_file: str = ""  # Host-level lock; empty uses the system temp dir
+    scheduler_lease_seconds: int = 30
+
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -3,6 +3,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import get_settings
+from app.services.tracing import instrument_engine
 
 settings = get_settings()
 
@@ -15,6 +16,9 @@ engine = create_engine(
     echo=settings.environment == "development",
 )
 
+# db.query spans for traced requests
+instrument_engine(engine)
+
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -1,9 +1,13 @@
 """Main FastAPI application"""
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.config import get_settings
-from app.services.scheduler import start_scheduler, stop_scheduler
+from app.services.scheduler import scheduler_elector, stop_scheduler
+from app.services.backtest_jobs import run_heartbeat
+from app.services.metrics import MetricsMiddleware, registry as metrics_registry
+from app.services.tracing import JsonFileExporter, SlowRequestSampler, TracingMiddleware
 import logging
 
 settings = get_settings()
@@ -15,10 +19,15 @@ async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
     # Startup
     logger.info("Starting application...")
-    start_scheduler()
+    # Keep this process's backtest runs alive and fail runs of dead processes
+    run_heartbeat.start()
+    # Every worker contends; only the elected leader starts the scheduler
+    scheduler_elector.start()
     yield
     # Shutdown
     logger.info("Shutting down application...")
+    run_heartbeat.stop()
+    scheduler_elector.stop()
     stop_scheduler()
 
 
@@ -43,6 +52,16 @@ app.add_middleware(
     max_age=3600,
 )
 
+# Per-request spans; traces of slow requests are written to a local JSON Lines file
+app.add_middleware(
+    TracingMiddleware,
+    exporter=JsonFileExporter(settings.trace_export_path),
+    sampler=SlowRequestSampler(settings.trace_slow_request_ms),
+)
+
+# Request latency and status per route (outermost, so it sees every response)
+app.add_middleware(MetricsMiddleware)
+
 
 @app.get("/")
 async def root():
@@ -60,6 +79,14 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(
+        metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 # Include routers
 from app.api import portfolios, holdings, stocks, admin, predictions, scheduler, education, notifications, accuracy, news, backtest
 from app.api.v1 import analytics, investment_insights
@@ -9,6 +9,9 @@ import logging
 import pickle
 import os
 
+from app.services.metrics import model_inference_duration_seconds
+from app.services.tracing import span
+
 logger = logging.getLogger(__name__)
 
 
@@ -178,7 +181,8 @@ class GRUPredictor:
         X = np.reshape(scaled_data, (1, self.lookback_days, 1))
 
         # Predict
-        prediction_scaled = self.model.predict(X, verbose=0)
+        with span("model.predict", model_type="GRU"), model_inference_duration_seconds.time("GRU"):
+            prediction_scaled = self.model.predict(X, verbose=0)
         prediction = self.scaler.inverse_transform(prediction_scaled)[0][0]
 
         # Calculate confidence
@@ -228,7 +232,8 @@ class GRUPredictor:
     def load_model(self, path: str):
         """Load GRU model and scaler from disk"""
         # Load model
-        self.model = keras.models.load_model(path)
+        with span("model.load", model_type="GRU", path=path):
+            self.model = keras.models.load_model(path)
 
         # Load scaler
         scaler_path = path.replace('.h5', '_scaler.pkl')
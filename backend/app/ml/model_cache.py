@@ -0,0 +1,112 @@
+"""Resident cache of loaded prediction models"""
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional, Tuple
+import logging
+import os
+
+from app.services.metrics import model_load_duration_seconds, record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+# Loaded Keras models kept in memory (least recently used are evicted)
+MAX_RESIDENT_MODELS = 256
+
+
+class PredictorCache:
+    """
+    Thread-safe LRU cache of loaded predictors keyed by model file
+
+    Loading a Keras model from disk dominates a single prediction, so each
+    model is loaded once and kept resident. An entry is reloaded when its
+    file's mtime changes (the model was retrained). Each predictor has its
+    own lock so concurrent callers never run the same model at once.
+    """
+
+    def __init__(self, max_models: int = MAX_RESIDENT_MODELS):
+        self._entries: "OrderedDict[str, Tuple[float, object, Lock]]" = OrderedDict()
+        self._lock = Lock()
+        self._path_locks: Dict[str, Lock] = {}
+        self._max_models = max_models
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, model_path: str, model_type: str = "LSTM") -> Optional[Tuple[object, Lock]]:
+        """
+        Loaded predictor for ``model_path`` and the lock guarding it
+
+        Returns None if the file does not exist.
+        """
+        try:
+            mtime = os.path.getmtime(model_path)
+        except OSError:
+            return None
+
+        entry = self._lookup(model_path, mtime)
+        if entry is not None:
+            return entry
+
+        with self._path_lock(model_path):
+            # Another thread may have loaded it while we waited
+            entry = self._lookup(model_path, mtime)
+            if entry is not None:
+                return entry
+
+            record_cache_lookup("predictor", 0, 1)
+            predictor = self._load(model_path, model_type)
+            entry = (predictor, Lock())
+            with self._lock:
+                self._misses += 1
+                self._entries[model_path] = (mtime, *entry)
+                self._entries.move_to_end(model_path)
+                while len(self._entries) > self._max_models:
+                    self._entries.popitem(last=False)
+            return entry
+
+    def invalidate(self, model_path: Optional[str] = None):
+        """Drop one model, or everything"""
+        with self._lock:
+            if model_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(model_path, None)
+
+    def get_stats(self):
+        """Get cache statistics"""
+        with self._lock:
+            return {
+                "resident_models": len(self._entries),
+                "max_models": self._max_models,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+    def _lookup(self, model_path: str, mtime: float) -> Optional[Tuple[object, Lock]]:
+        with self._lock:
+            cached = self._entries.get(model_path)
+            if cached is None or cached[0] != mtime:
+                return None
+            self._hits += 1
+            self._entries.move_to_end(model_path)
+        record_cache_lookup("predictor", 1)
+        return cached[1], cached[2]
+
+    def _path_lock(self, model_path: str) -> Lock:
+        with self._lock:
+            return self._path_locks.setdefault(model_path, Lock())
+
+    @staticmethod
+    def _load(model_path: str, model_type: str):
+        with model_load_duration_seconds.time(model_type):
+            if model_type == "GRU":
+                from app.ml.gru_predictor import GRUPredictor
+                predictor = GRUPredictor(model_path=model_path)
+            else:
+                from app.ml.predictor import StockPredictor
+                predictor = StockPredictor(model_path=model_path)
+        logger.info(f"🧠 Loaded {model_type} model into memory: {model_path}")
+        return predictor
+
+
+# Global cache instance
+predictor_cache = PredictorCache()
@@ -20,6 +20,9 @@ import logging
 import pickle
 import os
 
+from app.services.metrics import model_inference_duration_seconds
+from app.services.tracing import span
+
 logger = logging.getLogger(__name__)
 
 
@@ -184,7 +187,8 @@ class StockPredictor:
         X = np.reshape(scaled_data, (1, self.lookback_days, 1))
 
         # Predict
-        prediction_scaled = self.model.predict(X, verbose=0)
+        with span("model.predict", model_type="LSTM"), model_inference_duration_seconds.time("LSTM"):
+            prediction_scaled = self.model.predict(X, verbose=0)
         prediction = self.scaler.inverse_transform(prediction_scaled)[0][0]
 
         # Calculate confidence (inverse of prediction variance)
@@ -224,7 +228,8 @@ class StockPredictor:
     def load_model(self, path: str):
         """Load model and scaler from disk"""
         # Load model
-        self.model = keras.models.load_model(path)
+        with span("model.load", model_type="LSTM", path=path):
+            self.model = keras.models.load_model(path)
 
         # Load scaler
         scaler_path = path.replace('.h5', '_scaler.pkl')
@@ -1,6 +1,6 @@
 """Backtesting models"""
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, ForeignKey, LargeBinary, Index
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 import enum
 
@@ -74,18 +74,29 @@ class BacktestRun(Base):
     benchmark_return = Column(Float)  # Buy-and-hold return
     alpha = Column(Float)  # Excess return over benchmark
 
-    # Detailed results
-    trades = Column(Text)  # JSON array of trades
-    equity_curve = Column(Text)  # JSON array of daily portfolio values
+    # Detailed results (deferred: list queries only need the summary columns)
+    trades = deferred(Column(Text))  # JSON array of trades
+    equity_curve = deferred(Column(Text))  # Legacy JSON array of daily portfolio values
+    equity_dates = deferred(Column(LargeBinary))  # int32 day numbers (see series_storage)
+    equity_values = deferred(Column(LargeBinary))  # float64 portfolio values
 
     # Status
-    status = Column(String(20), default="completed")  # running, completed, failed
+    status = Column(String(20), default="completed")  # queued, running, completed, failed
     error_message = Column(Text, nullable=True)
 
+    # Ownership while queued/running: the owning process renews heartbeat_at
+    worker_id = Column(String(100), nullable=True)  # host:pid:token of the owning process
+    heartbeat_at = Column(DateTime, nullable=True)
+
     # Metadata
     created_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime)
 
+    # Keyset pagination order (newest first)
+    __table_args__ = (
+        Index("ix_backtest_runs_created_at_id", "created_at", "id"),
+    )
+
     # Relationships
     strategy = relationship("BacktestStrategy", back_populates="runs")
 
@@ -124,3 +135,34 @@ class Trade(Base):
 
     def __repr__(self):
         return f"<Trade {self.ticker} @ {self.entry_price} -> {self.exit_price}: {self.profit_loss_pct:.2f}%>"
+
+
+class BacktestSweep(Base):
+    """Summary of a parameter sweep (grid) backtest"""
+    __tablename__ = "backtest_sweeps"
+
+    id = Column(Integer, primary_key=True, index=True)
+    strategy_type = Column(String(50), nullable=False)
+    tickers = Column(Text, nullable=False)  # JSON array of tickers
+    parameter_grid = Column(Text, nullable=False)  # JSON {param: [values]}
+
+    # Time period
+    start_date = Column(DateTime, nullable=False)
+    end_date = Column(DateTime, nullable=False)
+
+    # Best cell
+    rank_by = Column(String(50), default="sharpe_ratio")
+    total_runs = Column(Integer, default=0)
+    best_ticker = Column(String(20), nullable=True)
+    best_parameters = Column(Text, nullable=True)  # JSON parameters
+    best_sharpe_ratio = Column(Float, nullable=True)
+    best_total_return = Column(Float, nullable=True)  # %
+
+    # Top ranked rows and heatmap matrix (not one BacktestRun per cell)
+    summary = Column(Text)  # JSON
+
+    # Metadata
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<BacktestSweep {self.strategy_type} ({self.total_runs} runs)>"
@@ -2,7 +2,7 @@
 Daily Prediction Tracking Model
 Stores daily predictions and tracks accuracy
 """
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, Index
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -37,3 +37,8 @@ class DailyPrediction(Base):
     model_type = Column(String(20), nullable=True)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    # Keyset pagination order (newest first)
+    __table_args__ = (
+        Index("ix_daily_predictions_created_at_id", "created_at", "id"),
+    )
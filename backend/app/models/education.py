@@ -1,5 +1,5 @@
 """Education models for AI-generated investment lessons"""
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, Index
 from sqlalchemy.sql import func
 from app.database import Base
 import enum
@@ -34,6 +34,11 @@ class EducationArticle(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Keyset pagination order (newest first)
+    __table_args__ = (
+        Index("ix_education_articles_created_at_id", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<EducationArticle(id={self.id}, title={self.title}, level={self.level})>"
 
@@ -0,0 +1,41 @@
+"""
+Model Signal Model
+Per-date signals from replaying a trained model over historical windows
+"""
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class ModelSignal(Base):
+    """Walk-forward model output for one ticker and trading day
+
+    Each row is what the model would have predicted using only data up to
+    ``signal_date``. Rows are tied to the model file version so retraining
+    invalidates them.
+    """
+
+    __tablename__ = "model_signals"
+
+    id = Column(Integer, primary_key=True, index=True)
+    ticker = Column(String(20), nullable=False, index=True)
+    signal_date = Column(Date, nullable=False, index=True)
+    model_version = Column(DateTime, nullable=False)  # Model file mtime
+
+    # Prediction data
+    current_price = Column(Float, nullable=False)
+    predicted_price = Column(Float, nullable=False)
+    predicted_change_percent = Column(Float, nullable=False)
+    confidence = Column(Float, nullable=False)
+    action = Column(String(10), nullable=False)  # BUY, SELL, HOLD
+    forecast_days = Column(Integer, default=5)
+
+    # Metadata
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('ticker', 'signal_date', 'model_version', name='uix_model_signal_version'),
+    )
+
+    def __repr__(self):
+        return f"<ModelSignal({self.ticker} {self.signal_date}: {self.action} {self.predicted_change_percent:.2f}%)>"
@@ -1,5 +1,5 @@
 """Notification model for user alerts"""
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, Text, Index
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -20,6 +20,11 @@ class Notification(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     read_at = Column(DateTime(timezone=True), nullable=True)
 
+    # Keyset pagination order (newest first)
+    __table_args__ = (
+        Index("ix_notifications_created_at_id", "created_at", "id"),
+    )
+
 
 class NotificationSetting(Base):
     """User notification preferences"""
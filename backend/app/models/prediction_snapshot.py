@@ -0,0 +1,58 @@
+"""Materialized prediction summary and sector analysis views"""
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text
+from app.database import Base
+
+
+class PredictionSnapshot(Base):
+    """One row per trained ticker: latest prediction joined with company info
+
+    Rebuilt after each prediction cache refresh so the treemap reads a
+    single table instead of querying predictions and profiles per model.
+    """
+
+    __tablename__ = "prediction_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    ticker = Column(String, unique=True, index=True, nullable=False)
+    name = Column(String, nullable=False)
+    sector = Column(String, nullable=False, default="Unknown")
+    market = Column(String, nullable=False)  # US, KRX
+    market_cap = Column(Float, nullable=False, default=0)
+
+    # Prediction
+    action = Column(String, nullable=False, index=True)  # BUY, SELL, HOLD
+    confidence = Column(Float, nullable=False)
+    change_percent = Column(Float, nullable=False)
+    predicted_price = Column(Float, nullable=False)
+    current_price = Column(Float, nullable=False)
+
+    computed_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<PredictionSnapshot(ticker={self.ticker}, action={self.action})>"
+
+
+class SectorSnapshot(Base):
+    """Sector-level aggregates of the prediction snapshot"""
+
+    __tablename__ = "sector_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sector = Column(String, unique=True, index=True, nullable=False)
+
+    total_stocks = Column(Integer, nullable=False)
+    buy_count = Column(Integer, nullable=False)
+    sell_count = Column(Integer, nullable=False)
+    hold_count = Column(Integer, nullable=False)
+    us_count = Column(Integer, nullable=False)
+    kr_count = Column(Integer, nullable=False)
+
+    avg_change_percent = Column(Float, nullable=False)
+    momentum_score = Column(Float, nullable=False, index=True)
+    recommendation = Column(String, nullable=False)  # STRONG_BUY, BUY, NEUTRAL, AVOID
+    top_picks = Column(Text, nullable=False)  # JSON list of the top 3 BUY stocks
+
+    computed_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<SectorSnapshot(sector={self.sector}, momentum={self.momentum_score})>"
@@ -0,0 +1,32 @@
+"""Scheduler leader lock model"""
+from sqlalchemy import Column, String, DateTime
+from app.database import Base
+
+
+class SchedulerLock(Base):
+    """Lease row naming the process that runs the scheduler
+
+    The holder renews expires_at with heartbeats; once the lease expires
+    any other process may take the row over.
+    """
+
+    __tablename__ = "scheduler_locks"
+
+    name = Column(String, primary_key=True)  # e.g., 'scheduler'
+    holder = Column(String, nullable=False)  # host:pid:token of the leader
+    acquired_at = Column(DateTime, nullable=False)
+    heartbeat_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+    def to_dict(self):
+        """Convert to dictionary"""
+        return {
+            "name": self.name,
+            "holder": self.holder,
+            "acquired_at": self.acquired_at.isoformat() if self.acquired_at else None,
+            "heartbeat_at": self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            "expires_at": self.expires_at.isoformat() if self.expires_at else None,
+        }
+
+    def __repr__(self):
+        return f"<SchedulerLock(name={self.name}, holder={self.holder})>"
@@ -1,5 +1,5 @@
 """Scheduler log model for storing job execution history"""
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Index
 from datetime import datetime
 from app.database import Base
 
@@ -20,6 +20,11 @@ class SchedulerLog(Base):
     completed_at = Column(DateTime, nullable=True)
     duration_seconds = Column(Integer, nullable=True)  # Execution duration
 
+    # Keyset pagination order (newest first)
+    __table_args__ = (
+        Index("ix_scheduler_logs_started_at_id", "started_at", "id"),
+    )
+
     def to_dict(self):
         """Convert to dictionary"""
         return {
@@ -1,5 +1,5 @@
 """Sector and Industry classification models"""
-from sqlalchemy import Column, Integer, String, Float, Enum, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Float, Enum, ForeignKey, UniqueConstraint, DateTime
 from sqlalchemy.orm import relationship
 from app.database import Base
 import enum
@@ -120,6 +120,31 @@ class StockRecommendation(Base):
         return f"<StockRecommendation(ticker={self.ticker}, action={self.action}, confidence={self.confidence_score:.2f})>"
 
 
+class RecommendationScore(Base):
+    """Precomputed portfolio-independent recommendation scores per ticker
+
+    Refreshed by the scheduler after each daily price collection; requests
+    only add the portfolio-specific diversification term on top.
+    """
+
+    __tablename__ = "recommendation_scores"
+
+    id = Column(Integer, primary_key=True, index=True)
+    ticker = Column(String, unique=True, index=True, nullable=False)
+
+    # Component scores (0.0 to 1.0)
+    ai_prediction_score = Column(Float, nullable=False)
+    technical_score = Column(Float, nullable=False)
+    momentum_score = Column(Float, nullable=False)
+    base_score = Column(Float, nullable=False, index=True)  # Weighted sum without diversification
+
+    current_price = Column(Float, nullable=False)
+    computed_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<RecommendationScore(ticker={self.ticker}, base={self.base_score:.2f})>"
+
+
 class RebalanceProposal(Base):
     """Portfolio rebalancing proposals"""
 
@@ -1,7 +1,7 @@
 """Stock schemas"""
 from pydantic import BaseModel
 from datetime import date
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class StockInfo(BaseModel):
@@ -39,6 +39,20 @@ class StockQuote(BaseModel):
     timestamp: str
 
 
+class StockInfoBatch(BaseModel):
+    """Stock information for several tickers"""
+
+    infos: Dict[str, StockInfo]
+    missing: List[str] = []
+
+
+class StockQuoteBatch(BaseModel):
+    """Real-time quotes for several tickers"""
+
+    quotes: Dict[str, StockQuote]
+    missing: List[str] = []
+
+
 class AnalystRecommendation(BaseModel):
     """Analyst recommendation distribution"""
 
@@ -0,0 +1,531 @@
+"""Vectorized backtest core operating on NumPy price arrays
+
+Strategies are expressed as boolean entry/exit signal arrays over a price
+panel (a dict of equally sized arrays, one element per trading day). The
+core turns signals into positions via cumulative state transitions and
+computes equity, drawdown and returns in bulk, so a multi-year daily
+backtest costs a handful of array operations instead of a per-day loop.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+
+# Prediction direction codes stored in the panel's 'direction' array
+DIRECTION_DOWN = -1
+DIRECTION_NEUTRAL = 0
+DIRECTION_UP = 1
+
+# Trading days per year used for annualization
+TRADING_DAYS = 252
+
+
+def build_price_panel(
+    dates: List[datetime],
+    close: np.ndarray,
+    open_: Optional[np.ndarray] = None,
+    high: Optional[np.ndarray] = None,
+    low: Optional[np.ndarray] = None,
+    volume: Optional[np.ndarray] = None,
+    direction: Optional[np.ndarray] = None,
+    confidence: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Build a price panel from per-field arrays
+
+    Missing OHLV fields default to the close series, missing prediction
+    fields default to NEUTRAL with 0.5 confidence.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+
+    return {
+        'dates': np.asarray(dates, dtype=object),
+        'open': np.asarray(open_ if open_ is not None else close, dtype=np.float64),
+        'high': np.asarray(high if high is not None else close, dtype=np.float64),
+        'low': np.asarray(low if low is not None else close, dtype=np.float64),
+        'close': close,
+        'volume': np.asarray(volume if volume is not None else np.zeros(n), dtype=np.float64),
+        'direction': np.asarray(
+            direction if direction is not None else np.full(n, DIRECTION_NEUTRAL), dtype=np.int8
+        ),
+        'confidence': np.asarray(
+            confidence if confidence is not None else np.full(n, 0.5), dtype=np.float64
+        ),
+    }
+
+
+def moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Simple moving average in O(n) via cumulative sums
+
+    The first ``window - 1`` elements hold the raw values, matching the
+    warm-up behaviour of the original per-day implementation.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    ma = values.copy()
+    if window < 1 or window > len(values):
+        return ma
+
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    ma[window - 1:] = (csum[window:] - csum[:-window]) / window
+    return ma
+
+
+def crossover_signals(
+    fast: np.ndarray, slow: np.ndarray, warmup: int = 0
+):
+    """
+    Entry/exit signals for a fast/slow line crossover
+
+    Entry when ``fast`` crosses above ``slow``, exit when it crosses below.
+    No signals are emitted before index ``warmup``.
+    """
+    n = len(fast)
+    above = fast > slow
+    below = fast < slow
+    prev_not_above = np.concatenate(([True], fast[:-1] <= slow[:-1]))
+    prev_not_below = np.concatenate(([True], fast[:-1] >= slow[:-1]))
+    active = np.arange(n) >= warmup
+
+    entries = above & prev_not_above & active
+    exits = below & prev_not_below & active
+    return entries, exits
+
+
+def prediction_signals(
+    direction: np.ndarray, confidence: np.ndarray, confidence_threshold: float
+):
+    """
+    Entry/exit signals from ML prediction direction and confidence
+
+    Entry on a confident UP prediction; exit on a DOWN prediction or when
+    confidence drops below 80% of the threshold.
+    """
+    entries = (direction == DIRECTION_UP) & (confidence >= confidence_threshold)
+    exits = ~entries & (
+        (direction == DIRECTION_DOWN) | (confidence < confidence_threshold * 0.8)
+    )
+    return entries, exits
+
+
+def positions_from_signals(entries: np.ndarray, exits: np.ndarray) -> np.ndarray:
+    """
+    Long/flat position state after each bar
+
+    Each signal sets the state (entry -> long, exit -> flat) and the state
+    is carried forward until the next signal. Entries win ties.
+    """
+    n = len(entries)
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+
+    events = np.full(n, -1, dtype=np.int8)
+    events[exits] = 0
+    events[entries] = 1
+
+    last_event = np.where(events >= 0, np.arange(n), 0)
+    np.maximum.accumulate(last_event, out=last_event)
+    return events[last_event] == 1
+
+
+def moving_average_positions(
+    close: np.ndarray, short_window: int, long_window: int
+) -> np.ndarray:
+    """Position state for a moving average crossover strategy"""
+    short_ma = moving_average(close, short_window)
+    long_ma = moving_average(close, long_window)
+
+    # No trading until the long MA has warmed up
+    entries, exits = crossover_signals(short_ma, long_ma, warmup=long_window)
+    return positions_from_signals(entries, exits)
+
+
+def prediction_positions(
+    direction: np.ndarray, confidence: np.ndarray, confidence_threshold: float
+) -> np.ndarray:
+    """Position state for the ML prediction strategy"""
+    entries, exits = prediction_signals(direction, confidence, confidence_threshold)
+    return positions_from_signals(entries, exits)
+
+
+def simulate_long_only(
+    close: np.ndarray,
+    position: np.ndarray,
+    initial_capital: float,
+    position_size_pct: float,
+) -> Dict[str, np.ndarray]:
+    """
+    Simulate a long-only strategy from a position state array
+
+    Each trade invests ``position_size_pct`` of available cash at the entry
+    close and returns the proceeds at the exit close. Only the cash carried
+    between trades is computed per trade; the equity curve is built for all
+    bars at once.
+
+    Returns:
+        Dict with 'equity' (per bar), and per-trade 'entry_idx', 'exit_idx',
+        'shares' and 'is_open' (trade still open at the last bar)
+    """
+    n = len(close)
+    held = position.astype(np.int8)
+    change = np.diff(held, prepend=0)
+    entry_idx = np.flatnonzero(change == 1)
+    exit_idx = np.flatnonzero(change == -1)
+
+    n_trades = len(entry_idx)
+    is_open = np.zeros(n_trades, dtype=bool)
+    if len(exit_idx) < n_trades:
+        is_open[-1] = True
+        exit_idx = np.append(exit_idx, n - 1)
+
+    # Cash carried between trades compounds sequentially per trade
+    fraction = position_size_pct / 100
+    entry_price = close[entry_idx]
+    exit_price = close[exit_idx]
+    shares = np.empty(n_trades)
+    cash_rest = np.empty(n_trades)
+    cash_after = np.empty(n_trades)
+    cash = initial_capital
+    for k in range(n_trades):
+        position_value = cash * fraction
+        shares[k] = position_value / entry_price[k]
+        cash_rest[k] = cash - position_value
+        cash_after[k] = cash_rest[k] + shares[k] * exit_price[k]
+        cash = cash_after[k]
+
+    # Map each bar to its most recent trade and value it in bulk
+    trade_of_bar = np.cumsum(change == 1) - 1
+    has_trade = trade_of_bar >= 0
+    safe_trade = np.where(has_trade, trade_of_bar, 0)
+
+    if n_trades:
+        held_value = cash_rest[safe_trade] + shares[safe_trade] * close
+        flat_value = np.where(has_trade, cash_after[safe_trade], initial_capital)
+    else:
+        held_value = np.full(n, float(initial_capital))
+        flat_value = held_value
+
+    equity = np.where(position, held_value, flat_value)
+
+    return {
+        'equity': equity,
+        'entry_idx': entry_idx,
+        'exit_idx': exit_idx,
+        'shares': shares,
+        'is_open': is_open,
+    }
+
+
+def daily_returns(equity: np.ndarray) -> np.ndarray:
+    """Simple bar-over-bar returns of an equity curve"""
+    return np.diff(equity) / equity[:-1]
+
+
+def drawdown_series(equity: np.ndarray) -> np.ndarray:
+    """Drawdown from running peak in % for every bar"""
+    peak = np.maximum.accumulate(equity)
+    return ((peak - equity) / peak) * 100
+
+
+def sharpe_ratio(returns: np.ndarray) -> float:
+    """Annualized Sharpe ratio (risk-free rate 0)"""
+    if len(returns) <= 1:
+        return 0.0
+    std_return = np.std(returns)
+    if std_return <= 0:
+        return 0.0
+    return float((np.mean(returns) / std_return) * np.sqrt(TRADING_DAYS))
+
+
+def trades_from_simulation(
+    ticker: str,
+    dates: np.ndarray,
+    close: np.ndarray,
+    simulation: Dict[str, np.ndarray],
+) -> List[Dict]:
+    """Materialize per-trade dicts from a simulation result"""
+    trades = []
+    for k in range(len(simulation['entry_idx'])):
+        entry = simulation['entry_idx'][k]
+        exit_ = simulation['exit_idx'][k]
+        entry_price = close[entry]
+        exit_price = close[exit_]
+        shares = simulation['shares'][k]
+
+        trades.append({
+            'ticker': ticker,
+            'entry_date': dates[entry],
+            'entry_price': float(entry_price),
+            'shares': float(shares),
+            'direction': 'LONG',
+            'exit_date': dates[exit_],
+            'exit_price': float(exit_price),
+            'profit_loss': float((exit_price - entry_price) * shares),
+            'profit_loss_pct': float(((exit_price - entry_price) / entry_price) * 100),
+            'holding_days': (dates[exit_] - dates[entry]).days,
+            'exit_reason': 'END_OF_PERIOD' if simulation['is_open'][k] else 'SIGNAL',
+        })
+    return trades
+
+
+def summary_metrics(
+    close: np.ndarray,
+    simulation: Dict[str, np.ndarray],
+    initial_capital: float,
+) -> Dict[str, float]:
+    """
+    Headline metrics computed straight from simulation arrays
+
+    Lighter than BacktestEngine._calculate_metrics: no trade dicts are
+    materialized, which keeps large parameter sweeps cheap.
+    """
+    equity = simulation['equity']
+    if len(equity) == 0:
+        return {
+            'final_capital': initial_capital,
+            'total_return': 0.0,
+            'annualized_return': 0.0,
+            'sharpe_ratio': 0.0,
+            'max_drawdown': 0.0,
+            'win_rate': 0.0,
+            'total_trades': 0,
+        }
+
+    final_capital = float(equity[-1])
+    total_return = ((final_capital - initial_capital) / initial_capital) * 100
+    years = len(equity) / TRADING_DAYS
+    annualized_return = (((final_capital / initial_capital) ** (1 / years)) - 1) * 100
+
+    entry_price = close[simulation['entry_idx']]
+    exit_price = close[simulation['exit_idx']]
+    profit_loss = (exit_price - entry_price) * simulation['shares']
+    total_trades = len(profit_loss)
+    win_rate = float(np.mean(profit_loss > 0) * 100) if total_trades else 0.0
+
+    return {
+        'final_capital': final_capital,
+        'total_return': float(total_return),
+        'annualized_return': float(annualized_return),
+        'sharpe_ratio': sharpe_ratio(daily_returns(equity)),
+        'max_drawdown': max(0.0, float(np.max(drawdown_series(equity)))),
+        'win_rate': win_rate,
+        'total_trades': total_trades,
+    }
+
+
+def rebalance_schedule(dates: np.ndarray, frequency: str) -> np.ndarray:
+    """
+    Bar indices of calendar rebalances (always includes bar 0)
+
+    Args:
+        dates: Bar dates (datetime objects)
+        frequency: none, daily, weekly, monthly, quarterly or annually
+    """
+    n = len(dates)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    if frequency == 'none':
+        return np.zeros(1, dtype=np.int64)
+    if frequency == 'daily':
+        return np.arange(n)
+
+    if frequency == 'weekly':
+        period = np.array([d.isocalendar()[0] * 100 + d.isocalendar()[1] for d in dates])
+    elif frequency == 'monthly':
+        period = np.array([d.year * 12 + d.month for d in dates])
+    elif frequency == 'quarterly':
+        period = np.array([d.year * 4 + (d.month - 1) // 3 for d in dates])
+    elif frequency == 'annually':
+        period = np.array([d.year for d in dates])
+    else:
+        raise ValueError(f"Unknown rebalance frequency: {frequency}")
+
+    # First bar of each new period
+    return np.flatnonzero(np.concatenate(([True], period[1:] != period[:-1])))
+
+
+def threshold_rebalance_schedule(
+    prices: np.ndarray, weights: np.ndarray, threshold_pct: float
+) -> np.ndarray:
+    """
+    Bar indices where any weight drifts more than ``threshold_pct`` points
+
+    Drift after each rebalance is evaluated for all remaining bars at once,
+    so the cost is one array pass per rebalance rather than per bar.
+    """
+    n = len(prices)
+    schedule = [0]
+    start = 0
+    while start < n - 1:
+        relative = prices[start + 1:] / prices[start]
+        drifted = relative * weights
+        drifted /= drifted.sum(axis=1, keepdims=True)
+        breach = np.abs(drifted - weights).max(axis=1) * 100 > threshold_pct
+        hits = np.flatnonzero(breach)
+        if len(hits) == 0:
+            break
+        start = start + 1 + hits[0]
+        schedule.append(start)
+    return np.asarray(schedule, dtype=np.int64)
+
+
+def simulate_rebalanced_portfolio(
+    prices: np.ndarray,
+    weights: np.ndarray,
+    rebalance_idx: np.ndarray,
+    initial_capital: float,
+    transaction_cost_bps: float = 0.0,
+) -> Dict[str, np.ndarray]:
+    """
+    Simulate a fixed-weight portfolio with periodic rebalancing
+
+    Between rebalances share counts are constant, so each bar's value is the
+    value at the last rebalance times the weighted price relative since
+    then. Segment multipliers compound via a cumulative product.
+
+    Args:
+        prices: date x ticker matrix in a single currency
+        weights: target weights (sum to 1)
+        rebalance_idx: sorted bar indices of rebalances, starting with 0
+        initial_capital: starting portfolio value
+        transaction_cost_bps: cost per unit of turnover, in basis points
+
+    Returns:
+        Dict with 'equity' (per bar), 'weights' (drifted weights per bar),
+        'turnover' and 'cost' per rebalance
+    """
+    n = len(prices)
+    is_start = np.zeros(n, dtype=bool)
+    is_start[rebalance_idx] = True
+    segment = np.cumsum(is_start) - 1
+
+    # Value growth since the segment's rebalance, for every bar
+    base = prices[rebalance_idx][segment]
+    relative = prices / base
+    growth = relative @ weights
+
+    # Drifted weights just before each later rebalance determine turnover
+    prev_bar = rebalance_idx[1:] - 1
+    prev_segment = segment[prev_bar]
+    arrival_relative = prices[rebalance_idx[1:]] / prices[rebalance_idx][prev_segment]
+    arrival_growth = arrival_relative @ weights
+    arrival_weights = (arrival_relative * weights) / arrival_growth[:, None]
+    turnover = np.concatenate(([1.0], np.abs(arrival_weights - weights).sum(axis=1)))
+    cost_rate = turnover * transaction_cost_bps / 10000
+
+    # Value at each rebalance compounds segment by segment, net of costs
+    segment_multiplier = np.concatenate(([1.0], arrival_growth)) * (1 - cost_rate)
+    rebalance_value = initial_capital * np.cumprod(segment_multiplier)
+
+    equity = rebalance_value[segment] * growth
+    drifted_weights = (relative * weights) / growth[:, None]
+
+    return {
+        'equity': equity,
+        'weights': drifted_weights,
+        'turnover': turnover,
+        'cost': rebalance_value * cost_rate / (1 - cost_rate),
+    }
+
+
+
+def _block_tables(returns: np.ndarray, max_block: int) -> Dict[str, np.ndarray]:
+    """
+    Statistics of every circular block of daily returns
+
+    Row s, column k describes the block of length k starting at bar s
+    (k = 0 is the empty block): log growth, its peak, trough and intra-block
+    drawdown (log space), and the sums of simple returns and their squares.
+    """
+    n = len(returns)
+    positions = (np.arange(n)[:, None] + np.arange(max_block)[None, :]) % n
+
+    def prefix(values):
+        out = np.zeros((n, max_block + 1))
+        np.cumsum(values[positions], axis=1, out=out[:, 1:])
+        return out
+
+    path = prefix(np.log1p(returns))
+    peak = np.maximum.accumulate(path, axis=1)
+    return {
+        'total': path,
+        'peak': peak,
+        'trough': np.minimum.accumulate(path, axis=1),
+        'drawdown': np.maximum.accumulate(peak - path, axis=1),
+        'sum': prefix(returns),
+        'sum_sq': prefix(returns ** 2),
+    }
+
+
+def bootstrap_metrics(
+    returns: np.ndarray,
+    n_paths: int = 10000,
+    mean_block: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Total return, Sharpe and max drawdown over stationary-bootstrap paths
+
+    Each resampled path (Politis & Romano) is a sequence of circular blocks
+    of the original returns with geometric lengths (mean ``mean_block``,
+    capped at 10x the mean, which drops ~e^-10 of the tail mass). Paths are
+    never materialized bar by bar: every block is summarized by one lookup
+    into per-(start, length) tables, so the cost scales with the number of
+    blocks rather than bars.
+
+    All paths advance one block per step, truncated so each path has
+    exactly n bars. Each step folds the block into running per-path state
+    (log level, peak, drawdown, return sums). NumPy's accumulate along the
+    block axis is several times slower than these row-wise updates, and no
+    blocks x paths temporaries are allocated.
+
+    Args:
+        returns: daily simple returns of the original equity curve
+        mean_block: expected block length in days (default n ** (1/3))
+
+    Returns:
+        Dict of per-path arrays: 'total_return' and 'max_drawdown' in %,
+        'sharpe_ratio' annualized
+    """
+    n = len(returns)
+    mean_block = mean_block or max(1.0, n ** (1 / 3))
+    max_block = int(min(n, np.ceil(10 * mean_block)))
+    rng = np.random.default_rng(seed)
+
+    tables = {name: table.ravel() for name, table in _block_tables(returns, max_block).items()}
+    # Inverse-CDF geometric draws are much cheaper than rng.geometric
+    scale = -1.0 / np.log1p(-1.0 / mean_block) if mean_block > 1 else 0.0
+
+    remaining = np.full(n_paths, n, dtype=np.int64)
+    lengths = np.empty(n_paths, dtype=np.int64)
+    sum_returns = np.zeros(n_paths)
+    sum_squares = np.zeros(n_paths)
+    level = np.zeros(n_paths)  # log equity at the current block start
+    peak = np.zeros(n_paths)  # running peak of log equity
+    drawdown = np.zeros(n_paths)  # running max drawdown (log space)
+
+    while remaining.any():
+        exponential = rng.standard_exponential(n_paths, dtype=np.float32)
+        np.minimum((exponential * scale).astype(np.int64) + 1, max_block, out=lengths)
+        np.minimum(lengths, remaining, out=lengths)
+        remaining -= lengths
+        cell = rng.integers(0, n, size=n_paths) * (max_block + 1) + lengths
+
+        sum_returns += tables['sum'][cell]
+        sum_squares += tables['sum_sq'][cell]
+        np.maximum(drawdown, tables['drawdown'][cell], out=drawdown)
+        np.maximum(drawdown, peak - (level + tables['trough'][cell]), out=drawdown)
+        np.maximum(peak, level + tables['peak'][cell], out=peak)
+        level += tables['total'][cell]
+
+    # Mean/std of simple returns from per-block sums
+    mean = sum_returns / n
+    std = np.sqrt(np.maximum(sum_squares / n - mean ** 2, 0.0))
+    safe_std = np.where(std > 0, std, 1.0)
+    sharpe = np.where(std > 0, mean / safe_std * np.sqrt(TRADING_DAYS), 0.0)
+
+    return {
+        'total_return': np.expm1(level) * 100,
+        'sharpe_ratio': sharpe,
+        'max_drawdown': -np.expm1(-drawdown) * 100,
+    }
@@ -0,0 +1,165 @@
+"""Shared per-ticker price cache for backtests"""
+from collections import OrderedDict
+from datetime import datetime, time, timedelta
+from threading import Lock
+from typing import Callable, Dict, Optional
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Cache TTL (in seconds): recent bars and new predictions land during the day
+BACKTEST_DATA_TTL = 900  # 15 minutes
+
+# Tickers kept in memory (least recently used are evicted)
+MAX_CACHED_TICKERS = 256
+
+# Download locks are striped by ticker hash so their number stays fixed
+TICKER_LOCK_STRIPES = 64
+
+
+def day_numbers(index: pd.DatetimeIndex) -> np.ndarray:
+    """Local calendar day of each index entry as datetime64[D]"""
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.normalize().values.astype('datetime64[D]')
+
+
+class BacktestDataCache:
+    """
+    Thread-safe LRU per-ticker cache that keeps the widest range fetched so far
+
+    Each entry is one date-indexed OHLCV frame covering [start, end); model
+    signals are looked up separately. A request inside the cached range is
+    a binary-search slice; a request outside it refetches the union of both
+    ranges once, so the cached range only ever grows until it expires.
+    Expired entries are purged on every insert and at most ``max_tickers``
+    are kept.
+    Concurrent misses for the same ticker wait for a single download (misses
+    for tickers sharing a lock stripe also wait for each other).
+    """
+
+    def __init__(self, ttl_seconds: int = BACKTEST_DATA_TTL, max_tickers: int = MAX_CACHED_TICKERS):
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._max_tickers = max_tickers
+        self._lock = Lock()
+        self._ticker_locks = [Lock() for _ in range(TICKER_LOCK_STRIPES)]
+        self._ttl_seconds = ttl_seconds
+        self._hits = 0
+        self._misses = 0
+
+    def get(
+        self,
+        ticker: str,
+        start_date: datetime,
+        end_date: datetime,
+        fetch: Callable[[str, datetime, datetime], Optional[pd.DataFrame]],
+    ) -> Optional[pd.DataFrame]:
+        """
+        Rows of ``ticker`` with start_date <= day < end_date
+
+        Args:
+            fetch: loader called as fetch(ticker, start, end) on a miss; must
+                return a date-indexed frame or None/empty if no data exists
+        """
+        # Whole days only, so cached ranges compare regardless of time/tz
+        start_date = datetime.combine(start_date.date(), time())
+        end_date = datetime.combine(end_date.date(), time())
+        start_day = np.datetime64(start_date.date(), 'D')
+        end_day = np.datetime64(end_date.date(), 'D')
+
+        entry = self._covering_entry(ticker, start_day, end_day)
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+
+        if entry is None:
+            with self._ticker_lock(ticker):
+                # Another thread may have fetched it while we waited
+                entry = self._covering_entry(ticker, start_day, end_day)
+                if entry is None:
+                    entry = self._refresh(ticker, start_date, end_date, fetch)
+                    if entry is None:
+                        return None
+
+        lo = np.searchsorted(entry['days'], start_day, side='left')
+        hi = np.searchsorted(entry['days'], end_day, side='left')
+        return entry['frame'].iloc[lo:hi]
+
+    def invalidate(self, ticker: Optional[str] = None):
+        """Drop one ticker, or everything"""
+        with self._lock:
+            if ticker is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(ticker, None)
+
+    def get_stats(self):
+        """Get cache statistics"""
+        with self._lock:
+            return {
+                "tickers": len(self._entries),
+                "max_tickers": self._max_tickers,
+                "rows": sum(len(e['frame']) for e in self._entries.values()),
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+    def _ticker_lock(self, ticker: str) -> Lock:
+        return self._ticker_locks[hash(ticker) % len(self._ticker_locks)]
+
+    def _covering_entry(self, ticker: str, start_day, end_day) -> Optional[Dict]:
+        """Live entry whose range contains [start_day, end_day)"""
+        with self._lock:
+            entry = self._entries.get(ticker)
+            if entry and datetime.utcnow() < entry['expires_at'] \
+                    and entry['start'] <= start_day and end_day <= entry['end']:
+                self._entries.move_to_end(ticker)
+                return entry
+            return None
+
+    def _refresh(self, ticker, start_date, end_date, fetch) -> Optional[Dict]:
+        """Fetch the union of the requested and cached ranges"""
+        with self._lock:
+            previous = self._entries.get(ticker)
+
+        if previous and datetime.utcnow() < previous['expires_at']:
+            start_date = min(start_date, previous['start_date'])
+            end_date = max(end_date, previous['end_date'])
+
+        frame = fetch(ticker, start_date, end_date)
+        if frame is None or frame.empty:
+            return None
+
+        entry = {
+            'frame': frame,
+            'days': day_numbers(frame.index),
+            'start': np.datetime64(start_date.date(), 'D'),
+            'end': np.datetime64(end_date.date(), 'D'),
+            'start_date': start_date,
+            'end_date': end_date,
+            'expires_at': datetime.utcnow() + timedelta(seconds=self._ttl_seconds),
+        }
+        with self._lock:
+            self._entries[ticker] = entry
+            self._entries.move_to_end(ticker)
+            self._evict()
+
+        logger.info(f"📦 Cached {len(frame)} bars for {ticker} ({start_date.date()} ~ {end_date.date()})")
+        return entry
+
+    def _evict(self):
+        """Drop expired entries, then the least recently used beyond the limit (caller holds the lock)"""
+        now = datetime.utcnow()
+        for ticker in [t for t, e in self._entries.items() if now >= e['expires_at']]:
+            del self._entries[ticker]
+        while len(self._entries) > self._max_tickers:
+            self._entries.popitem(last=False)
+
+
+# Global cache instance
+backtest_data_cache = BacktestDataCache()
@@ -1,18 +1,66 @@
 """Backtesting engine for trading strategies"""
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
 import json
 import logging
 import numpy as np
+import pandas as pd
 from collections import defaultdict
 
 from app.models.backtest import BacktestStrategy, BacktestRun, Trade
 from app.models.daily_prediction import DailyPrediction
+from app.services.backtest_core import (
+    DIRECTION_DOWN, DIRECTION_NEUTRAL, DIRECTION_UP, TRADING_DAYS,
+    build_price_panel, daily_returns, drawdown_series, moving_average,
+    moving_average_positions, prediction_positions, sharpe_ratio,
+    simulate_long_only, trades_from_simulation,
+)
+from app.services.backtest_data_cache import backtest_data_cache, day_numbers
+from app.services.leader_election import instance_id
+from app.services.strategy_dsl import StrategyExpressionError, expression_positions, expression_uses_signals
+from app.services.series_storage import decode_series, encode_dates, encode_values, series_from_points
+from app.services.walk_forward import WalkForwardEvaluator
 import yfinance as yf
 
 logger = logging.getLogger(__name__)
 
+# Owner recorded on the runs this process creates and executes
+RUN_OWNER = instance_id()
+
+# Prediction action -> direction code
+ACTION_DIRECTIONS = {
+    'BUY': DIRECTION_UP,
+    'SELL': DIRECTION_DOWN,
+    'HOLD': DIRECTION_NEUTRAL,
+}
+
+
+def strategy_uses_signals(strategy_type: str, params: Optional[Dict]) -> bool:
+    """Whether a strategy reads prediction signals; the others skip the signal lookup"""
+    if strategy_type == "PREDICTION_BASED":
+        return True
+    if strategy_type == "EXPRESSION":
+        try:
+            return expression_uses_signals(params)
+        except StrategyExpressionError:
+            # Invalid expressions fail with a clear error when the strategy runs
+            return False
+    return False
+
+
+def load_equity_series(run: BacktestRun) -> Tuple[np.ndarray, np.ndarray]:
+    """Equity curve of a run as (datetime64[D] dates, float64 values)
+
+    Reads the compact binary columns, falling back to the legacy JSON blob
+    for runs stored before they existed.
+    """
+    if run.equity_dates is not None and run.equity_values is not None:
+        return decode_series(run.equity_dates, run.equity_values)
+    if run.equity_curve:
+        return series_from_points(json.loads(run.equity_curve))
+    return np.zeros(0, dtype='datetime64[D]'), np.zeros(0)
+
 
 class BacktestEngine:
     """Backtesting engine for various trading strategies"""
@@ -38,14 +86,96 @@ class BacktestEngine:
             logger.error(f"Strategy {strategy_id} not found")
             return None
 
+        backtest_run = self._new_run(strategy, ticker, start_date, end_date, status='running')
+        return self._execute(strategy, backtest_run)
+
+    def create_run(
+        self,
+        strategy_id: int,
+        ticker: str,
+        start_date: datetime,
+        end_date: datetime
+    ) -> Optional[BacktestRun]:
+        """Persist a queued run to be executed later by execute_run"""
+        strategy = self.db.query(BacktestStrategy).filter(
+            BacktestStrategy.id == strategy_id
+        ).first()
+
+        if not strategy:
+            logger.error(f"Strategy {strategy_id} not found")
+            return None
+
+        backtest_run = self._new_run(strategy, ticker, start_date, end_date, status='queued')
+        self.db.add(backtest_run)
+        self.db.commit()
+        self.db.refresh(backtest_run)
+        return backtest_run
+
+    def execute_run(
+        self, run_id: int, progress: Optional[Callable[..., None]] = None
+    ) -> Optional[BacktestRun]:
+        """Execute a previously created run, reporting progress via callback"""
+        backtest_run = self.db.query(BacktestRun).filter(BacktestRun.id == run_id).first()
+        if not backtest_run:
+            logger.error(f"Backtest run {run_id} not found")
+            return None
+
+        backtest_run.status = 'running'
+        self.db.commit()
+        return self._execute(backtest_run.strategy, backtest_run, progress)
+
+    def _new_run(
+        self,
+        strategy: BacktestStrategy,
+        ticker: str,
+        start_date: datetime,
+        end_date: datetime,
+        status: str
+    ) -> BacktestRun:
+        """Unsaved run record before execution"""
+        return BacktestRun(
+            strategy_id=strategy.id,
+            ticker=ticker,
+            start_date=start_date,
+            end_date=end_date,
+            duration_days=(end_date - start_date).days,
+            initial_capital=strategy.initial_capital,
+            final_capital=strategy.initial_capital,
+            status=status,
+            worker_id=RUN_OWNER,
+            heartbeat_at=datetime.utcnow(),
+        )
+
+    def _execute(
+        self,
+        strategy: BacktestStrategy,
+        backtest_run: BacktestRun,
+        progress: Optional[Callable[..., None]] = None
+    ) -> Optional[BacktestRun]:
+        """Run the strategy and store results on ``backtest_run``
+
+        ``progress(stage, bars_processed, total_bars, current_equity)`` is
+        called as the run moves through its stages.
+        """
+        ticker = backtest_run.ticker
+        start_date = backtest_run.start_date
+        end_date = backtest_run.end_date
+        report = progress or (lambda *args: None)
+
         try:
             # Get historical data
-            historical_data = self._get_historical_data(ticker, start_date, end_date)
-            if not historical_data or len(historical_data) < 2:
-                logger.error(f"Insufficient historical data for {ticker}")
-                return None
+            report('fetching_data', 0, 0, strategy.initial_capital)
+            params = json.loads(strategy.parameters) if strategy.parameters else {}
+            historical_data = self._get_historical_data(
+                ticker, start_date, end_date,
+                with_signals=strategy_uses_signals(strategy.strategy_type, params),
+            )
+            if not historical_data or len(historical_data['close']) < 2:
+                raise ValueError(f"Insufficient historical data for {ticker}")
 
             # Execute strategy
+            total_bars = len(historical_data['close'])
+            report('simulating', 0, total_bars, strategy.initial_capital)
             trades, equity_curve = self._execute_strategy(
                 strategy, ticker, historical_data, start_date, end_date
             )
@@ -54,41 +184,33 @@ class BacktestEngine:
             metrics = self._calculate_metrics(
                 trades, equity_curve, strategy.initial_capital, historical_data
             )
-
-            # Create backtest run record
-            duration_days = (end_date - start_date).days
-
-            backtest_run = BacktestRun(
-                strategy_id=strategy_id,
-                ticker=ticker,
-                start_date=start_date,
-                end_date=end_date,
-                duration_days=duration_days,
-                initial_capital=strategy.initial_capital,
-                final_capital=metrics['final_capital'],
-                total_return=metrics['total_return'],
-                annualized_return=metrics['annualized_return'],
-                sharpe_ratio=metrics['sharpe_ratio'],
-                max_drawdown=metrics['max_drawdown'],
-                win_rate=metrics['win_rate'],
-                profit_factor=metrics['profit_factor'],
-                total_trades=len(trades),
-                winning_trades=metrics['winning_trades'],
-                losing_trades=metrics['losing_trades'],
-                avg_win=metrics['avg_win'],
-                avg_loss=metrics['avg_loss'],
-                benchmark_return=metrics['benchmark_return'],
-                alpha=metrics['alpha'],
-                trades=json.dumps([self._trade_to_dict(t) for t in trades]),
-                equity_curve=json.dumps(equity_curve),
-                status='completed',
-                completed_at=datetime.utcnow()
-            )
+            report('saving', total_bars, total_bars, metrics['final_capital'])
+
+            backtest_run.final_capital = metrics['final_capital']
+            backtest_run.total_return = metrics['total_return']
+            backtest_run.annualized_return = metrics['annualized_return']
+            backtest_run.sharpe_ratio = metrics['sharpe_ratio']
+            backtest_run.max_drawdown = metrics['max_drawdown']
+            backtest_run.win_rate = metrics['win_rate']
+            backtest_run.profit_factor = metrics['profit_factor']
+            backtest_run.total_trades = len(trades)
+            backtest_run.winning_trades = metrics['winning_trades']
+            backtest_run.losing_trades = metrics['losing_trades']
+            backtest_run.avg_win = metrics['avg_win']
+            backtest_run.avg_loss = metrics['avg_loss']
+            backtest_run.benchmark_return = metrics['benchmark_return']
+            backtest_run.alpha = metrics['alpha']
+            backtest_run.trades = json.dumps([self._trade_to_dict(t) for t in trades])
+            backtest_run.equity_dates = encode_dates(historical_data['dates'])
+            backtest_run.equity_values = encode_values(equity_curve)
+            backtest_run.status = 'completed'
+            backtest_run.completed_at = datetime.utcnow()
 
             self.db.add(backtest_run)
             self.db.commit()
             self.db.refresh(backtest_run)
 
+            report('completed', total_bars, total_bars, metrics['final_capital'])
             logger.info(f"✅ Backtest completed for {ticker}: {metrics['total_return']:.2f}% return")
             return backtest_run
 
@@ -96,99 +218,135 @@ class BacktestEngine:
             logger.error(f"❌ Backtest failed for {ticker}: {e}")
             self.db.rollback()
 
-            # Create failed run record
-            backtest_run = BacktestRun(
-                strategy_id=strategy_id,
-                ticker=ticker,
-                start_date=start_date,
-                end_date=end_date,
-                initial_capital=strategy.initial_capital,
-                final_capital=strategy.initial_capital,
-                status='failed',
-                error_message=str(e)
-            )
+            # Record the failure on the run
+            backtest_run.final_capital = strategy.initial_capital
+            backtest_run.status = 'failed'
+            backtest_run.error_message = str(e)
+            backtest_run.completed_at = datetime.utcnow()
             self.db.add(backtest_run)
             self.db.commit()
+
+            report('failed', 0, 0, strategy.initial_capital)
             return None
 
     def _get_historical_data(
-        self, ticker: str, start_date: datetime, end_date: datetime
-    ) -> List[Dict]:
-        """Get historical price data from yfinance and prediction data"""
+        self, ticker: str, start_date: datetime, end_date: datetime, with_signals: bool = False
+    ) -> Dict[str, np.ndarray]:
+        """
+        Price panel from the shared cache
+
+        Prediction signals are looked up only ``with_signals``; otherwise
+        direction is neutral and confidence 0.5 on every bar.
+        """
         try:
-            # Get historical price data from yfinance
-            stock = yf.Ticker(ticker)
-            hist = stock.history(start=start_date, end=end_date)
+            frame = backtest_data_cache.get(ticker, start_date, end_date, self._load_history_frame)
 
-            if hist.empty:
+            if frame is None or frame.empty:
                 logger.warning(f"No historical data found for {ticker}")
-                return []
-
-            # Get prediction data for the same period
-            predictions = self.db.query(DailyPrediction).filter(
-                DailyPrediction.ticker == ticker,
-                DailyPrediction.prediction_date >= start_date,
-                DailyPrediction.prediction_date <= end_date
-            ).order_by(DailyPrediction.prediction_date).all()
-
-            # Create prediction lookup dict
-            pred_dict = {}
-            for pred in predictions:
-                # Handle both datetime and date objects
-                if hasattr(pred.prediction_date, 'date'):
-                    pred_date = pred.prediction_date.date()
-                else:
-                    pred_date = pred.prediction_date
-
-                # Map action (BUY/SELL/HOLD) to direction (UP/DOWN/NEUTRAL)
-                direction = 'NEUTRAL'
-                if pred.action == 'BUY':
-                    direction = 'UP'
-                elif pred.action == 'SELL':
-                    direction = 'DOWN'
-
-                pred_dict[pred_date] = {
-                    'predicted_direction': direction,
-                    'confidence': pred.confidence
-                }
-
-            # Combine price and prediction data
-            historical_data = []
-            for date_idx, row in hist.iterrows():
-                date = date_idx.to_pydatetime()
-                date_key = date.date()
-
-                # Get prediction data if available
-                pred_data = pred_dict.get(date_key, {
-                    'predicted_direction': 'NEUTRAL',
-                    'confidence': 0.5
-                })
-
-                historical_data.append({
-                    'date': date,
-                    'open': row['Open'],
-                    'high': row['High'],
-                    'low': row['Low'],
-                    'close': row['Close'],
-                    'volume': row['Volume'],
-                    'predicted_direction': pred_data['predicted_direction'],
-                    'confidence': pred_data['confidence']
-                })
-
-            return historical_data
+                return {}
+
+            if with_signals:
+                direction, confidence = self._signal_arrays(ticker, frame.index, start_date, end_date)
+            else:
+                direction = np.full(len(frame), DIRECTION_NEUTRAL, dtype=np.int8)
+                confidence = np.full(len(frame), 0.5)
+
+            return build_price_panel(
+                dates=frame.index.to_pydatetime(),
+                open_=frame['Open'].to_numpy(),
+                high=frame['High'].to_numpy(),
+                low=frame['Low'].to_numpy(),
+                close=frame['Close'].to_numpy(),
+                volume=frame['Volume'].to_numpy(),
+                direction=direction,
+                confidence=confidence,
+            )
 
         except Exception as e:
             logger.error(f"Error getting historical data: {e}")
-            return []
+            return {}
+
+    def _load_history_frame(
+        self, ticker: str, start_date: datetime, end_date: datetime
+    ) -> Optional[pd.DataFrame]:
+        """Download OHLCV prices (cached per ticker, without signals)"""
+        # Get historical price data from yfinance
+        stock = yf.Ticker(ticker)
+        hist = stock.history(start=start_date, end=end_date)
+
+        if hist.empty:
+            return None
+
+        return hist[['Open', 'High', 'Low', 'Close', 'Volume']].copy()
+
+    def _signal_arrays(
+        self, ticker: str, index: pd.DatetimeIndex, start_date: datetime, end_date: datetime
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Prediction (direction, confidence) aligned to the bars in ``index``"""
+        days = pd.DatetimeIndex(day_numbers(index))
+        aligned = self._get_prediction_signals(ticker, start_date, end_date).reindex(days)
+        return (
+            aligned['direction'].fillna(DIRECTION_NEUTRAL).to_numpy(dtype=np.int8),
+            aligned['confidence'].fillna(0.5).to_numpy(dtype=np.float64),
+        )
+
+    def _get_prediction_signals(
+        self, ticker: str, start_date: datetime, end_date: datetime
+    ) -> pd.DataFrame:
+        """
+        Per-day (direction, confidence) for the range, indexed by day
+
+        Walk-forward model signals cover every trading day the model could
+        have predicted; live DailyPrediction rows override them.
+        """
+        predictions = self.db.query(
+            DailyPrediction.prediction_date,
+            DailyPrediction.action,
+            DailyPrediction.confidence,
+        ).filter(
+            DailyPrediction.ticker == ticker,
+            DailyPrediction.prediction_date >= start_date.date(),
+            DailyPrediction.prediction_date <= end_date.date()
+        ).order_by(DailyPrediction.prediction_date).all()
+
+        columns = ['signal_date', 'action', 'confidence']
+        frames = [pd.DataFrame(predictions, columns=columns)]
+        model = self._get_model_signals(ticker, start_date, end_date)
+        if not model.empty:
+            frames.insert(0, model.rename_axis('signal_date').reset_index()[columns])
+
+        signals = pd.concat(frames, ignore_index=True)
+        signals['signal_date'] = pd.to_datetime(signals['signal_date']).dt.normalize()
+        # Later rows (live predictions) win for the same day
+        signals = signals.drop_duplicates('signal_date', keep='last').set_index('signal_date')
+        signals['direction'] = signals['action'].map(ACTION_DIRECTIONS).fillna(DIRECTION_NEUTRAL)
+        return signals[['direction', 'confidence']]
+
+    def _get_model_signals(
+        self, ticker: str, start_date: datetime, end_date: datetime
+    ) -> pd.DataFrame:
+        """
+        Stored walk-forward model signals for the range (empty if unavailable)
+
+        Never replays the model here: replays run in the refresh_model_signals
+        job or through /predictions/{ticker}/signals.
+        """
+        try:
+            return WalkForwardEvaluator(self.db).get_signals(
+                ticker, start_date.date(), end_date.date(), refresh=False
+            )
+        except Exception as e:
+            logger.warning(f"Walk-forward signals unavailable for {ticker}: {e}")
+            return pd.DataFrame(columns=['action', 'confidence'])
 
     def _execute_strategy(
         self,
         strategy: BacktestStrategy,
         ticker: str,
-        historical_data: List[Dict],
+        historical_data: Dict[str, np.ndarray],
         start_date: datetime,
         end_date: datetime
-    ) -> Tuple[List[Dict], List[Dict]]:
+    ) -> Tuple[List[Dict], np.ndarray]:
         """Execute trading strategy and return trades and equity curve"""
 
         strategy_type = strategy.strategy_type
@@ -200,215 +358,81 @@ class BacktestEngine:
             return self._moving_average_strategy(strategy, ticker, historical_data, params)
         elif strategy_type == "PREDICTION_BASED":
             return self._prediction_based_strategy(strategy, ticker, historical_data, params)
+        elif strategy_type == "EXPRESSION":
+            return self._expression_strategy(strategy, ticker, historical_data, params)
         else:
             logger.warning(f"Unknown strategy type: {strategy_type}, using buy-and-hold")
             return self._buy_and_hold_strategy(strategy, ticker, historical_data)
 
+    def _simulate(
+        self,
+        strategy: BacktestStrategy,
+        ticker: str,
+        data: Dict[str, np.ndarray],
+        position: np.ndarray,
+        position_size_pct: float
+    ) -> Tuple[List[Dict], np.ndarray]:
+        """Run the vectorized simulation for a position array"""
+        simulation = simulate_long_only(
+            data['close'], position, strategy.initial_capital, position_size_pct
+        )
+        trades = trades_from_simulation(ticker, data['dates'], data['close'], simulation)
+        return trades, simulation['equity']
+
     def _buy_and_hold_strategy(
-        self, strategy: BacktestStrategy, ticker: str, data: List[Dict]
-    ) -> Tuple[List[Dict], List[Dict]]:
+        self, strategy: BacktestStrategy, ticker: str, data: Dict[str, np.ndarray]
+    ) -> Tuple[List[Dict], np.ndarray]:
         """Simple buy-and-hold strategy"""
-        trades = []
-        equity_curve = []
-
         if not data:
-            return trades, equity_curve
-
-        # Buy at start
-        entry_price = data[0]['close']
-        shares = strategy.initial_capital / entry_price
-
-        trade = {
-            'ticker': ticker,
-            'entry_date': data[0]['date'],
-            'entry_price': entry_price,
-            'shares': shares,
-            'direction': 'LONG'
-        }
+            return [], np.zeros(0)
 
-        # Track equity
-        for i, day in enumerate(data):
-            portfolio_value = shares * day['close']
-            equity_curve.append({
-                'date': day['date'].isoformat(),
-                'value': portfolio_value
-            })
-
-        # Sell at end
-        exit_price = data[-1]['close']
-        trade['exit_date'] = data[-1]['date']
-        trade['exit_price'] = exit_price
-        trade['profit_loss'] = (exit_price - entry_price) * shares
-        trade['profit_loss_pct'] = ((exit_price - entry_price) / entry_price) * 100
-        trade['holding_days'] = (trade['exit_date'] - trade['entry_date']).days
-        trade['exit_reason'] = 'END_OF_PERIOD'
-
-        trades.append(trade)
-        return trades, equity_curve
+        # Fully invested from the first bar to the end of the period
+        position = np.ones(len(data['close']), dtype=bool)
+        return self._simulate(strategy, ticker, data, position, 100.0)
 
     def _moving_average_strategy(
-        self, strategy: BacktestStrategy, ticker: str, data: List[Dict], params: Dict
-    ) -> Tuple[List[Dict], List[Dict]]:
+        self, strategy: BacktestStrategy, ticker: str, data: Dict[str, np.ndarray], params: Dict
+    ) -> Tuple[List[Dict], np.ndarray]:
         """Moving average crossover strategy"""
         short_window = params.get('short_window', 20)
         long_window = params.get('long_window', 50)
 
-        trades = []
-        equity_curve = []
-        cash = strategy.initial_capital
-        position = None
-
-        # Calculate moving averages
-        closes = [d['close'] for d in data]
-        short_ma = self._moving_average(closes, short_window)
-        long_ma = self._moving_average(closes, long_window)
-
-        for i, day in enumerate(data):
-            if i < long_window:
-                equity_curve.append({
-                    'date': day['date'].isoformat(),
-                    'value': cash
-                })
-                continue
-
-            # Trading signals
-            if short_ma[i] > long_ma[i] and (i == 0 or short_ma[i-1] <= long_ma[i-1]):
-                # Buy signal
-                if position is None and cash > 0:
-                    position_size = cash * (strategy.position_size_pct / 100)
-                    shares = position_size / day['close']
-
-                    position = {
-                        'ticker': ticker,
-                        'entry_date': day['date'],
-                        'entry_price': day['close'],
-                        'shares': shares,
-                        'direction': 'LONG'
-                    }
-                    cash -= position_size
-
-            elif short_ma[i] < long_ma[i] and (i == 0 or short_ma[i-1] >= long_ma[i-1]):
-                # Sell signal
-                if position is not None:
-                    exit_price = day['close']
-                    position['exit_date'] = day['date']
-                    position['exit_price'] = exit_price
-                    position['profit_loss'] = (exit_price - position['entry_price']) * position['shares']
-                    position['profit_loss_pct'] = ((exit_price - position['entry_price']) / position['entry_price']) * 100
-                    position['holding_days'] = (position['exit_date'] - position['entry_date']).days
-                    position['exit_reason'] = 'SIGNAL'
-
-                    trades.append(position)
-                    cash += position['shares'] * exit_price
-                    position = None
-
-            # Calculate portfolio value
-            portfolio_value = cash
-            if position:
-                portfolio_value += position['shares'] * day['close']
-
-            equity_curve.append({
-                'date': day['date'].isoformat(),
-                'value': portfolio_value
-            })
-
-        # Close any open position at end
-        if position:
-            exit_price = data[-1]['close']
-            position['exit_date'] = data[-1]['date']
-            position['exit_price'] = exit_price
-            position['profit_loss'] = (exit_price - position['entry_price']) * position['shares']
-            position['profit_loss_pct'] = ((exit_price - position['entry_price']) / position['entry_price']) * 100
-            position['holding_days'] = (position['exit_date'] - position['entry_date']).days
-            position['exit_reason'] = 'END_OF_PERIOD'
-            trades.append(position)
-
-        return trades, equity_curve
+        position = moving_average_positions(data['close'], short_window, long_window)
+        return self._simulate(strategy, ticker, data, position, strategy.position_size_pct)
 
     def _prediction_based_strategy(
-        self, strategy: BacktestStrategy, ticker: str, data: List[Dict], params: Dict
-    ) -> Tuple[List[Dict], List[Dict]]:
+        self, strategy: BacktestStrategy, ticker: str, data: Dict[str, np.ndarray], params: Dict
+    ) -> Tuple[List[Dict], np.ndarray]:
         """Strategy based on ML predictions"""
         confidence_threshold = params.get('confidence_threshold', 0.7)
 
-        trades = []
-        equity_curve = []
-        cash = strategy.initial_capital
-        position = None
-
-        for i, day in enumerate(data):
-            predicted_direction = day.get('predicted_direction', 'NEUTRAL')
-            confidence = day.get('confidence', 0.5)
-
-            # Buy signal: UP prediction with high confidence
-            if predicted_direction == 'UP' and confidence >= confidence_threshold:
-                if position is None and cash > 0:
-                    position_size = cash * (strategy.position_size_pct / 100)
-                    shares = position_size / day['close']
-
-                    position = {
-                        'ticker': ticker,
-                        'entry_date': day['date'],
-                        'entry_price': day['close'],
-                        'shares': shares,
-                        'direction': 'LONG'
-                    }
-                    cash -= position_size
-
-            # Sell signal: DOWN prediction or low confidence
-            elif (predicted_direction == 'DOWN' or confidence < confidence_threshold * 0.8):
-                if position is not None:
-                    exit_price = day['close']
-                    position['exit_date'] = day['date']
-                    position['exit_price'] = exit_price
-                    position['profit_loss'] = (exit_price - position['entry_price']) * position['shares']
-                    position['profit_loss_pct'] = ((exit_price - position['entry_price']) / position['entry_price']) * 100
-                    position['holding_days'] = (position['exit_date'] - position['entry_date']).days
-                    position['exit_reason'] = 'SIGNAL'
-
-                    trades.append(position)
-                    cash += position['shares'] * exit_price
-                    position = None
-
-            # Calculate portfolio value
-            portfolio_value = cash
-            if position:
-                portfolio_value += position['shares'] * day['close']
-
-            equity_curve.append({
-                'date': day['date'].isoformat(),
-                'value': portfolio_value
-            })
-
-        # Close any open position at end
-        if position:
-            exit_price = data[-1]['close']
-            position['exit_date'] = data[-1]['date']
-            position['exit_price'] = exit_price
-            position['profit_loss'] = (exit_price - position['entry_price']) * position['shares']
-            position['profit_loss_pct'] = ((exit_price - position['entry_price']) / position['entry_price']) * 100
-            position['holding_days'] = (position['exit_date'] - position['entry_date']).days
-            position['exit_reason'] = 'END_OF_PERIOD'
-            trades.append(position)
-
-        return trades, equity_curve
-
-    def _moving_average(self, data: List[float], window: int) -> List[float]:
+        # Buy on confident UP predictions, sell on DOWN or low confidence
+        position = prediction_positions(
+            data['direction'], data['confidence'], confidence_threshold
+        )
+        return self._simulate(strategy, ticker, data, position, strategy.position_size_pct)
+
+    def _expression_strategy(
+        self, strategy: BacktestStrategy, ticker: str, data: Dict[str, np.ndarray], params: Dict
+    ) -> Tuple[List[Dict], np.ndarray]:
+        """User-defined strategy from entry/exit signal expressions"""
+        position = expression_positions(data, params)
+        return self._simulate(strategy, ticker, data, position, strategy.position_size_pct)
+
+    def _moving_average(self, data: np.ndarray, window: int) -> np.ndarray:
         """Calculate moving average"""
-        ma = []
-        for i in range(len(data)):
-            if i < window - 1:
-                ma.append(data[i])
-            else:
-                ma.append(sum(data[i-window+1:i+1]) / window)
-        return ma
+        return moving_average(data, window)
 
     def _calculate_metrics(
-        self, trades: List[Dict], equity_curve: List[Dict], initial_capital: float, data: List[Dict]
+        self,
+        trades: List[Dict],
+        equity_curve: np.ndarray,
+        initial_capital: float,
+        data: Dict[str, np.ndarray]
     ) -> Dict:
         """Calculate performance metrics"""
 
-        if not equity_curve:
+        if len(equity_curve) == 0:
             return {
                 'final_capital': initial_capital,
                 'total_return': 0.0,
@@ -425,38 +449,19 @@ class BacktestEngine:
                 'alpha': 0.0
             }
 
-        final_capital = equity_curve[-1]['value']
+        final_capital = float(equity_curve[-1])
         total_return = ((final_capital - initial_capital) / initial_capital) * 100
 
         # Annualized return
-        years = len(equity_curve) / 252  # Trading days per year
+        years = len(equity_curve) / TRADING_DAYS
         if years > 0:
             annualized_return = (((final_capital / initial_capital) ** (1 / years)) - 1) * 100
         else:
             annualized_return = total_return
 
-        # Sharpe ratio
-        returns = []
-        for i in range(1, len(equity_curve)):
-            daily_return = (equity_curve[i]['value'] - equity_curve[i-1]['value']) / equity_curve[i-1]['value']
-            returns.append(daily_return)
-
-        if returns and len(returns) > 1:
-            avg_return = np.mean(returns)
-            std_return = np.std(returns)
-            sharpe_ratio = (avg_return / std_return) * np.sqrt(252) if std_return > 0 else 0.0
-        else:
-            sharpe_ratio = 0.0
-
-        # Maximum drawdown
-        peak = equity_curve[0]['value']
-        max_drawdown = 0.0
-        for point in equity_curve:
-            if point['value'] > peak:
-                peak = point['value']
-            drawdown = ((peak - point['value']) / peak) * 100
-            if drawdown > max_drawdown:
-                max_drawdown = drawdown
+        # Sharpe ratio and maximum drawdown
+        sharpe = sharpe_ratio(daily_returns(equity_curve))
+        max_drawdown = max(0.0, float(np.max(drawdown_series(equity_curve))))
 
         # Trade statistics
         winning_trades = [t for t in trades if t.get('profit_loss', 0) > 0]
@@ -471,8 +476,9 @@ class BacktestEngine:
         profit_factor = total_wins / total_losses if total_losses > 0 else 0.0
 
         # Benchmark (buy-and-hold)
-        if data and len(data) >= 2:
-            benchmark_return = ((data[-1]['close'] - data[0]['close']) / data[0]['close']) * 100
+        close = data.get('close') if data else None
+        if close is not None and len(close) >= 2:
+            benchmark_return = float(((close[-1] - close[0]) / close[0]) * 100)
         else:
             benchmark_return = 0.0
 
@@ -482,7 +488,7 @@ class BacktestEngine:
             'final_capital': final_capital,
             'total_return': total_return,
             'annualized_return': annualized_return,
-            'sharpe_ratio': sharpe_ratio,
+            'sharpe_ratio': sharpe,
             'max_drawdown': max_drawdown,
             'win_rate': win_rate,
             'profit_factor': profit_factor,
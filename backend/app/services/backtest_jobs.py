@@ -0,0 +1,201 @@
+"""Background execution of backtest runs with in-process progress tracking"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Event, Lock, Thread
+from typing import Dict, List, Optional
+import logging
+
+from sqlalchemy import or_
+
+from app.database import SessionLocal
+from app.models.backtest import BacktestRun
+from app.services.backtest_engine import RUN_OWNER, BacktestEngine
+
+logger = logging.getLogger(__name__)
+
+# Backtests are mostly download-bound; keep them off the API worker threads
+MAX_BACKTEST_WORKERS = 4
+
+# Terminal statuses after which a progress stream ends
+FINISHED_STATUSES = ('completed', 'failed')
+
+# Runs in these statuses still need a worker
+UNFINISHED_STATUSES = ('queued', 'running')
+
+ORPHANED_RUN_MESSAGE = "The server process running it stopped before it finished; run it again"
+
+# The owning process renews its unfinished runs at this interval (in seconds)
+RUN_HEARTBEAT_SECONDS = 15
+
+# A run whose owner missed heartbeats for this long is orphaned (in seconds)
+RUN_LEASE_SECONDS = 60
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = Lock()
+
+
+def get_backtest_executor() -> ThreadPoolExecutor:
+    """Shared bounded worker pool for all backtest jobs"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=MAX_BACKTEST_WORKERS, thread_name_prefix="backtest"
+            )
+        return _executor
+
+
+class BacktestProgressRegistry:
+    """Thread-safe latest-progress snapshot per run id"""
+
+    def __init__(self):
+        self._progress: Dict[int, Dict] = {}
+        self._lock = Lock()
+
+    def update(self, run_id: int, **fields):
+        """Merge fields into the run's progress snapshot"""
+        with self._lock:
+            snapshot = dict(self._progress.get(run_id, {'run_id': run_id}))
+            snapshot.update(fields)
+            snapshot['updated_at'] = datetime.utcnow().isoformat()
+            self._progress[run_id] = snapshot
+
+    def get(self, run_id: int) -> Optional[Dict]:
+        """Copy of the latest snapshot, or None if this process never ran it"""
+        with self._lock:
+            snapshot = self._progress.get(run_id)
+            return dict(snapshot) if snapshot else None
+
+    def discard(self, run_id: int):
+        """Forget a run's progress"""
+        with self._lock:
+            self._progress.pop(run_id, None)
+
+
+# Global registry instance
+backtest_progress = BacktestProgressRegistry()
+
+
+def _execute_job(run_id: int):
+    """Worker entry point: own DB session, progress reported to the registry"""
+    def report(stage: str, bars_processed: int, total_bars: int, current_equity: float):
+        status = stage if stage in FINISHED_STATUSES else 'running'
+        backtest_progress.update(
+            run_id,
+            status=status,
+            stage=stage,
+            bars_processed=bars_processed,
+            total_bars=total_bars,
+            current_equity=round(float(current_equity), 2),
+        )
+
+    db = SessionLocal()
+    try:
+        run = BacktestEngine(db).execute_run(run_id, progress=report)
+        if run is None and (backtest_progress.get(run_id) or {}).get('status') != 'failed':
+            backtest_progress.update(run_id, status='failed', stage='failed')
+    except Exception as e:
+        logger.error(f"❌ Backtest job {run_id} crashed: {e}")
+        backtest_progress.update(run_id, status='failed', stage='failed', error_message=str(e))
+    finally:
+        db.close()
+
+
+def submit_backtest(run_id: int):
+    """Queue a created (status 'queued') run for background execution"""
+    backtest_progress.update(
+        run_id, status='queued', stage='queued',
+        bars_processed=0, total_bars=0, current_equity=None
+    )
+    get_backtest_executor().submit(_execute_job, run_id)
+
+
+def submit_backtests(run_ids: List[int]):
+    """Queue a batch of runs on the shared worker pool"""
+    for run_id in run_ids:
+        submit_backtest(run_id)
+
+
+def renew_run_heartbeats() -> int:
+    """Extend the lease of every unfinished run this process owns"""
+    db = SessionLocal()
+    try:
+        renewed = db.query(BacktestRun).filter(
+            BacktestRun.worker_id == RUN_OWNER,
+            BacktestRun.status.in_(UNFINISHED_STATUSES),
+        ).update({BacktestRun.heartbeat_at: datetime.utcnow()}, synchronize_session=False)
+        db.commit()
+        return renewed
+    finally:
+        db.close()
+
+
+def fail_orphaned_runs() -> int:
+    """
+    Mark queued/running runs whose owner stopped heartbeating as failed
+
+    Jobs live only in the executor of the process that created them, so a
+    run whose owner died (restart, crash, scale-down) would stay queued or
+    running forever. Runs of live processes keep a fresh heartbeat_at and
+    are never touched, so every process can run this safely. Expiry uses
+    each process's clock; hosts must be NTP-synced well within the lease.
+
+    Returns:
+        Number of runs marked failed
+    """
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        failed = db.query(BacktestRun).filter(
+            BacktestRun.status.in_(UNFINISHED_STATUSES),
+            or_(
+                BacktestRun.heartbeat_at.is_(None),
+                BacktestRun.heartbeat_at < now - timedelta(seconds=RUN_LEASE_SECONDS),
+            ),
+        ).update({
+            BacktestRun.status: 'failed',
+            BacktestRun.error_message: ORPHANED_RUN_MESSAGE,
+            BacktestRun.completed_at: now,
+        }, synchronize_session=False)
+        db.commit()
+        if failed:
+            logger.warning(f"⚠️ Marked {failed} orphaned backtest runs as failed")
+        return failed
+    finally:
+        db.close()
+
+
+class RunHeartbeat:
+    """Background thread renewing this process's runs and failing orphaned ones"""
+
+    def __init__(self, interval_seconds: int = RUN_HEARTBEAT_SECONDS):
+        self.interval_seconds = interval_seconds
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    def start(self):
+        """Start heartbeating in the background (idempotent)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="backtest-heartbeat", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval_seconds + 5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                renew_run_heartbeats()
+                fail_orphaned_runs()
+            except Exception as e:
+                logger.error(f"❌ Backtest run heartbeat failed: {e}")
+            self._stop.wait(self.interval_seconds)
+
+
+# Global heartbeat instance
+run_heartbeat = RunHeartbeat()
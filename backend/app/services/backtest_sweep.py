@@ -0,0 +1,290 @@
+"""Parameter sweep (grid) backtests executed across a process pool"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import product
+from threading import Lock
+from typing import Dict, List, Optional
+import json
+import logging
+import os
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.backtest import BacktestSweep
+from app.services.backtest_core import (
+    moving_average_positions, prediction_positions, simulate_long_only, summary_metrics,
+)
+from app.services.strategy_dsl import expression_positions, validate_expression_parameters
+from app.services.backtest_engine import BacktestEngine, strategy_uses_signals
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on (ticker x parameter combination) cells per sweep
+MAX_SWEEP_CELLS = 5000
+
+# Metrics a sweep can be ranked by; drawdown ranks ascending
+RANK_METRICS = {
+    'sharpe_ratio': True,
+    'total_return': True,
+    'annualized_return': True,
+    'max_drawdown': False,
+    'win_rate': True,
+}
+
+# Number of ranked rows persisted in the sweep summary
+SUMMARY_TOP_N = 20
+
+# Worker processes; each ticker's grid is split into about this many chunks
+SWEEP_WORKERS = os.cpu_count() or 2
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Shared process pool for CPU-bound backtest work"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=SWEEP_WORKERS)
+        return _process_pool
+
+
+def expand_grid(parameter_grid: Dict[str, List]) -> List[Dict]:
+    """Cartesian product of a {param: [values]} grid as a list of param dicts"""
+    names = list(parameter_grid.keys())
+    return [dict(zip(names, values)) for values in product(*parameter_grid.values())]
+
+
+def split_combinations(combinations: List[Dict], chunks: int) -> List[List[Dict]]:
+    """Interleaved split into at most ``chunks`` non-empty lists of similar cost"""
+    chunks = max(1, min(chunks, len(combinations)))
+    return [combinations[i::chunks] for i in range(chunks)]
+
+
+def _strategy_position(
+    strategy_type: str, panel: Dict[str, np.ndarray], params: Dict
+) -> Optional[np.ndarray]:
+    """Position array for a built-in strategy, or None for an invalid combination"""
+    if strategy_type == "BUY_AND_HOLD":
+        return np.ones(len(panel['close']), dtype=bool)
+    elif strategy_type == "MOVING_AVERAGE":
+        short_window = int(params.get('short_window', 20))
+        long_window = int(params.get('long_window', 50))
+        if short_window < 1 or short_window >= long_window:
+            return None
+        return moving_average_positions(panel['close'], short_window, long_window)
+    elif strategy_type == "PREDICTION_BASED":
+        return prediction_positions(
+            panel['direction'], panel['confidence'],
+            float(params.get('confidence_threshold', 0.7))
+        )
+    elif strategy_type == "EXPRESSION":
+        return expression_positions(panel, params)
+    raise ValueError(f"Unsupported strategy type for sweep: {strategy_type}")
+
+
+def run_sweep_chunk(
+    strategy_type: str,
+    ticker: str,
+    panel: Dict[str, np.ndarray],
+    combinations: List[Dict],
+    initial_capital: float,
+    position_size_pct: float,
+    base_parameters: Optional[Dict] = None,
+) -> List[Dict]:
+    """
+    Run a chunk of parameter combinations for one ticker
+
+    Executed inside a worker process, so the price panel is shipped once per
+    chunk rather than once per grid cell. ``base_parameters`` are fixed
+    values (e.g. EXPRESSION entry/exit) shared by every combination.
+    """
+    if strategy_type == "BUY_AND_HOLD":
+        position_size_pct = 100.0
+
+    rows = []
+    for params in combinations:
+        position = _strategy_position(strategy_type, panel, {**(base_parameters or {}), **params})
+        if position is None:
+            continue
+
+        simulation = simulate_long_only(
+            panel['close'], position, initial_capital, position_size_pct
+        )
+        metrics = summary_metrics(panel['close'], simulation, initial_capital)
+        rows.append({'ticker': ticker, 'parameters': params, **metrics})
+    return rows
+
+
+def build_heatmap(
+    rows: List[Dict], parameter_grid: Dict[str, List], metric: str
+) -> Optional[Dict]:
+    """
+    Heatmap-ready matrix of ``metric`` over the first two grid parameters
+
+    Cells are averaged across tickers and, when the grid has more than two
+    parameters, the best value over the remaining ones is kept. Invalid
+    combinations are None.
+    """
+    names = list(parameter_grid.keys())
+    if not names:
+        return None
+
+    x_param = names[0]
+    y_param = names[1] if len(names) > 1 else None
+    x_values = list(parameter_grid[x_param])
+    y_values = list(parameter_grid[y_param]) if y_param else [None]
+    higher_is_better = RANK_METRICS[metric]
+
+    # Average across tickers per full parameter combination
+    per_combo: Dict[str, List[float]] = {}
+    combo_params: Dict[str, Dict] = {}
+    for row in rows:
+        key = json.dumps(row['parameters'], sort_keys=True)
+        per_combo.setdefault(key, []).append(row[metric])
+        combo_params[key] = row['parameters']
+
+    matrix = np.full((len(x_values), len(y_values)), np.nan)
+    for key, values in per_combo.items():
+        params = combo_params[key]
+        i = x_values.index(params[x_param])
+        j = y_values.index(params[y_param]) if y_param else 0
+        value = float(np.mean(values))
+        current = matrix[i, j]
+        if np.isnan(current) or (value > current if higher_is_better else value < current):
+            matrix[i, j] = value
+
+    return {
+        'metric': metric,
+        'x_param': x_param,
+        'y_param': y_param,
+        'x_values': x_values,
+        'y_values': y_values if y_param else [],
+        'values': [[None if np.isnan(v) else round(float(v), 4) for v in row] for row in matrix],
+    }
+
+
+class BacktestSweepService:
+    """Grid backtests: load each ticker once, fan runs out across processes"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.engine = BacktestEngine(db)
+
+    def run_sweep(
+        self,
+        strategy_type: str,
+        tickers: List[str],
+        parameter_grid: Dict[str, List],
+        start_date: datetime,
+        end_date: datetime,
+        initial_capital: float = 100000.0,
+        position_size_pct: float = 100.0,
+        rank_by: str = 'sharpe_ratio',
+        base_parameters: Optional[Dict] = None,
+    ) -> Dict:
+        """
+        Execute a parameter sweep and persist a summary
+
+        Args:
+            base_parameters: fixed parameters merged into every grid
+                combination, e.g. the entry/exit of an EXPRESSION strategy
+
+        Returns:
+            Dict with sweep id, ranked results, heatmap and skipped tickers
+        """
+        if rank_by not in RANK_METRICS:
+            raise ValueError(f"rank_by must be one of {list(RANK_METRICS)}")
+
+        combinations = expand_grid(parameter_grid)
+        total_cells = len(combinations) * len(tickers)
+        if total_cells == 0:
+            raise ValueError("Sweep needs at least one ticker and one parameter combination")
+        if total_cells > MAX_SWEEP_CELLS:
+            raise ValueError(f"Sweep too large: {total_cells} cells (max {MAX_SWEEP_CELLS})")
+        if strategy_type == "EXPRESSION":
+            # Fail fast on syntax errors instead of inside every worker
+            validate_expression_parameters({**(base_parameters or {}), **combinations[0]})
+
+        # Prediction signals are looked up only if some combination reads them
+        with_signals = any(
+            strategy_uses_signals(strategy_type, {**(base_parameters or {}), **combination})
+            for combination in combinations
+        )
+
+        # Load each price series exactly once
+        panels = {}
+        skipped = []
+        for ticker in tickers:
+            panel = self.engine._get_historical_data(ticker, start_date, end_date, with_signals=with_signals)
+            if not panel or len(panel['close']) < 2:
+                skipped.append(ticker)
+                continue
+            panels[ticker] = panel
+
+        # One task per (ticker, chunk) so even a single-ticker grid uses every
+        # worker; workers only need numeric arrays, not datetime objects
+        pool = get_process_pool()
+        chunks = split_combinations(combinations, SWEEP_WORKERS)
+        futures = [
+            pool.submit(
+                run_sweep_chunk,
+                strategy_type,
+                ticker,
+                {k: v for k, v in panel.items() if k != 'dates'},
+                chunk,
+                initial_capital,
+                position_size_pct,
+                base_parameters,
+            )
+            for ticker, panel in panels.items()
+            for chunk in chunks
+        ]
+
+        rows = []
+        for future in futures:
+            rows.extend(future.result())
+
+        reverse = RANK_METRICS[rank_by]
+        rows.sort(key=lambda r: r[rank_by], reverse=reverse)
+        for rank, row in enumerate(rows, start=1):
+            row['rank'] = rank
+
+        heatmap = build_heatmap(rows, parameter_grid, rank_by)
+        best = rows[0] if rows else None
+
+        sweep = BacktestSweep(
+            strategy_type=strategy_type,
+            tickers=json.dumps(tickers),
+            parameter_grid=json.dumps(parameter_grid),
+            start_date=start_date,
+            end_date=end_date,
+            rank_by=rank_by,
+            total_runs=len(rows),
+            best_ticker=best['ticker'] if best else None,
+            best_parameters=json.dumps(best['parameters']) if best else None,
+            best_sharpe_ratio=best['sharpe_ratio'] if best else None,
+            best_total_return=best['total_return'] if best else None,
+            summary=json.dumps({
+                'top_results': rows[:SUMMARY_TOP_N],
+                'heatmap': heatmap,
+                'base_parameters': base_parameters,
+            }),
+        )
+        self.db.add(sweep)
+        self.db.commit()
+        self.db.refresh(sweep)
+
+        logger.info(f"✅ Sweep {sweep.id} completed: {len(rows)} runs over {len(panels)} tickers")
+
+        return {
+            'sweep_id': sweep.id,
+            'strategy_type': strategy_type,
+            'total_runs': len(rows),
+            'rank_by': rank_by,
+            'skipped_tickers': skipped,
+            'results': rows,
+            'heatmap': heatmap,
+        }
@@ -0,0 +1,54 @@
+"""Bounded worker pool for blocking work called from async code"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from threading import Lock
+from typing import Callable, Optional, TypeVar
+import asyncio
+
+from app.database import SessionLocal
+from app.services.tracing import propagate
+
+# yfinance downloads, SQLAlchemy queries and NumPy work of async services
+MAX_BLOCKING_WORKERS = 8
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = Lock()
+
+
+def get_blocking_executor() -> ThreadPoolExecutor:
+    """Shared bounded pool so async handlers never block the event loop"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=MAX_BLOCKING_WORKERS, thread_name_prefix="blocking"
+            )
+        return _executor
+
+
+async def run_blocking(func: Callable[..., T], *args, **kwargs) -> T:
+    """Run a synchronous callable on the blocking pool and await its result
+
+    A SQLAlchemy session passed along is used from the worker thread; it
+    must not be used by another task until the call returns.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_blocking_executor(), propagate(partial(func, *args, **kwargs)))
+
+
+async def run_with_session(func: Callable[..., T], *args, **kwargs) -> T:
+    """Run ``func(db, *args)`` on the blocking pool with its own DB session
+
+    For work that runs concurrently with other tasks of the same request,
+    which therefore cannot share the request's session.
+    """
+    def call():
+        db = SessionLocal()
+        try:
+            return func(db, *args, **kwargs)
+        finally:
+            db.close()
+
+    return await run_blocking(call)
@@ -1,18 +1,29 @@
 """Simple in-memory cache for frequently accessed data"""
-from typing import Any, Optional
+from typing import Any, Dict, Iterable, List, Optional
 from datetime import datetime, timedelta
 from threading import Lock
 
+from app.services.metrics import record_cache_lookup
+
 
 class SimpleCache:
     """Thread-safe in-memory cache with TTL support"""
 
-    def __init__(self):
+    def __init__(self, name: str = "default"):
+        self.name = name  # Metrics label for hit/miss counts
         self._cache = {}
         self._lock = Lock()
 
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache if not expired"""
+        value = self._get(key)
+        if value is None:
+            record_cache_lookup(self.name, 0, 1)
+        else:
+            record_cache_lookup(self.name, 1)
+        return value
+
+    def _get(self, key: str) -> Optional[Any]:
         with self._lock:
             if key in self._cache:
                 value, expires_at = self._cache[key]
@@ -29,6 +40,35 @@ class SimpleCache:
             expires_at = datetime.utcnow() + timedelta(seconds=ttl_seconds)
             self._cache[key] = (value, expires_at)
 
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get every unexpired value among keys under a single lock acquisition"""
+        keys = list(keys)
+        found = self._get_many(keys)
+        record_cache_lookup(self.name, len(found), len(keys) - len(found))
+        return found
+
+    def _get_many(self, keys: List[str]) -> Dict[str, Any]:
+        with self._lock:
+            current_time = datetime.utcnow()
+            found = {}
+            for key in keys:
+                entry = self._cache.get(key)
+                if entry is None:
+                    continue
+                value, expires_at = entry
+                if current_time < expires_at:
+                    found[key] = value
+                else:
+                    del self._cache[key]
+            return found
+
+    def set_many(self, items: Dict[str, Any], ttl_seconds: int):
+        """Set several values with the same TTL"""
+        with self._lock:
+            expires_at = datetime.utcnow() + timedelta(seconds=ttl_seconds)
+            for key, value in items.items():
+                self._cache[key] = (value, expires_at)
+
     def delete(self, key: str):
         """Delete value from cache"""
         with self._lock:
@@ -119,9 +159,10 @@ class RateLimitCircuitBreaker:
 
 
 # Global cache instances
-stock_info_cache = SimpleCache()  # Stock info cache (1 hour TTL)
-stock_quote_cache = SimpleCache()  # Stock quote cache (5 minutes TTL)
-analyst_targets_cache = SimpleCache()  # Analyst targets cache (1 hour TTL)
+stock_info_cache = SimpleCache("stock_info")  # Stock info cache (1 hour TTL)
+stock_quote_cache = SimpleCache("stock_quote")  # Stock quote cache (5 minutes TTL)
+analyst_targets_cache = SimpleCache("analyst_targets")  # Analyst targets cache (1 hour TTL)
+insights_recommendations_cache = SimpleCache("insights_recommendations")  # Per-portfolio insight recommendations (5 minutes TTL)
 
 # Rate limit circuit breaker for Yahoo Finance API
 yfinance_circuit_breaker = RateLimitCircuitBreaker(cooldown_seconds=300)  # 5 minute cooldown
@@ -131,3 +172,7 @@ yfinance_circuit_breaker = RateLimitCircuitBreaker(cooldown_seconds=300)  # 5 mi
 STOCK_INFO_TTL = 3600  # 1 hour
 STOCK_QUOTE_TTL = 300  # 5 minutes
 ANALYST_TARGETS_TTL = 3600  # 1 hour
+PREDICTION_SUMMARY_TTL = 900  # 15 minutes (treemap and sector views)
+ACCURACY_DASHBOARD_TTL = 3600  # 1 hour (validations run once a day)
+BACKTEST_RESULT_TTL = 86400  # 1 day (completed runs never change)
+INSIGHTS_RECOMMENDATIONS_TTL = 300  # 5 minutes (late results picked up by the next insights call)
@@ -1,14 +1,37 @@
 """Data fetching service for stock prices"""
 import yfinance as yf
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from threading import Lock
+from typing import Dict, List, Optional
 import pandas as pd
 
+from app.services.metrics import observe_upstream
+from app.services.tracing import propagate
+
+# Concurrent profile lookups for batch info requests (the provider has no batch profile endpoint)
+MAX_INFO_WORKERS = 8
+
+_info_executor: Optional[ThreadPoolExecutor] = None
+_info_executor_lock = Lock()
+
+
+def get_info_executor() -> ThreadPoolExecutor:
+    """Shared bounded pool for per-ticker profile lookups"""
+    global _info_executor
+    with _info_executor_lock:
+        if _info_executor is None:
+            _info_executor = ThreadPoolExecutor(
+                max_workers=MAX_INFO_WORKERS, thread_name_prefix="stock-info"
+            )
+        return _info_executor
+
 
 class StockDataFetcher:
     """Fetch stock data from various sources"""
 
     @staticmethod
+    @observe_upstream("yfinance", "fetch_yahoo_finance")
     def fetch_yahoo_finance(ticker: str, period: str = "5y") -> Optional[pd.DataFrame]:
         """
         Fetch stock data from Yahoo Finance (supports both US and Korean stocks)
@@ -39,6 +62,7 @@ class StockDataFetcher:
             return None
 
     @staticmethod
+    @observe_upstream("fdr", "fetch_korean_stock")
     def fetch_korean_stock(ticker: str) -> Optional[pd.DataFrame]:
         """
         Fetch Korean stock data using FinanceDataReader
@@ -71,6 +95,7 @@ class StockDataFetcher:
             return None
 
     @staticmethod
+    @observe_upstream("yfinance", "get_current_price")
     def get_current_price(ticker: str) -> Optional[float]:
         """
         Get current/latest price for a ticker
@@ -107,6 +132,7 @@ class StockDataFetcher:
             return None
 
     @staticmethod
+    @observe_upstream("yfinance", "get_stock_info")
     def get_stock_info(ticker: str) -> Optional[dict]:
         """
         Get stock information (company name, sector, etc.)
@@ -134,6 +160,75 @@ class StockDataFetcher:
             return None
 
     @staticmethod
+    @observe_upstream("yfinance", "get_quotes")
+    def get_quotes(tickers: List[str]) -> Dict[str, dict]:
+        """
+        Latest close, previous close and volume for many tickers in one request
+
+        Args:
+            tickers: Stock tickers
+
+        Returns:
+            Dict of ticker -> {"current_price", "previous_close", "volume"}
+            for tickers with data (missing tickers are omitted)
+        """
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            return {}
+
+        try:
+            raw = yf.download(
+                tickers, period="5d", interval="1d",
+                auto_adjust=False, progress=False, group_by="column"
+            )
+        except Exception as e:
+            print(f"Error downloading quotes for {len(tickers)} tickers: {e}")
+            return {}
+
+        if raw is None or raw.empty:
+            return {}
+
+        closes, volumes = raw["Close"], raw["Volume"]
+        if isinstance(closes, pd.Series):
+            closes = closes.to_frame(tickers[0])
+            volumes = volumes.to_frame(tickers[0])
+
+        quotes = {}
+        for ticker in tickers:
+            if ticker not in closes.columns:
+                continue
+            series = closes[ticker].dropna()
+            if series.empty:
+                continue
+            volume = volumes[ticker].get(series.index[-1])
+            quotes[ticker] = {
+                "current_price": float(series.iloc[-1]),
+                "previous_close": float(series.iloc[-2]) if len(series) > 1 else float(series.iloc[-1]),
+                "volume": int(volume) if pd.notna(volume) else 0,
+            }
+        return quotes
+
+    @staticmethod
+    def get_stock_infos(tickers: List[str]) -> Dict[str, dict]:
+        """
+        Stock information for many tickers, looked up concurrently
+
+        Args:
+            tickers: Stock tickers
+
+        Returns:
+            Dict of ticker -> info dict (see get_stock_info) for tickers that
+            could be fetched
+        """
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            return {}
+
+        infos = get_info_executor().map(propagate(StockDataFetcher.get_stock_info), tickers)
+        return {ticker: info for ticker, info in zip(tickers, infos) if info}
+
+    @staticmethod
+    @observe_upstream("yfinance", "get_exchange_rate")
     def get_exchange_rate(from_currency: str = "KRW", to_currency: str = "USD") -> Optional[float]:
         """
         Get current exchange rate between two currencies
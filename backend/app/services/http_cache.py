@@ -0,0 +1,135 @@
+"""HTTP caching for heavy read endpoints
+
+ETag / If-None-Match revalidation, Cache-Control per namespace TTL and
+response compression, so clients and reverse proxies can absorb polling.
+"""
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+import gzip
+import hashlib
+import json
+
+from fastapi import Request, Response
+
+from app.services.tracing import span
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+# Bodies smaller than this are sent uncompressed (in bytes)
+MIN_COMPRESS_SIZE = 1024
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def dumps(payload: Any) -> bytes:
+    """Encode plain JSON types, with orjson when it is installed"""
+    with span("serialize", encoder="orjson" if HAS_ORJSON else "json"):
+        if HAS_ORJSON:
+            return orjson.dumps(payload)
+        return json.dumps(payload, separators=(",", ":"), allow_nan=False).encode()
+
+
+def make_etag(*version: Any) -> str:
+    """
+    Weak ETag from a data version (ids, timestamps, query parameters)
+
+    Weak because the same entity is served gzip, brotli or identity encoded.
+    """
+    digest = hashlib.blake2b(repr(version).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def body_etag(body: bytes) -> str:
+    """Weak ETag from the encoded response body"""
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """True if the client's cached copy (If-None-Match / If-Modified-Since) is current"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        opaque = etag.removeprefix("W/")
+        return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return _as_utc(last_modified).replace(microsecond=0) <= since
+    return False
+
+
+def not_modified_response(etag: str, max_age: int, last_modified: Optional[datetime] = None) -> Response:
+    """Empty 304 carrying the validators and caching headers"""
+    return Response(status_code=304, headers=_cache_headers(etag, max_age, last_modified))
+
+
+def cached_json_response(
+    request: Request,
+    payload: Any = None,
+    max_age: int = 0,
+    etag: Optional[str] = None,
+    last_modified: Optional[datetime] = None,
+    body: Optional[bytes] = None,
+) -> Response:
+    """
+    JSON response with validators, Cache-Control and compression
+
+    ``payload`` is encoded with dumps() unless a pre-encoded ``body`` is
+    given. Without an explicit ``etag`` one is derived from the body.
+    Returns 304 when the client already has this version.
+    """
+    if body is None:
+        body = dumps(payload)
+    etag = etag or body_etag(body)
+
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, max_age, last_modified)
+
+    headers = _cache_headers(etag, max_age, last_modified)
+    if len(body) >= MIN_COMPRESS_SIZE:
+        accepted = request.headers.get("accept-encoding", "")
+        if HAS_BROTLI and "br" in accepted:
+            with span("compress", encoding="br", size=len(body)):
+                body = brotli.compress(body, quality=BROTLI_QUALITY)
+            headers["Content-Encoding"] = "br"
+        elif "gzip" in accepted:
+            with span("compress", encoding="gzip", size=len(body)):
+                body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+            headers["Content-Encoding"] = "gzip"
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _cache_headers(etag: str, max_age: int, last_modified: Optional[datetime]) -> dict:
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}" if max_age > 0 else "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+
+def _as_utc(moment: datetime) -> datetime:
+    """Naive timestamps in this app are UTC"""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
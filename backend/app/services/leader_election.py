@@ -0,0 +1,286 @@
+"""Leader election so only one API process runs the scheduler
+
+Every uvicorn worker and replica runs the app lifespan. Without election
+each of them would start the cron jobs. Two locks decide the leader:
+
+- FileLeaderLock: an flock on a local file. It picks one worker per host
+  and is released by the OS the moment that process dies.
+- DatabaseLeaderLock: a lease row in scheduler_locks, renewed by
+  heartbeats. It picks one process across hosts. A dead leader's lease
+  expires and another process takes it over.
+
+Only the holder of the host file lock contends for the database lease.
+"""
+from datetime import datetime, timedelta
+from threading import Event, Lock, Thread
+from typing import Callable, Optional
+import logging
+import os
+import secrets
+import socket
+import tempfile
+import time
+
+from sqlalchemy import case, or_
+from sqlalchemy.exc import IntegrityError
+
+from app.database import SessionLocal, engine
+from app.models.scheduler_lock import SchedulerLock
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_LOCK_NAME = "scheduler"
+
+# A leader that misses heartbeats for this long loses the lease (in seconds)
+LEASE_SECONDS = 30
+
+# Heartbeat / contention interval, well inside the lease (in seconds)
+HEARTBEAT_SECONDS = 10
+
+DEFAULT_LOCK_FILE = os.path.join(tempfile.gettempdir(), "finance_hub_scheduler.lock")
+
+
+def instance_id() -> str:
+    """host:pid:token identifying this process in the lock row"""
+    return f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}"
+
+
+class FileLeaderLock:
+    """
+    Non-blocking exclusive flock held for the life of the process
+
+    Without fcntl (Windows) every process passes and the database lease
+    alone decides.
+    """
+
+    def __init__(self, path: str = DEFAULT_LOCK_FILE):
+        self.path = path
+        self._file = None
+
+    def acquire(self) -> bool:
+        if not HAS_FCNTL or self._file is not None:
+            return True
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        lock_file = open(self.path, "a+")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(f"{os.getpid()}\n")
+        lock_file.flush()
+        self._file = lock_file
+        return True
+
+    def release(self):
+        if self._file is None:
+            return
+        try:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
+
+
+class DatabaseLeaderLock:
+    """
+    Lease row taken with a conditional UPDATE
+
+    The row is updated only if this process already holds it or the lease
+    has expired, so exactly one contender sees a row count of 1. Expiry
+    uses each process's clock, so hosts must be NTP-synced well within
+    the lease.
+    """
+
+    def __init__(self, holder: str, name: str = SCHEDULER_LOCK_NAME, lease_seconds: int = LEASE_SECONDS, session_factory=SessionLocal):
+        self.holder = holder
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.session_factory = session_factory
+
+    @staticmethod
+    def ensure_table():
+        """Create scheduler_locks if missing, so election works before the setup script is run"""
+        SchedulerLock.__table__.create(bind=engine, checkfirst=True)
+
+    def acquire(self) -> bool:
+        """Take or renew the lease; False if another live process holds it"""
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+
+        db = self.session_factory()
+        try:
+            updated = (
+                db.query(SchedulerLock)
+                .filter(
+                    SchedulerLock.name == self.name,
+                    or_(SchedulerLock.holder == self.holder, SchedulerLock.expires_at < now),
+                )
+                .update({
+                    SchedulerLock.acquired_at: case(
+                        (SchedulerLock.holder == self.holder, SchedulerLock.acquired_at), else_=now
+                    ),
+                    SchedulerLock.holder: self.holder,
+                    SchedulerLock.heartbeat_at: now,
+                    SchedulerLock.expires_at: expires_at,
+                }, synchronize_session=False)
+            )
+            if updated:
+                db.commit()
+                return True
+
+            # No row yet: the first insert wins, the others hit the primary key
+            db.add(SchedulerLock(
+                name=self.name,
+                holder=self.holder,
+                acquired_at=now,
+                heartbeat_at=now,
+                expires_at=expires_at,
+            ))
+            try:
+                db.commit()
+                return True
+            except IntegrityError:
+                db.rollback()
+                return False
+        finally:
+            db.close()
+
+    def release(self):
+        """Expire our lease so a follower takes over on its next heartbeat"""
+        db = self.session_factory()
+        try:
+            db.query(SchedulerLock).filter(
+                SchedulerLock.name == self.name,
+                SchedulerLock.holder == self.holder,
+            ).update({SchedulerLock.expires_at: datetime.utcnow()}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def current(self) -> Optional[SchedulerLock]:
+        db = self.session_factory()
+        try:
+            return db.query(SchedulerLock).filter(SchedulerLock.name == self.name).first()
+        finally:
+            db.close()
+
+
+class LeaderElector:
+    """
+    Heartbeat thread that elects this process and calls back on changes
+
+    ``on_elected`` runs when the lease is won and ``on_demoted`` when it
+    is lost: another process took it over, or renewals kept failing until
+    the lease ran out. Both run on the heartbeat thread.
+    """
+
+    def __init__(
+        self,
+        on_elected: Callable[[], None],
+        on_demoted: Callable[[], None],
+        lock_file: Optional[str] = DEFAULT_LOCK_FILE,
+        lease_seconds: int = LEASE_SECONDS,
+        heartbeat_seconds: int = HEARTBEAT_SECONDS,
+    ):
+        self.instance_id = instance_id()
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        # At least three heartbeats per lease, so one slow renewal does not lose it
+        self.heartbeat_seconds = min(heartbeat_seconds, max(1, lease_seconds // 3))
+        self.file_lock = FileLeaderLock(lock_file) if lock_file else None
+        self.db_lock = DatabaseLeaderLock(self.instance_id, lease_seconds=lease_seconds)
+
+        self._is_leader = False
+        self._lease_deadline = 0.0
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._is_leader
+
+    def start(self):
+        """Start contending in the background (idempotent)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        try:
+            self.db_lock.ensure_table()
+        except Exception as e:
+            logger.error(f"❌ Could not create scheduler lock table: {e}")
+
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="leader-election", daemon=True)
+        self._thread.start()
+        logger.info(f"🗳️ Leader election started as {self.instance_id}")
+
+    def stop(self):
+        """Stop heartbeats, step down and release both locks"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.heartbeat_seconds + 5)
+            self._thread = None
+
+        with self._lock:
+            if self._is_leader:
+                self._demote("shutting down")
+                try:
+                    self.db_lock.release()
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not release scheduler lease: {e}")
+        if self.file_lock is not None:
+            self.file_lock.release()
+
+    def status(self) -> dict:
+        return {"instance_id": self.instance_id, "is_leader": self._is_leader}
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                with self._lock:
+                    self._heartbeat()
+            except Exception as e:
+                logger.error(f"❌ Leader election heartbeat failed: {e}")
+            self._stop.wait(self.heartbeat_seconds)
+
+    def _heartbeat(self):
+        # Another worker on this host holds the file lock and contends for us
+        if self.file_lock is not None and not self.file_lock.acquire():
+            return
+
+        attempted_at = time.monotonic()
+        try:
+            acquired = self.db_lock.acquire()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not renew scheduler lease: {e}")
+            # Keep leading only while the last renewed lease is still valid
+            if self._is_leader and time.monotonic() >= self._lease_deadline:
+                self._demote("lease expired without renewal")
+            return
+
+        if acquired:
+            self._lease_deadline = attempted_at + self.db_lock.lease_seconds
+            if not self._is_leader:
+                self._is_leader = True
+                logger.info(f"👑 Elected scheduler leader: {self.instance_id}")
+                self.on_elected()
+        elif self._is_leader:
+            self._demote("lease taken over by another process")
+
+    def _demote(self, reason: str):
+        self._is_leader = False
+        logger.warning(f"⚠️ Stepping down as scheduler leader ({reason})")
+        self.on_demoted()
@@ -0,0 +1,234 @@
+"""In-process metrics with Prometheus text exposition
+
+Counters and fixed-bucket histograms keyed by label values. Recording is a
+dict lookup, a bisect and a few additions under a lock, cheap enough for
+every request. Exposed at GET /metrics.
+"""
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from threading import Lock
+from typing import Callable, Dict, List, Sequence, Tuple
+import time
+
+from app.services.tracing import span
+
+# Request latency buckets (in seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Model load / inference buckets (in seconds)
+MODEL_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Counter:
+    """Monotonic counter per label combination"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in values:
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram per label combination"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = Lock()
+
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labels: str):
+        """Observe the duration of the with-block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def count(self, *labels: str) -> int:
+        with self._lock:
+            series = self._series.get(labels)
+            return series[2] if series else 0
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            snapshot = sorted((labels, list(s[0]), s[1], s[2]) for labels, s in self._series.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                lines.append(
+                    f"{self.name}_bucket{_labels(self.labelnames + ('le',), labels + (le,))} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """All metrics of the process, rendered in registration order"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+# Global registry and metrics
+registry = MetricsRegistry()
+
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+))
+http_request_duration_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+))
+upstream_calls_total = registry.register(Counter(
+    "upstream_calls_total", "Data provider calls by outcome", ("provider", "operation", "outcome")
+))
+upstream_call_duration_seconds = registry.register(Histogram(
+    "upstream_call_duration_seconds", "Data provider call latency", ("provider", "operation")
+))
+cache_requests_total = registry.register(Counter(
+    "cache_requests_total", "Cache lookups by namespace and result (hit/miss)", ("cache", "result")
+))
+model_load_duration_seconds = registry.register(Histogram(
+    "model_load_duration_seconds", "Prediction model load time", ("model_type",), MODEL_BUCKETS
+))
+model_inference_duration_seconds = registry.register(Histogram(
+    "model_inference_duration_seconds", "Prediction model inference time", ("model_type",), MODEL_BUCKETS
+))
+
+
+def observe_upstream(provider: str, operation: str) -> Callable:
+    """
+    Decorator counting, timing and tracing a provider call
+
+    Outcome is "error" when the call raises and "empty" when it returns
+    None or an empty frame/dict. The fetcher methods swallow provider
+    errors and return None, so their failures land in "empty".
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                with span(f"{provider}.{operation}"):
+                    result = func(*args, **kwargs)
+                outcome = "empty" if _is_empty(result) else "ok"
+                return result
+            finally:
+                upstream_call_duration_seconds.observe(time.perf_counter() - started, provider, operation)
+                upstream_calls_total.inc(provider, operation, outcome)
+        return wrapper
+    return decorator
+
+
+def _is_empty(result) -> bool:
+    if result is None:
+        return True
+    if isinstance(result, (dict, list)):
+        return not result
+    return bool(getattr(result, "empty", False))
+
+
+def record_cache_lookup(cache: str, hits: int, misses: int = 0):
+    """Count cache hits and misses for one namespace"""
+    if hits:
+        cache_requests_total.inc(cache, "hit", amount=hits)
+    if misses:
+        cache_requests_total.inc(cache, "miss", amount=misses)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency and status per route template
+
+    Routes are labelled by their path template (/api/v1/stocks/{ticker}/quote)
+    so label cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "GET")
+            http_request_duration_seconds.observe(time.perf_counter() - started, method, path)
+            http_requests_total.inc(method, path, str(status_code))
@@ -167,6 +167,45 @@ class NotificationService:
         except Exception as e:
             logger.error(f"Error creating rebalance notification: {e}")
 
+    @staticmethod
+    def create_rebalance_notifications(db: Session, alerts: list[dict]) -> int:
+        """
+        Create rebalancing notifications for many portfolios in one insert
+
+        Args:
+            alerts: dicts with user_id, portfolio_name, deviation_percent, details
+
+        Returns:
+            Number of notifications created
+        """
+        if not alerts:
+            return 0
+
+        rows = [
+            {
+                "user_id": alert["user_id"],
+                "ticker": None,
+                "type": "rebalance_needed",
+                "title": f"{alert['portfolio_name']} 리밸런싱 필요",
+                "message": f"포트폴리오 균형이 {alert['deviation_percent']:.1f}% 벗어났습니다. 리밸런싱을 고려해보세요.",
+                "severity": "warning",
+                "data": json.dumps(alert["details"], ensure_ascii=False) if alert["details"] else None,
+                "is_read": False,
+            }
+            for alert in alerts
+        ]
+
+        try:
+            db.bulk_insert_mappings(Notification, rows)
+            db.commit()
+            logger.info(f"Created {len(rows)} rebalance notifications")
+            return len(rows)
+
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error creating rebalance notifications: {e}")
+            return 0
+
     @staticmethod
     def create_portfolio_goal_notification(
         db: Session,
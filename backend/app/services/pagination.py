@@ -0,0 +1,123 @@
+"""Keyset (cursor) pagination, capped count estimates and column projection for list endpoints"""
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import base64
+import binascii
+import json
+
+from sqlalchemy import String, and_, cast, func, or_, type_coerce
+from sqlalchemy.orm import Query
+
+# Counting stops here; larger results report a lower bound instead of a full COUNT(*)
+COUNT_ESTIMATE_CAP = 1000
+
+
+class PaginationError(ValueError):
+    """Malformed cursor or unknown projection field"""
+
+
+def encode_cursor(sort_key: str, row_id: int) -> str:
+    """Opaque cursor for the position after (sort_key, row_id)"""
+    raw = json.dumps([sort_key, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_key, row_id = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise PaginationError("Invalid cursor") from e
+    if not isinstance(sort_key, str) or not isinstance(row_id, int):
+        raise PaginationError("Invalid cursor")
+    return sort_key, row_id
+
+
+def parse_fields(fields: Optional[str], available: Sequence[str]) -> List[str]:
+    """Requested projection (comma separated) validated against ``available``; all when empty"""
+    if not fields:
+        return list(available)
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in available]
+    if unknown:
+        raise PaginationError(f"Unknown fields {unknown}. Available: {list(available)}")
+    return requested
+
+
+def keyset_page(
+    query: Query,
+    columns: Dict[str, Any],
+    sort_column,
+    id_column,
+    limit: int,
+    cursor: Optional[str] = None,
+    serializers: Optional[Dict[str, Callable[[Any], Any]]] = None,
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    One page of ``query`` ordered by (sort_column, id) descending
+
+    Only ``columns`` (output name -> column) are selected. The cursor keeps
+    the sort key in the database's own text form: SQLite stores DateTime as
+    text and a re-bound Python datetime would not compare equal to it.
+
+    Returns:
+        (rows as dicts, cursor for the next page or None on the last page)
+    """
+    if cursor:
+        sort_key, last_id = decode_cursor(cursor)
+        bound = type_coerce(sort_key, String)
+        query = query.filter(or_(
+            sort_column < bound,
+            and_(sort_column == bound, id_column < last_id),
+        ))
+
+    rows = (
+        query.with_entities(
+            *(column.label(name) for name, column in columns.items()),
+            cast(sort_column, String).label("_sort_key"),
+            id_column.label("_row_id"),
+        )
+        .order_by(sort_column.desc(), id_column.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]._sort_key, rows[-1]._row_id)
+
+    serializers = serializers or {}
+    return [
+        {
+            name: serializers[name](getattr(row, name)) if name in serializers else getattr(row, name)
+            for name in columns
+        }
+        for row in rows
+    ], next_cursor
+
+
+def estimate_count(query: Query, id_column, cap: int = COUNT_ESTIMATE_CAP) -> Tuple[int, bool]:
+    """
+    Number of matching rows, counted up to ``cap``
+
+    Returns:
+        (count, exact) - exact is False when the count hit the cap
+    """
+    limited = query.with_entities(id_column).order_by(None).limit(cap + 1).subquery()
+    count = query.session.query(func.count()).select_from(limited).scalar() or 0
+    return min(count, cap), count <= cap
+
+
+def isoformat(value) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def page_headers(next_cursor: Optional[str], total: Tuple[int, bool]) -> Dict[str, str]:
+    """Pagination metadata for endpoints whose body is a bare list"""
+    headers = {
+        "X-Total-Estimate": str(total[0]),
+        "X-Total-Exact": "true" if total[1] else "false",
+    }
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return headers
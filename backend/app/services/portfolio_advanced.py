@@ -9,6 +9,7 @@ from app.models.holding import Holding
 from app.models.portfolio_snapshot import PortfolioSnapshot
 from app.services.stock_cache_service import StockCacheService
 from app.services.portfolio_performance import PortfolioPerformanceService
+from app.services.portfolio_valuation import PortfolioValuationService
 
 
 class PortfolioAdvancedService:
@@ -116,11 +117,14 @@ class PortfolioAdvancedService:
         if not portfolio:
             return None
 
+        # 평가 스냅샷 1회 생성 후 공유
+        valuation = PortfolioValuationService.build(db, portfolio_id)
+
         # 현재 자산 배분
-        allocation = PortfolioPerformanceService.calculate_asset_allocation(db, portfolio_id)
+        allocation = PortfolioPerformanceService.calculate_asset_allocation(db, portfolio_id, valuation)
 
         # 리스크 분석
-        risk = PortfolioPerformanceService.calculate_risk_metrics(db, portfolio_id)
+        risk = PortfolioPerformanceService.calculate_risk_metrics(db, portfolio_id, valuation)
 
         recommendations = []
 
@@ -241,9 +245,12 @@ class PortfolioAdvancedService:
         domestic_count = 0
         foreign_count = 0
 
+        # 전 종목 가격 일괄 조회 (캐시 사용)
+        prices = StockCacheService.get_stock_prices(db, [h.ticker for h in holdings])
+
         for holding in holdings:
             try:
-                current_price, _ = StockCacheService.get_stock_price(db, holding.ticker)
+                current_price, _ = prices.get(holding.ticker, (0.0, 0.0))
                 if current_price == 0:
                     current_price = holding.avg_price
 
@@ -1,6 +1,5 @@
 """Portfolio Analytics Engine - 포트폴리오 성과 분석"""
 import numpy as np
-import pandas as pd
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
@@ -9,6 +8,8 @@ from app.models.portfolio import Portfolio
 from app.models.holding import Holding
 from app.models.sector import StockInfo, PortfolioAnalytics, SectorType
 from app.services.data_fetcher import StockDataFetcher
+from app.services.returns_cache import MIN_BETA_OBSERVATIONS, MARKET_TICKER, portfolio_view, returns_matrix_cache
+from app.services.blocking import run_blocking
 
 
 class PortfolioAnalyzer:
@@ -17,11 +18,15 @@ class PortfolioAnalyzer:
     def __init__(self, db: Session):
         self.db = db
         self.risk_free_rate = 0.045  # 무위험 수익률 (4.5% = 미국 국채 수익률)
-        self.market_ticker = "SPY"  # 시장 벤치마크 (S&P 500)
+        self.market_ticker = MARKET_TICKER  # 시장 벤치마크 (S&P 500)
         self.exchange_rate_cache = {}  # 환율 캐시 (세션 동안 재사용)
 
     async def analyze_portfolio(self, portfolio_id: int) -> Dict:
-        """포트폴리오 종합 분석
+        """포트폴리오 종합 분석 (블로킹 작업은 워커 풀에서 실행)"""
+        return await run_blocking(self.analyze, portfolio_id)
+
+    def analyze(self, portfolio_id: int) -> Dict:
+        """포트폴리오 종합 분석 (동기)
 
         Returns:
             {
@@ -48,13 +53,13 @@ class PortfolioAnalyzer:
             }
 
         # 각 종목의 가격 데이터 및 정보 가져오기
-        holdings_data = await self._fetch_holdings_data(holdings)
+        holdings_data = self._fetch_holdings_data(holdings)
 
         # 성과 분석
         performance = self._calculate_performance(holdings_data)
 
         # 리스크 분석
-        risk = await self._calculate_risk(holdings_data, portfolio_id)
+        risk = self._calculate_risk(holdings_data, portfolio_id)
 
         # 다각화 분석
         diversification = self._calculate_diversification(holdings_data)
@@ -98,27 +103,28 @@ class PortfolioAnalyzer:
             return "KRW"
         return "USD"
 
-    async def _fetch_holdings_data(self, holdings: List[Holding]) -> List[Dict]:
-        """보유 종목 데이터 가져오기"""
+    def _fetch_holdings_data(self, holdings: List[Holding]) -> List[Dict]:
+        """보유 종목 데이터 가져오기 (수익률 행렬 캐시 사용)"""
+        tickers = [holding.ticker for holding in holdings]
+
+        # 전 종목 가격/수익률 (일 단위 캐시, 누락 종목만 일괄 다운로드)
+        universe = returns_matrix_cache.get_snapshot(tickers)
+
+        # 주식 정보 일괄 조회
+        stock_infos = {
+            info.ticker: info
+            for info in self.db.query(StockInfo).filter(StockInfo.ticker.in_(tickers)).all()
+        }
+
         holdings_data = []
 
         for holding in holdings:
-            # 주식 정보
-            stock_info = self.db.query(StockInfo).filter(
-                StockInfo.ticker == holding.ticker
-            ).first()
-
-            # 최근 1년 가격 데이터
-            price_data = StockDataFetcher.fetch_yahoo_finance(
-                holding.ticker,
-                period="1y"
-            )
-
-            if price_data is None or price_data.empty:
+            column = universe['index'].get(holding.ticker)
+            if column is None:
                 continue
 
-            current_price = float(price_data['close'].iloc[-1])
-            total_value = current_price * holding.shares
+            current_price = float(universe['last_price'][column])
+            total_value = current_price * holding.quantity
 
             # 통화 정보
             currency = self._get_currency_from_ticker(holding.ticker)
@@ -127,25 +133,25 @@ class PortfolioAnalyzer:
             if currency == "USD":
                 total_value_usd = total_value
                 current_price_usd = current_price
-                purchase_price_usd = holding.purchase_price
+                purchase_price_usd = holding.avg_price
             else:
                 exchange_rate = self._get_exchange_rate(currency, "USD")
                 total_value_usd = total_value * exchange_rate
                 current_price_usd = current_price * exchange_rate
-                purchase_price_usd = holding.purchase_price * exchange_rate
+                purchase_price_usd = holding.avg_price * exchange_rate
 
             holdings_data.append({
                 'ticker': holding.ticker,
-                'shares': holding.shares,
-                'purchase_price': holding.purchase_price,
+                'shares': holding.quantity,
+                'purchase_price': holding.avg_price,
                 'current_price': current_price,
                 'total_value': total_value,
                 'currency': currency,
                 'purchase_price_usd': purchase_price_usd,
                 'current_price_usd': current_price_usd,
                 'total_value_usd': total_value_usd,
-                'price_data': price_data,
-                'stock_info': stock_info
+                'daily_return': float(universe['last_return'][column]),
+                'stock_info': stock_infos.get(holding.ticker)
             })
 
         return holdings_data
@@ -178,11 +184,9 @@ class PortfolioAnalyzer:
         # 일일 수익률 계산 (USD 기준)
         daily_returns = []
         for holding in holdings_data:
-            price_data = holding['price_data']
-            if len(price_data) > 1:
-                daily_return = price_data['close'].pct_change().iloc[-1]
+            if not np.isnan(holding['daily_return']):
                 weight = holding['total_value_usd'] / total_value_usd if total_value_usd > 0 else 0
-                daily_returns.append(daily_return * weight)
+                daily_returns.append(holding['daily_return'] * weight)
 
         daily_return = sum(daily_returns) * 100 if daily_returns else 0.0
 
@@ -208,29 +212,39 @@ class PortfolioAnalyzer:
             }
         }
 
-    async def _calculate_risk(self, holdings_data: List[Dict], portfolio_id: int) -> Dict:
-        """리스크 지표 계산"""
+    def _calculate_risk(self, holdings_data: List[Dict], portfolio_id: int) -> Dict:
+        """리스크 지표 계산 (공분산 행렬 기반)"""
         if not holdings_data:
             return {}
 
-        # 포트폴리오 일별 수익률 계산
-        portfolio_returns = self._calculate_portfolio_returns(holdings_data)
+        tickers = [h['ticker'] for h in holdings_data]
+        universe = returns_matrix_cache.get_snapshot(tickers)
+
+        # 보유 종목 중 하나라도 거래된 날만 사용 (다른 시장의 휴장일 제외)
+        view = portfolio_view(universe, tickers)
+        weights = self._portfolio_weights(holdings_data, view)
+
+        # 포트폴리오 일별 수익률 R·w
+        portfolio_returns = view['returns'] @ weights
+        if len(portfolio_returns) < 2:
+            return {}
 
-        # 변동성 (Volatility) - 연간화된 표준편차
-        volatility = portfolio_returns.std() * np.sqrt(252) * 100
+        # 변동성 (Volatility) - 연간화된 표준편차 sqrt(w'Σw)
+        variance = float(weights @ view['covariance'] @ weights)
+        volatility = np.sqrt(max(variance, 0.0)) * np.sqrt(252) * 100
 
         # 샤프 비율 (Sharpe Ratio) = (포트폴리오 수익률 - 무위험 수익률) / 변동성
         annual_return = portfolio_returns.mean() * 252 * 100
         sharpe_ratio = (annual_return - self.risk_free_rate * 100) / volatility if volatility > 0 else 0
 
         # 최대 낙폭 (Maximum Drawdown)
-        cumulative = (1 + portfolio_returns).cumprod()
-        running_max = cumulative.expanding().max()
+        cumulative = np.cumprod(1 + portfolio_returns)
+        running_max = np.maximum.accumulate(cumulative)
         drawdown = (cumulative - running_max) / running_max
         max_drawdown = drawdown.min() * 100
 
-        # 베타 (Beta) - 시장 대비 민감도
-        beta, alpha = await self._calculate_beta_alpha(portfolio_returns)
+        # 베타 (Beta) - 시장 대비 민감도 w·β
+        beta, alpha = self._calculate_beta_alpha(weights, view, universe)
 
         # VaR (Value at Risk) 95% 신뢰수준
         var_95 = np.percentile(portfolio_returns, 5) * 100
@@ -244,61 +258,35 @@ class PortfolioAnalyzer:
             'var_95': round(var_95, 2)
         }
 
-    def _calculate_portfolio_returns(self, holdings_data: List[Dict]) -> pd.Series:
-        """포트폴리오 일별 수익률 계산 (USD 기준)"""
+    def _portfolio_weights(self, holdings_data: List[Dict], view: Dict) -> np.ndarray:
+        """포트폴리오 뷰 종목 순서의 USD 기준 비중 벡터"""
         total_value_usd = sum(h['total_value_usd'] for h in holdings_data)
+        weights = np.zeros(len(view['tickers']))
+        if total_value_usd <= 0:
+            return weights
 
-        # 각 종목의 가중 수익률 계산 (USD 기준)
-        all_returns = []
         for holding in holdings_data:
-            price_data = holding['price_data']
-            returns = price_data['close'].pct_change().dropna()
-            weight = holding['total_value_usd'] / total_value_usd if total_value_usd > 0 else 0
-            weighted_returns = returns * weight
-            all_returns.append(weighted_returns)
+            column = view['index'][holding['ticker']]
+            weights[column] += holding['total_value_usd'] / total_value_usd
+        return weights
 
-        # 날짜별로 합산
-        portfolio_returns = pd.concat(all_returns, axis=1).sum(axis=1)
-        return portfolio_returns.dropna()
-
-    async def _calculate_beta_alpha(self, portfolio_returns: pd.Series) -> Tuple[float, float]:
+    def _calculate_beta_alpha(self, weights: np.ndarray, view: Dict, universe: Dict) -> Tuple[float, float]:
         """베타와 알파 계산 (시장 대비)"""
-        try:
-            # 시장 데이터 (SPY)
-            market_data = StockDataFetcher.fetch_yahoo_finance(
-                self.market_ticker,
-                period="1y"
-            )
-
-            if market_data is None or market_data.empty:
-                return 1.0, 0.0
-
-            market_returns = market_data['close'].pct_change().dropna()
-
-            # 공통 날짜만 사용
-            common_dates = portfolio_returns.index.intersection(market_returns.index)
-            if len(common_dates) < 30:
-                return 1.0, 0.0
-
-            port_ret = portfolio_returns.loc[common_dates]
-            mkt_ret = market_returns.loc[common_dates]
-
-            # 베타 계산 (공분산 / 시장 분산)
-            covariance = np.cov(port_ret, mkt_ret)[0][1]
-            market_variance = np.var(mkt_ret)
-            beta = covariance / market_variance if market_variance > 0 else 1.0
+        mask = universe['market_mask']
+        if self.market_ticker not in universe['index'] or mask.sum() < MIN_BETA_OBSERVATIONS:
+            return 1.0, 0.0
 
-            # 알파 계산 (포트폴리오 수익률 - (무위험 수익률 + 베타 * 시장 초과 수익률))
-            portfolio_annual_return = port_ret.mean() * 252
-            market_annual_return = mkt_ret.mean() * 252
-            alpha = portfolio_annual_return - (self.risk_free_rate + beta * (market_annual_return - self.risk_free_rate))
-            alpha = alpha * 100  # 백분율로 변환
+        # 시장 거래일 기준 수익률
+        returns = universe['returns'][mask]
+        beta = float(weights @ universe['beta'][view['columns']])
 
-            return beta, alpha
+        # 알파 계산 (포트폴리오 수익률 - (무위험 수익률 + 베타 * 시장 초과 수익률))
+        portfolio_annual_return = float((returns[:, view['columns']] @ weights).mean()) * 252
+        market_annual_return = float(returns[:, universe['index'][self.market_ticker]].mean()) * 252
+        alpha = portfolio_annual_return - (self.risk_free_rate + beta * (market_annual_return - self.risk_free_rate))
+        alpha = alpha * 100  # 백분율로 변환
 
-        except Exception as e:
-            print(f"Beta/Alpha calculation error: {e}")
-            return 1.0, 0.0
+        return beta, alpha
 
     def _calculate_diversification(self, holdings_data: List[Dict]) -> Dict:
         """다각화 지표 계산 (USD 기준)"""
@@ -404,7 +392,10 @@ class PortfolioAnalyzer:
             snapshot_date=analysis['snapshot_date']
         )
 
-        self.db.add(snapshot)
-        self.db.commit()
+        def save():
+            self.db.add(snapshot)
+            self.db.commit()
+            self.db.refresh(snapshot)
+            return snapshot
 
-        return snapshot
+        return await run_blocking(save)
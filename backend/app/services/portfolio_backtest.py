@@ -0,0 +1,246 @@
+"""Multi-asset portfolio backtesting on a shared, aligned price matrix"""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from sqlalchemy.orm import Session
+
+from app.models.holding import Holding
+from app.models.sector import RebalanceProposal
+from app.services.backtest_core import (
+    TRADING_DAYS, daily_returns, drawdown_series, rebalance_schedule, sharpe_ratio,
+    simulate_rebalanced_portfolio, threshold_rebalance_schedule,
+)
+from app.services.data_fetcher import StockDataFetcher
+from app.services.returns_cache import returns_matrix_cache
+
+logger = logging.getLogger(__name__)
+
+REBALANCE_FREQUENCIES = ('none', 'daily', 'weekly', 'monthly', 'quarterly', 'annually', 'threshold')
+
+
+def currency_for_ticker(ticker: str) -> str:
+    """Trading currency inferred from the ticker suffix"""
+    if ticker.endswith(".KS") or ticker.endswith(".KQ"):
+        return "KRW"
+    return "USD"
+
+
+class PortfolioBacktestService:
+    """Backtest N tickers as one portfolio with periodic rebalancing
+
+    All tickers and the FX pairs they need are downloaded in a single
+    batched request and aligned into one date x ticker matrix in the base
+    currency, so the simulation is a few matrix operations.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def load_price_matrix(
+        self,
+        tickers: List[str],
+        start_date: datetime,
+        end_date: datetime,
+        base_currency: str = "USD",
+    ) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        """
+        Download closes for all tickers and convert them to ``base_currency``
+
+        Returns:
+            (dates, prices[date x ticker], tickers actually present)
+        """
+        fx_pairs = {
+            currency: f"{currency}{base_currency}=X"
+            for currency in {currency_for_ticker(t) for t in tickers}
+            if currency != base_currency
+        }
+        symbols = list(dict.fromkeys(list(tickers) + list(fx_pairs.values())))
+
+        raw = yf.download(
+            symbols, start=start_date, end=end_date,
+            auto_adjust=True, progress=False, group_by='column'
+        )
+        if raw is None or raw.empty:
+            return np.zeros(0, dtype=object), np.zeros((0, 0)), []
+
+        closes = raw['Close']
+        if isinstance(closes, pd.Series):
+            closes = closes.to_frame(symbols[0])
+
+        # Different exchanges have different holidays: carry prices forward
+        closes.index = pd.DatetimeIndex(closes.index).tz_localize(None)
+        closes = closes.sort_index().ffill()
+
+        available = [t for t in tickers if t in closes.columns and closes[t].notna().any()]
+        missing = set(tickers) - set(available)
+        if missing:
+            logger.warning(f"No price data for {sorted(missing)}")
+        if not available:
+            return np.zeros(0, dtype=object), np.zeros((0, 0)), []
+
+        matrix = closes[available].copy()
+        for currency, pair in fx_pairs.items():
+            columns = [t for t in available if currency_for_ticker(t) == currency]
+            if not columns:
+                continue
+            if pair not in closes.columns or closes[pair].isna().all():
+                raise ValueError(f"No FX data for {pair}")
+            matrix[columns] = matrix[columns].mul(closes[pair], axis=0)
+
+        # Start once every asset has a price
+        matrix = matrix.dropna(how='any')
+        dates = np.asarray(matrix.index.to_pydatetime(), dtype=object)
+        return dates, matrix.to_numpy(dtype=np.float64), available
+
+    def run_portfolio_backtest(
+        self,
+        weights: Dict[str, float],
+        start_date: datetime,
+        end_date: datetime,
+        rebalance: str = 'monthly',
+        threshold_pct: float = 5.0,
+        initial_capital: float = 100000.0,
+        transaction_cost_bps: float = 0.0,
+        base_currency: str = "USD",
+    ) -> Dict:
+        """
+        Backtest a weighted portfolio
+
+        Args:
+            weights: ticker -> target weight (any positive scale)
+            rebalance: calendar frequency, 'none', or 'threshold' (drift rule)
+            threshold_pct: max weight drift in %p before a threshold rebalance
+
+        Returns:
+            Portfolio-level metrics, equity curve and per-asset attribution
+        """
+        if rebalance not in REBALANCE_FREQUENCIES:
+            raise ValueError(f"rebalance must be one of {list(REBALANCE_FREQUENCIES)}")
+
+        weights = {t.upper(): float(w) for t, w in weights.items() if w and w > 0}
+        if not weights:
+            raise ValueError("At least one positive weight is required")
+
+        dates, prices, tickers = self.load_price_matrix(
+            list(weights.keys()), start_date, end_date, base_currency
+        )
+        if len(dates) < 2:
+            raise ValueError("Insufficient overlapping price history for these tickers")
+
+        target = np.array([weights[t] for t in tickers])
+        target = target / target.sum()
+
+        if rebalance == 'threshold':
+            schedule = threshold_rebalance_schedule(prices, target, threshold_pct)
+        else:
+            schedule = rebalance_schedule(dates, rebalance)
+
+        simulation = simulate_rebalanced_portfolio(
+            prices, target, schedule, initial_capital, transaction_cost_bps
+        )
+        equity = simulation['equity']
+
+        # Benchmark: same initial weights, never rebalanced
+        buy_and_hold = simulate_rebalanced_portfolio(
+            prices, target, np.zeros(1, dtype=np.int64), initial_capital, transaction_cost_bps
+        )['equity']
+
+        returns = daily_returns(equity)
+        final_capital = float(equity[-1])
+        total_return = (final_capital / initial_capital - 1) * 100
+        years = len(equity) / TRADING_DAYS
+        annualized_return = ((final_capital / initial_capital) ** (1 / years) - 1) * 100
+        benchmark_return = (float(buy_and_hold[-1]) / initial_capital - 1) * 100
+
+        asset_returns = (prices[-1] / prices[0] - 1) * 100
+
+        return {
+            'tickers': tickers,
+            'base_currency': base_currency,
+            'start_date': dates[0].isoformat(),
+            'end_date': dates[-1].isoformat(),
+            'rebalance': rebalance,
+            'metrics': {
+                'initial_capital': initial_capital,
+                'final_capital': round(final_capital, 2),
+                'total_return': round(total_return, 2),
+                'annualized_return': round(annualized_return, 2),
+                'volatility': round(float(np.std(returns) * np.sqrt(TRADING_DAYS) * 100), 2),
+                'sharpe_ratio': round(sharpe_ratio(returns), 2),
+                'max_drawdown': round(float(np.max(drawdown_series(equity))), 2),
+                'rebalance_count': int(len(schedule) - 1),
+                'total_turnover': round(float(simulation['turnover'][1:].sum()), 4),
+                'total_costs': round(float(simulation['cost'].sum()), 2),
+                'buy_and_hold_return': round(benchmark_return, 2),
+                'rebalancing_premium': round(total_return - benchmark_return, 2),
+            },
+            'assets': [
+                {
+                    'ticker': ticker,
+                    'currency': currency_for_ticker(ticker),
+                    'target_weight': round(float(target[i]) * 100, 2),
+                    'final_weight': round(float(simulation['weights'][-1, i]) * 100, 2),
+                    'return': round(float(asset_returns[i]), 2),
+                }
+                for i, ticker in enumerate(tickers)
+            ],
+            'equity_curve': [
+                {'date': d.isoformat(), 'value': round(v, 2)}
+                for d, v in zip(dates, equity.tolist())
+            ],
+            'rebalance_dates': [dates[i].isoformat() for i in schedule.tolist()],
+        }
+
+    def holdings_weights(self, portfolio_id: int) -> Dict[str, float]:
+        """
+        Current market-value weights (USD) of a portfolio's holdings
+
+        Priced like PortfolioAnalyzer, whose values the Rebalancer turns into
+        proposal targets: last close from the returns cache times quantity.
+        Holdings without price history are left out, as in the analysis.
+        """
+        holdings = self.db.query(Holding).filter(Holding.portfolio_id == portfolio_id).all()
+        if not holdings:
+            return {}
+
+        universe = returns_matrix_cache.get_snapshot([h.ticker for h in holdings])
+        rates = {"USD": 1.0}
+        weights = {}
+        for holding in holdings:
+            column = universe['index'].get(holding.ticker)
+            if column is None:
+                continue
+            currency = currency_for_ticker(holding.ticker)
+            if currency not in rates:
+                # Same fallback rate as PortfolioAnalyzer
+                rates[currency] = StockDataFetcher.get_exchange_rate(currency, "USD") or 0.00075
+            value = holding.quantity * float(universe['last_price'][column]) * rates[currency]
+            weights[holding.ticker] = weights.get(holding.ticker, 0.0) + value
+        return weights
+
+    def proposal_weights(self, proposal_id: int) -> Optional[Dict[str, float]]:
+        """
+        Target weights implied by a RebalanceProposal
+
+        Tickers with an action take their target weight; all other holdings
+        keep their current market-value weight, the basis the targets were
+        computed on.
+        """
+        proposal = self.db.query(RebalanceProposal).filter(
+            RebalanceProposal.id == proposal_id
+        ).first()
+        if not proposal:
+            return None
+
+        current = self.holdings_weights(proposal.portfolio_id)
+        total = sum(current.values())
+        weights = {t: (v / total) * 100 for t, v in current.items()} if total > 0 else {}
+
+        for action in json.loads(proposal.proposed_actions):
+            weights[action['ticker']] = action['target_weight']
+        return weights
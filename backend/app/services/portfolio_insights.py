@@ -0,0 +1,156 @@
+"""Portfolio Insights - 분석/추천/리밸런싱 종합 인사이트"""
+import asyncio
+import logging
+from typing import Dict, List, Tuple
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.services.cache import insights_recommendations_cache, INSIGHTS_RECOMMENDATIONS_TTL
+from app.services.portfolio_analyzer import PortfolioAnalyzer
+from app.services.recommendation_engine import RecommendationEngine
+from app.services.rebalancer import Rebalancer
+
+logger = logging.getLogger(__name__)
+
+# 인사이트 응답 마감 시간 (초) - 추천이 늦으면 추천 없이 부분 응답
+INSIGHTS_DEADLINE_SECONDS = 5.0
+
+# 인사이트에 포함하는 추천 수
+INSIGHTS_RECOMMENDATIONS = 5
+
+
+class PortfolioInsightsService:
+    """포트폴리오 종합 인사이트 생성
+
+    의존 관계:
+        분석 ──> 리밸런싱 체크 ──┐
+        추천 (분석과 독립) ──────┴──> 종합 평가
+
+    추천은 요청 시작과 동시에 별도 DB 세션으로 실행하고, 분석은 한 번만 계산해
+    리밸런싱 체크와 공유한다. 마감 시간까지 추천이 끝나지 않으면 추천 없이
+    부분 응답을 반환하고, 추천 작업은 백그라운드에서 마저 끝나 포트폴리오별
+    추천 캐시(5분)에 저장된다. 다음 호출은 캐시된 추천을 바로 사용한다.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    async def build(
+        self, portfolio_id: int, deadline_seconds: float = INSIGHTS_DEADLINE_SECONDS
+    ) -> Dict:
+        """종합 인사이트 생성
+
+        Returns:
+            {'overall_score', 'summary', 'analysis', 'top_recommendations',
+             'rebalancing', 'partial', 'pending'}
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + deadline_seconds
+
+        # 1. 추천 (독립 분기, 캐시에 없으면 즉시 시작)
+        cached = insights_recommendations_cache.get(self._cache_key(portfolio_id))
+        recommendations_task = None
+        if cached is None:
+            recommendations_task = asyncio.create_task(self._recommendations(portfolio_id))
+
+        # 2. 포트폴리오 분석 (한 번만 계산)
+        analysis = await PortfolioAnalyzer(self.db).analyze_portfolio(portfolio_id)
+
+        # 3. 리밸런싱 체크 (분석 결과 공유)
+        rebalance_check = await Rebalancer(self.db).check_rebalancing_needed(portfolio_id, analysis)
+
+        # 4. 마감 시간까지 추천 대기
+        pending = []
+        try:
+            recommendations = cached if recommendations_task is None else await asyncio.wait_for(
+                asyncio.shield(recommendations_task),
+                timeout=max(0.0, deadline - loop.time())
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ Recommendations for portfolio {portfolio_id} missed the insights deadline")
+            recommendations = []
+            pending.append('recommendations')
+
+        overall_score, strengths, warnings, suggestions = self._evaluate(analysis, rebalance_check)
+
+        return {
+            "overall_score": min(100, overall_score),
+            "summary": {
+                "strengths": strengths,
+                "warnings": warnings,
+                "suggestions": suggestions
+            },
+            "analysis": analysis,
+            "top_recommendations": recommendations[:3],
+            "rebalancing": rebalance_check,
+            "partial": bool(pending),
+            "pending": pending
+        }
+
+    @staticmethod
+    def _cache_key(portfolio_id: int) -> str:
+        return f"portfolio:{portfolio_id}"
+
+    async def _recommendations(self, portfolio_id: int) -> List[Dict]:
+        """추천 분기 - 분석과 동시에 실행되므로 별도 세션 사용, 성공 시 캐시에 저장"""
+        db = SessionLocal()
+        try:
+            engine = RecommendationEngine(db)
+            recommendations = await engine.generate_recommendations(
+                portfolio_id=portfolio_id,
+                max_recommendations=INSIGHTS_RECOMMENDATIONS
+            )
+            insights_recommendations_cache.set(
+                self._cache_key(portfolio_id), recommendations, INSIGHTS_RECOMMENDATIONS_TTL
+            )
+            return recommendations
+        except Exception as e:
+            logger.error(f"❌ Recommendations for portfolio {portfolio_id} failed: {e}")
+            return []
+        finally:
+            db.close()
+
+    def _evaluate(self, analysis: Dict, rebalance_check: Dict) -> Tuple[float, List, List, List]:
+        """종합 점수 계산 - (점수, 강점, 경고, 제안)"""
+        overall_score = 0.0
+        strengths = []
+        warnings = []
+        suggestions = []
+
+        # 성과 평가
+        total_return = analysis['performance'].get('total_return', 0)
+        if total_return > 10:
+            overall_score += 30
+            strengths.append(f"높은 수익률: {total_return:.1f}%")
+        elif total_return < 0:
+            warnings.append(f"마이너스 수익률: {total_return:.1f}%")
+
+        # 리스크 평가
+        sharpe_ratio = analysis['risk'].get('sharpe_ratio', 0)
+        if sharpe_ratio > 1.0:
+            overall_score += 25
+            strengths.append(f"우수한 샤프 비율: {sharpe_ratio:.2f}")
+        elif sharpe_ratio < 0.5:
+            warnings.append(f"낮은 샤프 비율: {sharpe_ratio:.2f}")
+
+        # 다각화 평가
+        sector_diversity = analysis['diversification'].get('sector_diversity_score', 0)
+        if sector_diversity > 60:
+            overall_score += 25
+            strengths.append(f"우수한 섹터 다각화: {sector_diversity:.1f}")
+        elif sector_diversity < 40:
+            warnings.append(f"낮은 섹터 다각화: {sector_diversity:.1f}")
+            suggestions.append("다양한 섹터의 종목을 추가하세요")
+
+        # 리밸런싱 필요성
+        if rebalance_check['needs_rebalancing']:
+            if rebalance_check['severity'] == 'HIGH':
+                warnings.append("리밸런싱 긴급 필요")
+                suggestions.append("즉시 리밸런싱을 실행하세요")
+            elif rebalance_check['severity'] == 'MEDIUM':
+                suggestions.append("리밸런싱을 고려하세요")
+        else:
+            overall_score += 20
+            strengths.append("포트폴리오 균형 양호")
+
+        return overall_score, strengths, warnings, suggestions
@@ -0,0 +1,236 @@
+"""Long-only portfolio optimizer on the cached covariance matrix"""
+from typing import Dict, List, Optional
+import logging
+
+import numpy as np
+
+from app.services.returns_cache import portfolio_view, returns_matrix_cache
+
+logger = logging.getLogger(__name__)
+
+# Supported optimization objectives
+OPTIMIZATION_METHODS = ('MIN_VARIANCE', 'MEAN_VARIANCE', 'RISK_PARITY')
+
+TRADING_DAYS = 252
+
+# Mean-variance risk aversion (annualized returns and covariance)
+DEFAULT_RISK_AVERSION = 3.0
+
+# Historical means are noisy; shrink them halfway toward the cross-sectional mean
+RETURN_SHRINKAGE = 0.5
+
+# Solver limits
+MAX_ITERATIONS = 500
+TOLERANCE = 1e-7
+
+
+def project_to_box_simplex(v: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    """
+    Euclidean projection of each row onto {w : lower <= w <= upper, sum(w) = 1}
+
+    The projection is clip(v - tau, lower, upper) for the scalar tau that
+    makes the row sum to one. That sum is piecewise linear in tau with
+    breakpoints at v - lower and v - upper, so tau is found exactly by
+    evaluating the sum at every breakpoint and interpolating inside the
+    bracketing segment. Rows must be feasible (sum(lower) <= 1 <= sum(upper)).
+    """
+    breakpoints = np.sort(np.concatenate([v - upper, v - lower], axis=1), axis=1)
+    # Row sums at each breakpoint: (B, 2n), non-increasing in tau
+    sums = np.clip(v[:, None, :] - breakpoints[:, :, None], lower[:, None, :], upper[:, None, :]).sum(axis=2)
+
+    # Last breakpoint whose sum is still >= 1
+    k = np.clip((sums >= 1).sum(axis=1) - 1, 0, breakpoints.shape[1] - 2)
+    rows = np.arange(len(v))
+    tau_a, tau_b = breakpoints[rows, k], breakpoints[rows, k + 1]
+    sum_a, sum_b = sums[rows, k], sums[rows, k + 1]
+    slope = np.where(sum_a > sum_b, (sum_a - 1) / np.maximum(sum_a - sum_b, 1e-300), 0.0)
+    tau = tau_a + slope * (tau_b - tau_a)
+    return np.clip(v - tau[:, None], lower, upper)
+
+
+def _bounds(mask: np.ndarray, min_weight: float, max_weight: float):
+    """Per-asset bounds; padded slots are pinned to zero, caps relaxed when infeasible"""
+    count = mask.sum(axis=1, keepdims=True).astype(np.float64)
+    equal = np.divide(1.0, count, out=np.zeros_like(count), where=count > 0)
+    upper = np.where(mask, np.maximum(max_weight, equal), 0.0)
+    lower = np.where(mask, np.minimum(min_weight, equal), 0.0)
+    return lower, upper, np.where(mask, equal, 0.0)
+
+
+def _solve_quadratic(
+    covariance: np.ndarray,
+    expected: np.ndarray,
+    start: np.ndarray,
+    lower: np.ndarray,
+    upper: np.ndarray,
+    risk_aversion: float,
+) -> np.ndarray:
+    """
+    Minimize (risk_aversion / 2) w'Σw - μ'w over the box simplex
+
+    Accelerated projected gradient (FISTA) with step 1/L, L being the
+    largest eigenvalue of risk_aversion * Σ, run for every row in lockstep.
+    Momentum restarts whenever a step moves against the previous one.
+    """
+    lipschitz = risk_aversion * np.linalg.eigvalsh(covariance)[:, -1]
+    step = np.where(lipschitz > 0, 1.0 / np.maximum(lipschitz, 1e-12), 1.0)[:, None]
+
+    w = start
+    y = start
+    t = 1.0
+    for _ in range(MAX_ITERATIONS):
+        gradient = risk_aversion * np.einsum('bij,bj->bi', covariance, y) - expected
+        w_next = project_to_box_simplex(y - step * gradient, lower, upper)
+        if np.sum((y - w_next) * (w_next - w)) > 0:
+            t = 1.0
+        t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        y = w_next + ((t - 1) / t_next) * (w_next - w)
+        converged = np.abs(w_next - w).max() < TOLERANCE
+        w, t = w_next, t_next
+        if converged:
+            break
+    return w
+
+
+def _solve_risk_parity(
+    covariance: np.ndarray,
+    start: np.ndarray,
+    mask: np.ndarray,
+    lower: np.ndarray,
+    upper: np.ndarray,
+) -> np.ndarray:
+    """
+    Equal risk contribution weights, projected onto the position bounds
+
+    Damped multiplicative updates w_i <- w_i * sqrt(target / RC_i), where
+    RC_i = w_i (Σw)_i, drive every contribution to the row average; caps
+    are enforced by projecting after each step.
+    """
+    w = start
+    for _ in range(MAX_ITERATIONS):
+        contribution = w * np.einsum('bij,bj->bi', covariance, w)
+        target = contribution.sum(axis=1, keepdims=True) / np.maximum(mask.sum(axis=1, keepdims=True), 1)
+        ratio = np.divide(target, contribution, out=np.ones_like(w), where=contribution > 0)
+        w_next = project_to_box_simplex(w * np.sqrt(ratio), lower, upper)
+        converged = np.abs(w_next - w).max() < TOLERANCE
+        w = w_next
+        if converged:
+            break
+    return w
+
+
+def solve_weights(
+    covariance: np.ndarray,
+    expected: np.ndarray,
+    mask: np.ndarray,
+    method: str = 'MIN_VARIANCE',
+    min_weight: float = 0.0,
+    max_weight: float = 1.0,
+    risk_aversion: float = DEFAULT_RISK_AVERSION,
+) -> np.ndarray:
+    """
+    Optimal long-only weights for a batch of (padded) portfolios
+
+    Args:
+        covariance: (B, n, n) annualized covariance, zero in padded slots
+        expected: (B, n) annualized expected returns (MEAN_VARIANCE only)
+        mask: (B, n) True where the slot holds a real asset
+        min_weight/max_weight: per-position bounds as fractions; relaxed to
+            equal weight when a portfolio has too few assets to satisfy them
+
+    Returns:
+        (B, n) weights summing to one per row, zero in padded slots
+    """
+    if method not in OPTIMIZATION_METHODS:
+        raise ValueError(f"Unknown optimization method '{method}'. Available: {list(OPTIMIZATION_METHODS)}")
+
+    covariance = np.asarray(covariance, dtype=np.float64)
+    mask = np.asarray(mask, dtype=bool)
+    lower, upper, start = _bounds(mask, min_weight, max_weight)
+
+    if method == 'RISK_PARITY':
+        weights = _solve_risk_parity(covariance, start, mask, lower, upper)
+    elif method == 'MEAN_VARIANCE':
+        expected = np.where(mask, np.asarray(expected, dtype=np.float64), 0.0)
+        weights = _solve_quadratic(covariance, expected, start, lower, upper, risk_aversion)
+    else:
+        weights = _solve_quadratic(covariance, np.zeros_like(start), start, lower, upper, 1.0)
+
+    return np.where(mask, weights, 0.0)
+
+
+class PortfolioOptimizer:
+    """
+    Target weights for holdings using the shared returns matrix cache
+
+    Covariance and mean returns come from the daily returns snapshot, so a
+    solve is pure linear algebra on a few small matrices. Many portfolios
+    are solved together by padding them to the largest one.
+    """
+
+    def __init__(
+        self,
+        method: str = 'MIN_VARIANCE',
+        max_weight: float = 1.0,
+        min_weight: float = 0.0,
+        risk_aversion: float = DEFAULT_RISK_AVERSION,
+    ):
+        if method not in OPTIMIZATION_METHODS:
+            raise ValueError(f"Unknown optimization method '{method}'. Available: {list(OPTIMIZATION_METHODS)}")
+        self.method = method
+        self.max_weight = max_weight
+        self.min_weight = min_weight
+        self.risk_aversion = risk_aversion
+
+    def optimize(self, tickers: List[str]) -> Dict[str, float]:
+        """Target weights (fractions) for one set of tickers"""
+        return self.optimize_many([tickers])[0]
+
+    def optimize_many(self, ticker_sets: List[List[str]]) -> List[Dict[str, float]]:
+        """
+        Target weights for many portfolios in one batched solve
+
+        Tickers without price history are left out of the result.
+        """
+        universe = returns_matrix_cache.get_snapshot(
+            list(dict.fromkeys(t for tickers in ticker_sets for t in tickers))
+        )
+        # Each portfolio on its own trading days, independent of the rest of the batch
+        views = [portfolio_view(universe, tickers) for tickers in ticker_sets]
+        size = max((len(v['tickers']) for v in views), default=0)
+        if size == 0:
+            return [{} for _ in ticker_sets]
+
+        batch = len(views)
+        covariance = np.zeros((batch, size, size))
+        expected = np.zeros((batch, size))
+        mask = np.zeros((batch, size), dtype=bool)
+        for b, view in enumerate(views):
+            k = len(view['tickers'])
+            if k == 0:
+                continue
+            covariance[b, :k, :k] = view['covariance'] * TRADING_DAYS
+            means = view['returns'].mean(axis=0) * TRADING_DAYS
+            expected[b, :k] = RETURN_SHRINKAGE * means.mean() + (1 - RETURN_SHRINKAGE) * means
+            mask[b, :k] = True
+
+        weights = solve_weights(
+            covariance, expected, mask, self.method,
+            min_weight=self.min_weight, max_weight=self.max_weight,
+            risk_aversion=self.risk_aversion,
+        )
+
+        return [
+            {t: float(weights[b, i]) for i, t in enumerate(view['tickers'])}
+            for b, view in enumerate(views)
+        ]
+
+    def portfolio_volatility(self, weights: Dict[str, float]) -> Optional[float]:
+        """Annualized volatility (%) of a weight dict on the cached covariance"""
+        universe = returns_matrix_cache.get_snapshot(list(weights))
+        view = portfolio_view(universe, list(weights))
+        if not view['tickers']:
+            return None
+        w = np.array([weights[t] for t in view['tickers']])
+        variance = float(w @ view['covariance'] @ w) * TRADING_DAYS
+        return float(np.sqrt(max(variance, 0.0)) * 100)
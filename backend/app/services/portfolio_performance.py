@@ -1,26 +1,48 @@
 """Portfolio performance analysis service"""
-import yfinance as yf
 from typing import Dict, List, Optional
-from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from app.models.portfolio import Portfolio
-from app.models.holding import Holding
-from app.services.stock_cache_service import StockCacheService
+from app.services.portfolio_valuation import PortfolioValuationService
 
 
 class PortfolioPerformanceService:
     """서비스: 포트폴리오 성과 분석"""
 
     @staticmethod
-    def calculate_portfolio_performance(db: Session, portfolio_id: int) -> Dict:
+    def calculate_summary(db: Session, portfolio_id: int) -> Optional[Dict]:
+        """성과/배분/배당/리스크 종합 (평가 스냅샷 1회 생성)"""
+        valuation = PortfolioValuationService.build(db, portfolio_id)
+        if not valuation:
+            return None
+
+        return {
+            "performance": PortfolioPerformanceService.calculate_portfolio_performance(
+                db, portfolio_id, valuation
+            ),
+            "allocation": PortfolioPerformanceService.calculate_asset_allocation(
+                db, portfolio_id, valuation
+            ),
+            "dividends": PortfolioPerformanceService.calculate_dividend_income(
+                db, portfolio_id, valuation
+            ),
+            "risk": PortfolioPerformanceService.calculate_risk_metrics(
+                db, portfolio_id, valuation
+            ),
+        }
+
+    @staticmethod
+    def calculate_portfolio_performance(
+        db: Session, portfolio_id: int, valuation: Optional[Dict] = None
+    ) -> Dict:
         """포트폴리오 전체 성과 계산"""
-        portfolio = db.query(Portfolio).filter(Portfolio.id == portfolio_id).first()
-        if not portfolio:
+        if valuation is None:
+            valuation = PortfolioValuationService.build(db, portfolio_id, include_metadata=False)
+        if not valuation:
             return None
 
-        holdings = db.query(Holding).filter(Holding.portfolio_id == portfolio_id).all()
+        portfolio = valuation["portfolio"]
+        positions = valuation["positions"]
 
-        if not holdings:
+        if not positions:
             return {
                 "portfolio_id": portfolio_id,
                 "total_value": 0.0,
@@ -33,38 +55,9 @@ class PortfolioPerformanceService:
             }
 
         # 현재 포트폴리오 가치 및 수익 계산
-        total_value = 0.0
-        total_cost = 0.0
-        previous_day_value = 0.0
-
-        for holding in holdings:
-            # 현재 가격 가져오기 (캐시 사용)
-            try:
-                current_price, previous_close = StockCacheService.get_stock_price(db, holding.ticker)
-
-                # 가격이 0이면 평균가 사용 (API 실패 시)
-                if current_price == 0:
-                    current_price = holding.avg_price
-                    previous_close = holding.avg_price
-
-                # 현재 가치
-                position_value = current_price * holding.quantity
-                total_value += position_value
-
-                # 매입 비용
-                cost = holding.avg_price * holding.quantity
-                total_cost += cost
-
-                # 전일 종가 기준 가치
-                previous_day_value += previous_close * holding.quantity
-
-            except Exception as e:
-                print(f"⚠️ Error fetching price for {holding.ticker}: {e}")
-                # 가격을 가져올 수 없으면 평균가로 계산
-                cost = holding.avg_price * holding.quantity
-                total_cost += cost
-                total_value += cost
-                previous_day_value += cost
+        total_value = valuation["total_value"]
+        total_cost = valuation["total_cost"]
+        previous_day_value = valuation["previous_day_value"]
 
         # 수익률 계산
         total_gain_loss = total_value - total_cost
@@ -87,18 +80,22 @@ class PortfolioPerformanceService:
             "total_return_percent": round(total_return_percent, 2),
             "daily_change": round(daily_change, 2),
             "daily_change_percent": round(daily_change_percent, 2),
-            "holdings_count": len(holdings),
+            "holdings_count": len(positions),
             "initial_value": portfolio.initial_value,
             "target_return": portfolio.target_return,
             "risk_tolerance": portfolio.risk_tolerance,
         }
 
     @staticmethod
-    def calculate_asset_allocation(db: Session, portfolio_id: int) -> Dict:
+    def calculate_asset_allocation(
+        db: Session, portfolio_id: int, valuation: Optional[Dict] = None
+    ) -> Dict:
         """자산 배분 분석"""
-        holdings = db.query(Holding).filter(Holding.portfolio_id == portfolio_id).all()
+        if valuation is None:
+            valuation = PortfolioValuationService.build(db, portfolio_id)
+        positions = valuation["positions"] if valuation else []
 
-        if not holdings:
+        if not positions:
             return {
                 "by_sector": {},
                 "by_country": {},
@@ -108,37 +105,21 @@ class PortfolioPerformanceService:
         # 섹터별, 국가별, 자산 유형별 분류
         sector_allocation = {}
         country_allocation = {}
-        total_value = 0.0
-
-        for holding in holdings:
-            try:
-                # 가격 정보 (캐시 사용)
-                current_price, _ = StockCacheService.get_stock_price(db, holding.ticker)
-                if current_price == 0:
-                    current_price = holding.avg_price
-
-                position_value = current_price * holding.quantity
-                total_value += position_value
-
-                # 메타데이터 정보 (캐시 사용)
-                metadata = StockCacheService.get_stock_metadata(db, holding.ticker)
-
-                if metadata:
-                    # 섹터별
-                    sector = metadata.sector or "Unknown"
-                    sector_allocation[sector] = sector_allocation.get(sector, 0) + position_value
-
-                    # 국가별
-                    country = metadata.country or "Unknown"
-                    country_allocation[country] = country_allocation.get(country, 0) + position_value
-                else:
-                    sector_allocation["Unknown"] = sector_allocation.get("Unknown", 0) + position_value
-                    country_allocation["Unknown"] = country_allocation.get("Unknown", 0) + position_value
-
-            except Exception as e:
-                print(f"⚠️ Error fetching info for {holding.ticker}: {e}")
-                position_value = holding.avg_price * holding.quantity
-                total_value += position_value
+        total_value = valuation["total_value"]
+
+        for position in positions:
+            position_value = position["value"]
+            metadata = position["metadata"]
+
+            if metadata:
+                # 섹터별
+                sector = metadata.sector or "Unknown"
+                sector_allocation[sector] = sector_allocation.get(sector, 0) + position_value
+
+                # 국가별
+                country = metadata.country or "Unknown"
+                country_allocation[country] = country_allocation.get(country, 0) + position_value
+            else:
                 sector_allocation["Unknown"] = sector_allocation.get("Unknown", 0) + position_value
                 country_allocation["Unknown"] = country_allocation.get("Unknown", 0) + position_value
 
@@ -159,43 +140,34 @@ class PortfolioPerformanceService:
         }
 
     @staticmethod
-    def calculate_dividend_income(db: Session, portfolio_id: int) -> Dict:
+    def calculate_dividend_income(
+        db: Session, portfolio_id: int, valuation: Optional[Dict] = None
+    ) -> Dict:
         """배당금 수익 계산"""
-        holdings = db.query(Holding).filter(Holding.portfolio_id == portfolio_id).all()
+        if valuation is None:
+            valuation = PortfolioValuationService.build(db, portfolio_id)
+        positions = valuation["positions"] if valuation else []
 
         total_annual_dividend = 0.0
-        total_value = 0.0
+        total_value = valuation["total_value"] if valuation else 0.0
         dividend_stocks = []
 
-        for holding in holdings:
-            try:
-                # 가격 정보 (캐시 사용)
-                current_price, _ = StockCacheService.get_stock_price(db, holding.ticker)
-                if current_price == 0:
-                    current_price = holding.avg_price
-
-                position_value = current_price * holding.quantity
-                total_value += position_value
-
-                # 배당 정보 (캐시 사용)
-                metadata = StockCacheService.get_stock_metadata(db, holding.ticker)
-
-                if metadata and metadata.dividend_rate and metadata.dividend_rate > 0:
-                    annual_dividend = metadata.dividend_rate * holding.quantity
-                    total_annual_dividend += annual_dividend
+        for position in positions:
+            # 배당 정보 (스냅샷 메타데이터)
+            metadata = position["metadata"]
 
-                    dividend_stocks.append({
-                        "ticker": holding.ticker,
-                        "quantity": holding.quantity,
-                        "current_price": current_price,
-                        "dividend_rate": metadata.dividend_rate,
-                        "dividend_yield": round(metadata.dividend_yield * 100, 2) if metadata.dividend_yield else 0,
-                        "annual_dividend": round(annual_dividend, 2),
-                    })
+            if metadata and metadata.dividend_rate and metadata.dividend_rate > 0:
+                annual_dividend = metadata.dividend_rate * position["quantity"]
+                total_annual_dividend += annual_dividend
 
-            except Exception as e:
-                print(f"⚠️ Error fetching dividend for {holding.ticker}: {e}")
-                continue
+                dividend_stocks.append({
+                    "ticker": position["ticker"],
+                    "quantity": position["quantity"],
+                    "current_price": position["current_price"],
+                    "dividend_rate": metadata.dividend_rate,
+                    "dividend_yield": round(metadata.dividend_yield * 100, 2) if metadata.dividend_yield else 0,
+                    "annual_dividend": round(annual_dividend, 2),
+                })
 
         portfolio_dividend_yield = (
             (total_annual_dividend / total_value * 100) if total_value > 0 else 0.0
@@ -209,11 +181,15 @@ class PortfolioPerformanceService:
         }
 
     @staticmethod
-    def calculate_risk_metrics(db: Session, portfolio_id: int) -> Dict:
+    def calculate_risk_metrics(
+        db: Session, portfolio_id: int, valuation: Optional[Dict] = None
+    ) -> Dict:
         """리스크 분석"""
-        holdings = db.query(Holding).filter(Holding.portfolio_id == portfolio_id).all()
+        if valuation is None:
+            valuation = PortfolioValuationService.build(db, portfolio_id, include_metadata=False)
+        positions = valuation["positions"] if valuation else []
 
-        if not holdings:
+        if not positions:
             return {
                 "concentration_risk": 0.0,
                 "top_holdings_percent": 0.0,
@@ -222,23 +198,8 @@ class PortfolioPerformanceService:
             }
 
         # 집중도 리스크 계산
-        total_value = 0.0
-        position_values = []
-
-        for holding in holdings:
-            try:
-                # 가격 정보 (캐시 사용)
-                current_price, _ = StockCacheService.get_stock_price(db, holding.ticker)
-                if current_price == 0:
-                    current_price = holding.avg_price
-
-                position_value = current_price * holding.quantity
-                total_value += position_value
-                position_values.append(position_value)
-            except:
-                position_value = holding.avg_price * holding.quantity
-                total_value += position_value
-                position_values.append(position_value)
+        total_value = valuation["total_value"]
+        position_values = [position["value"] for position in positions]
 
         # 상위 3개 종목 비중
         position_values.sort(reverse=True)
@@ -249,7 +210,7 @@ class PortfolioPerformanceService:
         concentration_risk = top_holdings_percent
 
         # 분산도 점수 (종목 수 기반)
-        diversification_score = min(len(holdings) * 10, 100)  # 10개 이상이면 만점
+        diversification_score = min(len(positions) * 10, 100)  # 10개 이상이면 만점
 
         # 변동성 점수 (간단한 규칙 기반)
         if concentration_risk > 50:
@@ -264,7 +225,7 @@ class PortfolioPerformanceService:
             "top_holdings_percent": round(top_holdings_percent, 2),
             "volatility_score": volatility_score,
             "diversification_score": diversification_score,
-            "holdings_count": len(holdings),
+            "holdings_count": len(positions),
             "recommendation": PortfolioPerformanceService._get_risk_recommendation(
                 concentration_risk, diversification_score
             ),
@@ -0,0 +1,62 @@
+"""Portfolio valuation snapshot shared by portfolio analytics"""
+from typing import Dict, Optional
+from sqlalchemy.orm import Session
+from app.models.portfolio import Portfolio
+from app.models.holding import Holding
+from app.services.stock_cache_service import StockCacheService
+
+
+class PortfolioValuationService:
+    """서비스: 포트폴리오 평가 스냅샷
+
+    보유 종목을 한 번만 조회하고, 모든 종목의 가격/메타데이터를 한 번의 캐시
+    쿼리와 한 번의 일괄 다운로드로 가져와 성과/배분/배당/리스크 계산이 같은
+    스냅샷을 공유하도록 한다.
+    """
+
+    @staticmethod
+    def build(db: Session, portfolio_id: int, include_metadata: bool = True) -> Optional[Dict]:
+        """
+        포트폴리오 평가 스냅샷 생성
+        Returns: {"portfolio", "positions", "total_value", "total_cost", "previous_day_value"}
+                 포트폴리오가 없으면 None
+        """
+        portfolio = db.query(Portfolio).filter(Portfolio.id == portfolio_id).first()
+        if not portfolio:
+            return None
+
+        holdings = db.query(Holding).filter(Holding.portfolio_id == portfolio_id).all()
+        tickers = [holding.ticker for holding in holdings]
+
+        # 전 종목 가격/메타데이터 일괄 조회 (캐시 사용)
+        prices = StockCacheService.get_stock_prices(db, tickers)
+        metadata = StockCacheService.get_stocks_metadata(db, tickers) if include_metadata else {}
+
+        positions = []
+        for holding in holdings:
+            current_price, previous_close = prices.get(holding.ticker, (0.0, 0.0))
+
+            # 가격이 0이면 평균가 사용 (API 실패 시)
+            if current_price == 0:
+                current_price = holding.avg_price
+                previous_close = holding.avg_price
+
+            positions.append({
+                "ticker": holding.ticker,
+                "quantity": holding.quantity,
+                "avg_price": holding.avg_price,
+                "current_price": current_price,
+                "previous_close": previous_close,
+                "value": current_price * holding.quantity,
+                "cost": holding.avg_price * holding.quantity,
+                "previous_value": previous_close * holding.quantity,
+                "metadata": metadata.get(holding.ticker),
+            })
+
+        return {
+            "portfolio": portfolio,
+            "positions": positions,
+            "total_value": sum(p["value"] for p in positions),
+            "total_cost": sum(p["cost"] for p in positions),
+            "previous_day_value": sum(p["previous_value"] for p in positions),
+        }
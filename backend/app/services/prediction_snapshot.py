@@ -0,0 +1,302 @@
+"""Materialize the prediction summary and sector analysis views"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+import json
+import logging
+import os
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.prediction_cache import PredictionCache
+from app.models.prediction_snapshot import PredictionSnapshot, SectorSnapshot
+from app.models.sector import SectorType, StockInfo
+from app.services.cache import stock_info_cache, STOCK_INFO_TTL
+from app.services.data_fetcher import StockDataFetcher
+
+logger = logging.getLogger(__name__)
+
+MODEL_DIR = "models"
+
+# Model type suffixes in model file names (AAPL_LSTM_model.h5 -> AAPL)
+MODEL_TYPE_SUFFIXES = ('.LSTM', '.GRU', '.TRANSFORMER', '.CNN.LSTM', '.ENSEMBLE', '.PROPHET', '.XGBOOST')
+
+# StockInfo.market_cap is stored in billions (USD); the summary reports raw values
+MARKET_CAP_UNIT = 1e9
+
+# Provider sector names -> SectorType values, so both sources group together
+PROVIDER_SECTORS = {
+    'Financial Services': SectorType.FINANCE,
+    'Financials': SectorType.FINANCE,
+    'Technology': SectorType.TECHNOLOGY,
+    'Healthcare': SectorType.HEALTHCARE,
+    'Consumer Cyclical': SectorType.CONSUMER,
+    'Consumer Defensive': SectorType.CONSUMER,
+    'Energy': SectorType.ENERGY,
+    'Industrials': SectorType.INDUSTRIAL,
+    'Basic Materials': SectorType.MATERIALS,
+    'Utilities': SectorType.UTILITIES,
+    'Real Estate': SectorType.REAL_ESTATE,
+    'Communication Services': SectorType.COMMUNICATION,
+}
+
+
+def is_korean(ticker: str) -> bool:
+    return ticker.endswith('.KS') or ticker.endswith('.KQ')
+
+
+def model_tickers(model_dir: str = MODEL_DIR) -> List[str]:
+    """Tickers with at least one trained model, without model type suffix"""
+    if not os.path.exists(model_dir):
+        return []
+
+    tickers = []
+    for file in os.listdir(model_dir):
+        if not file.endswith("_model.h5"):
+            continue
+        ticker = file.replace("_model.h5", "").replace("_", ".")
+        for model_type in MODEL_TYPE_SUFFIXES:
+            if ticker.endswith(model_type):
+                ticker = ticker[:-len(model_type)]
+                break
+        tickers.append(ticker)
+    return sorted(set(tickers))
+
+
+def sector_metrics(stocks: List[Dict]) -> Dict:
+    """Counts, average change, momentum score and recommendation for one sector"""
+    total = len(stocks)
+    buy_count = sum(1 for s in stocks if s['action'] == 'BUY')
+    sell_count = sum(1 for s in stocks if s['action'] == 'SELL')
+    us_count = sum(1 for s in stocks if s['market'] == 'US')
+
+    avg_change = sum(s['change_percent'] for s in stocks) / total if total else 0
+    buy_ratio = buy_count / total if total else 0
+    sell_ratio = sell_count / total if total else 0
+
+    # Score: positive change + high buy ratio - sell ratio
+    momentum = (avg_change * 0.6) + (buy_ratio * 30) - (sell_ratio * 20)
+
+    if momentum > 5 and buy_ratio > 0.4:
+        recommendation = 'STRONG_BUY'
+    elif momentum > 2 and buy_ratio > 0.3:
+        recommendation = 'BUY'
+    elif momentum < -5 or sell_ratio > 0.5:
+        recommendation = 'AVOID'
+    else:
+        recommendation = 'NEUTRAL'
+
+    top_picks = sorted(
+        [s for s in stocks if s['action'] == 'BUY'],
+        key=lambda x: x['change_percent'],
+        reverse=True
+    )[:3]
+
+    return {
+        'total_stocks': total,
+        'buy_count': buy_count,
+        'sell_count': sell_count,
+        'hold_count': total - buy_count - sell_count,
+        'us_count': us_count,
+        'kr_count': total - us_count,
+        'avg_change_percent': round(avg_change, 2),
+        'momentum_score': round(momentum, 2),
+        'recommendation': recommendation,
+        'top_picks': top_picks,
+    }
+
+
+class PredictionSnapshotService:
+    """
+    Rebuilds prediction_snapshots and sector_snapshots
+
+    Latest unexpired predictions are joined with StockInfo in one query.
+    Only tickers missing from StockInfo fall back to the provider profile,
+    and that happens during the rebuild (in the scheduler), not per request.
+    """
+
+    def __init__(self, db: Session, model_dir: str = MODEL_DIR):
+        self.db = db
+        self.model_dir = model_dir
+
+    def refresh(self) -> int:
+        """Rebuild both snapshots; returns the number of tickers in the summary"""
+        computed_at = datetime.utcnow()
+        rows = self._build_rows(model_tickers(self.model_dir), computed_at)
+        sectors = self._build_sectors(rows, computed_at)
+
+        # Replace both views in one transaction so readers never see a partial snapshot
+        self.db.query(PredictionSnapshot).delete(synchronize_session=False)
+        self.db.query(SectorSnapshot).delete(synchronize_session=False)
+        if rows:
+            self.db.bulk_insert_mappings(PredictionSnapshot, rows)
+        if sectors:
+            self.db.bulk_insert_mappings(SectorSnapshot, sectors)
+        self.db.commit()
+
+        logger.info(f"📸 Prediction snapshot rebuilt: {len(rows)} tickers, {len(sectors)} sectors")
+        return len(rows)
+
+    def _build_rows(self, tickers: List[str], computed_at: datetime) -> List[Dict]:
+        if not tickers:
+            return []
+
+        latest = (
+            self.db.query(func.max(PredictionCache.id).label('id'))
+            .filter(
+                PredictionCache.ticker.in_(tickers),
+                PredictionCache.expires_at > computed_at,
+            )
+            .group_by(PredictionCache.ticker)
+            .subquery()
+        )
+        results = (
+            self.db.query(PredictionCache, StockInfo.name, StockInfo.sector, StockInfo.market_cap)
+            .join(latest, PredictionCache.id == latest.c.id)
+            .outerjoin(StockInfo, StockInfo.ticker == PredictionCache.ticker)
+            .all()
+        )
+
+        profiles = self._provider_profiles([
+            prediction.ticker for prediction, name, _, _ in results if name is None
+        ])
+
+        rows = []
+        for prediction, name, sector, market_cap in results:
+            ticker = prediction.ticker
+            if name is not None:
+                sector = sector.value if sector else 'Unknown'
+                market_cap = (market_cap or 0) * MARKET_CAP_UNIT
+            else:
+                profile = profiles.get(ticker) or {}
+                name = profile.get('name', ticker)
+                sector = profile.get('sector', 'Unknown')
+                if sector in PROVIDER_SECTORS:
+                    sector = PROVIDER_SECTORS[sector].value
+                market_cap = profile.get('market_cap', 0)
+
+            rows.append({
+                'ticker': ticker,
+                'name': name or ticker,
+                'sector': sector or 'Unknown',
+                'market': 'KRX' if is_korean(ticker) else 'US',
+                'market_cap': float(market_cap or 0),
+                'action': prediction.action,
+                'confidence': float(prediction.confidence),
+                'change_percent': float(prediction.change_percent),
+                'predicted_price': float(prediction.predicted_price),
+                'current_price': float(prediction.current_price),
+                'computed_at': computed_at,
+            })
+        return rows
+
+    @staticmethod
+    def _provider_profiles(tickers: List[str]) -> Dict[str, Dict]:
+        """Profiles for tickers not in StockInfo: info cache first, one batch for the rest"""
+        if not tickers:
+            return {}
+
+        cached = stock_info_cache.get_many(f"stock_info_{t}" for t in tickers)
+        profiles = {t: cached[f"stock_info_{t}"] for t in tickers if f"stock_info_{t}" in cached}
+        misses = [t for t in tickers if t not in profiles]
+        if misses:
+            fetched = StockDataFetcher.get_stock_infos(misses)
+            stock_info_cache.set_many(
+                {f"stock_info_{t}": info for t, info in fetched.items()}, STOCK_INFO_TTL
+            )
+            profiles.update(fetched)
+        return profiles
+
+    @staticmethod
+    def _build_sectors(rows: List[Dict], computed_at: datetime) -> List[Dict]:
+        by_sector = defaultdict(list)
+        for row in rows:
+            by_sector[row['sector']].append({
+                'ticker': row['ticker'],
+                'action': row['action'],
+                'change_percent': row['change_percent'],
+                'confidence': row['confidence'],
+                'market': row['market'],
+            })
+
+        sectors = []
+        for sector, stocks in by_sector.items():
+            metrics = sector_metrics(stocks)
+            metrics['top_picks'] = json.dumps(metrics['top_picks'])
+            sectors.append({'sector': sector, **metrics, 'computed_at': computed_at})
+        return sectors
+
+
+def load_prediction_summary(db: Session) -> Optional[Dict]:
+    """Summary payload from the snapshot, or None if it has never been built"""
+    rows = db.query(PredictionSnapshot).order_by(PredictionSnapshot.ticker).all()
+    if not rows:
+        return None
+
+    predictions = [
+        {
+            'ticker': row.ticker,
+            'name': row.name,
+            'action': row.action,
+            'confidence': row.confidence,
+            'change_percent': row.change_percent,
+            'predicted_price': row.predicted_price,
+            'current_price': row.current_price,
+            'sector': row.sector,
+            'market_cap': row.market_cap,
+            'market': row.market,
+        }
+        for row in rows
+    ]
+
+    # Group by action for easier filtering
+    grouped = {
+        action: [p for p in predictions if p['action'] == action]
+        for action in ('BUY', 'SELL', 'HOLD')
+    }
+
+    return {
+        'predictions': predictions,
+        'grouped': grouped,
+        'count': len(predictions),
+        'summary': {
+            'buy_count': len(grouped['BUY']),
+            'sell_count': len(grouped['SELL']),
+            'hold_count': len(grouped['HOLD'])
+        },
+        'computed_at': rows[0].computed_at.isoformat(),
+    }
+
+
+def load_sector_analysis(db: Session) -> Optional[Dict]:
+    """Sector analysis payload from the snapshot, or None if it has never been built"""
+    rows = db.query(SectorSnapshot).order_by(SectorSnapshot.momentum_score.desc()).all()
+    if not rows:
+        return None
+
+    sectors = [
+        {
+            'sector': row.sector,
+            'avg_change_percent': row.avg_change_percent,
+            'total_stocks': row.total_stocks,
+            'buy_count': row.buy_count,
+            'sell_count': row.sell_count,
+            'hold_count': row.hold_count,
+            'us_count': row.us_count,
+            'kr_count': row.kr_count,
+            'momentum_score': row.momentum_score,
+            'recommendation': row.recommendation,
+            'top_picks': json.loads(row.top_picks),
+        }
+        for row in rows
+    ]
+
+    return {
+        'sectors': sectors,
+        'total_sectors': len(sectors),
+        'us_sectors': [s for s in sectors if s['us_count'] > 0],
+        'kr_sectors': [s for s in sectors if s['kr_count'] > 0],
+        'top_momentum_sectors': sectors[:3],
+        'generated_at': rows[0].computed_at.isoformat(),
+    }
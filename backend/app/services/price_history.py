@@ -0,0 +1,111 @@
+"""Price history shaping for chart responses
+
+Range slicing, weekly/monthly resampling and downsampling of a daily OHLCV
+frame, and JSON-ready payloads (records or parallel arrays per field).
+"""
+from datetime import date
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# Columns returned for every bar
+HISTORY_FIELDS = ("open", "high", "low", "close", "volume")
+
+# How each field is combined when bars are merged
+HISTORY_AGGREGATIONS = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+
+# Bar interval -> pandas period frequency (weeks end on Friday)
+HISTORY_INTERVALS = {"1d": None, "1wk": "W-FRI", "1mo": "M"}
+
+HISTORY_FORMATS = ("records", "columnar")
+
+# Yahoo periods and the calendar days they cover, shortest first
+_PERIOD_DAYS = (
+    ("1mo", 31), ("3mo", 92), ("6mo", 183), ("1y", 366),
+    ("2y", 731), ("5y", 1827), ("10y", 3653),
+)
+
+
+def period_covering(start: date, today: Optional[date] = None) -> str:
+    """Shortest Yahoo period string whose history reaches back to ``start``"""
+    days = ((today or date.today()) - start).days
+    for period, covered in _PERIOD_DAYS:
+        if days <= covered:
+            return period
+    return "max"
+
+
+def prepare_history(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Daily OHLCV frame indexed by bar timestamp, from fetch_yahoo_finance output
+
+    Only HISTORY_FIELDS are kept and incomplete bars are dropped; the index
+    keeps the exchange timezone.
+    """
+    frame = df.set_index("date")[list(HISTORY_FIELDS)].astype(np.float64)
+    return frame.dropna().sort_index()
+
+
+def slice_history(frame: pd.DataFrame, start: Optional[date] = None, end: Optional[date] = None) -> pd.DataFrame:
+    """Bars whose trading date falls within [start, end]"""
+    if start is None and end is None:
+        return frame
+    days = frame.index.date
+    keep = np.ones(len(frame), dtype=bool)
+    if start is not None:
+        keep &= days >= start
+    if end is not None:
+        keep &= days <= end
+    return frame[keep]
+
+
+def resample_history(frame: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """Merge daily bars into weekly or monthly bars, labelled by their last trading day"""
+    freq = HISTORY_INTERVALS[interval]
+    if freq is None or frame.empty:
+        return frame
+    index = frame.index.tz_localize(None) if frame.index.tz is not None else frame.index
+    return _merge_bars(frame, index.to_period(freq).asi8)
+
+
+def downsample_history(frame: pd.DataFrame, max_points: int) -> pd.DataFrame:
+    """
+    At most ``max_points`` bars by merging consecutive bars into equal buckets
+
+    Unlike picking every n-th bar, merged buckets keep each bucket's high,
+    low and total volume, so spikes survive downsampling.
+    """
+    n = len(frame)
+    if max_points <= 0 or n <= max_points:
+        return frame
+    return _merge_bars(frame, (np.arange(n) * max_points) // n)
+
+
+def _merge_bars(frame: pd.DataFrame, keys: np.ndarray) -> pd.DataFrame:
+    """Aggregate runs of equal (non-decreasing) keys into one bar each"""
+    bars = frame.groupby(keys, sort=False).agg(HISTORY_AGGREGATIONS)
+    last = np.r_[np.flatnonzero(keys[1:] != keys[:-1]), len(keys) - 1]
+    bars.index = frame.index[last]
+    return bars
+
+
+def history_payload(frame: pd.DataFrame, fmt: str = "records") -> Union[Dict, List[Dict]]:
+    """
+    JSON-ready bars: a list of dicts, or one array per field
+
+    Columnar: {"date": [...], "open": [...], ...}; dates are ISO strings.
+    """
+    dates: List[str] = [ts.isoformat() for ts in frame.index]
+    columns = {field: frame[field].to_numpy() for field in HISTORY_FIELDS}
+    columns["volume"] = columns["volume"].astype(np.int64)
+    columns = {field: values.tolist() for field, values in columns.items()}
+
+    if fmt == "columnar":
+        return {"date": dates, **columns}
+
+    return [
+        dict(zip(("date",) + HISTORY_FIELDS, row))
+        for row in zip(dates, *(columns[field] for field in HISTORY_FIELDS))
+    ]
+
@@ -1,5 +1,7 @@
 """Portfolio Rebalancing Engine - 포트폴리오 리밸런싱 엔진"""
+import asyncio
 import json
+import logging
 from typing import Dict, List, Optional
 from datetime import datetime
 from sqlalchemy.orm import Session
@@ -9,6 +11,14 @@ from app.models.holding import Holding
 from app.models.sector import StockInfo, RebalanceProposal, SectorType
 from app.services.portfolio_analyzer import PortfolioAnalyzer
 from app.services.data_fetcher import StockDataFetcher
+from app.services.returns_cache import returns_matrix_cache
+from app.services.portfolio_optimizer import PortfolioOptimizer
+from app.services.blocking import run_blocking, run_with_session
+
+logger = logging.getLogger(__name__)
+
+# 일괄 리밸런싱 체크 시 동시에 분석하는 포트폴리오 수
+MAX_CHECK_CONCURRENCY = 8
 
 
 class Rebalancer:
@@ -39,9 +49,14 @@ class Rebalancer:
             'etf_allocation': 20.0,    # ETF 권장 비중 20%
         }
 
-    async def check_rebalancing_needed(self, portfolio_id: int) -> Dict:
+    async def check_rebalancing_needed(
+        self, portfolio_id: int, analysis: Optional[Dict] = None
+    ) -> Dict:
         """리밸런싱 필요 여부 체크
 
+        Args:
+            analysis: 이미 계산된 포트폴리오 분석 결과 (없으면 새로 분석)
+
         Returns:
             {
                 'needs_rebalancing': bool,
@@ -50,7 +65,8 @@ class Rebalancer:
             }
         """
         # 포트폴리오 분석
-        analysis = await self.analyzer.analyze_portfolio(portfolio_id)
+        if analysis is None:
+            analysis = await self.analyzer.analyze_portfolio(portfolio_id)
 
         triggers = []
         severity_score = 0
@@ -100,42 +116,134 @@ class Rebalancer:
             'severity_score': severity_score
         }
 
+    async def check_portfolios(
+        self, portfolios: List[Portfolio], max_concurrency: int = MAX_CHECK_CONCURRENCY
+    ) -> Dict[int, Dict]:
+        """여러 포트폴리오 리밸런싱 필요 여부 일괄 체크
+
+        전 포트폴리오 보유 종목의 합집합을 한 번에 수익률 행렬 캐시에 적재한 뒤,
+        하나의 이벤트 루프에서 동시 실행 수를 제한해 각 포트폴리오를 평가한다.
+
+        Returns:
+            {portfolio_id: check_rebalancing_needed 결과} (실패한 포트폴리오는 제외)
+        """
+        portfolio_ids = [portfolio.id for portfolio in portfolios]
+        if not portfolio_ids:
+            return {}
+
+        # 보유 종목 합집합을 한 번만 다운로드
+        await run_blocking(self._load_holding_universe, portfolio_ids)
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+        exchange_rate_cache = self.analyzer.exchange_rate_cache
+
+        def analyze(db: Session, portfolio_id: int) -> Dict:
+            # 동시에 실행되는 분석마다 별도 세션 사용 (환율 캐시는 공유)
+            analyzer = PortfolioAnalyzer(db)
+            analyzer.exchange_rate_cache = exchange_rate_cache
+            return analyzer.analyze(portfolio_id)
+
+        async def check(portfolio_id: int):
+            async with semaphore:
+                try:
+                    analysis = await run_with_session(analyze, portfolio_id)
+                    return portfolio_id, await self.check_rebalancing_needed(portfolio_id, analysis)
+                except Exception as e:
+                    logger.error(f"❌ Failed to check portfolio {portfolio_id}: {e}")
+                    return portfolio_id, None
+
+        results = await asyncio.gather(*(check(pid) for pid in portfolio_ids))
+        return {pid: result for pid, result in results if result is not None}
+
+    def _load_holding_universe(self, portfolio_ids: List[int]):
+        """포트폴리오들의 보유 종목 합집합을 수익률 행렬 캐시에 적재"""
+        tickers = sorted({
+            ticker for (ticker,) in self.db.query(Holding.ticker)
+            .filter(Holding.portfolio_id.in_(portfolio_ids)).distinct()
+        })
+        if tickers:
+            returns_matrix_cache.get_snapshot(tickers)
+
+    def create_optimizer(self, method: str = 'MIN_VARIANCE') -> PortfolioOptimizer:
+        """개별 종목 비중 기준(TARGET_ALLOCATION)을 제약으로 하는 최적화기"""
+        return PortfolioOptimizer(
+            method=method,
+            max_weight=self.TARGET_ALLOCATION['single_stock_max'] / 100,
+            min_weight=self.TARGET_ALLOCATION['single_stock_min'] / 100,
+        )
+
+    def optimize_portfolios(
+        self, portfolio_ids: List[int], method: str = 'MIN_VARIANCE'
+    ) -> Dict[int, Dict[str, float]]:
+        """여러 포트폴리오 목표 비중 일괄 계산
+
+        Returns:
+            {portfolio_id: {ticker: 목표 비중(%)}}
+        """
+        if not portfolio_ids:
+            return {}
+
+        tickers_by_portfolio: Dict[int, List[str]] = {pid: [] for pid in portfolio_ids}
+        for portfolio_id, ticker in self.db.query(Holding.portfolio_id, Holding.ticker).filter(
+            Holding.portfolio_id.in_(portfolio_ids)
+        ):
+            tickers_by_portfolio[portfolio_id].append(ticker)
+
+        solved = self.create_optimizer(method).optimize_many(list(tickers_by_portfolio.values()))
+        return {
+            pid: {ticker: round(weight * 100, 2) for ticker, weight in weights.items()}
+            for pid, weights in zip(tickers_by_portfolio, solved)
+        }
+
     async def generate_rebalancing_proposal(
         self,
         portfolio_id: int,
-        proposal_type: str = "AUTO"
+        proposal_type: str = "AUTO",
+        optimization_method: Optional[str] = None
     ) -> Optional[Dict]:
         """리밸런싱 제안 생성
 
         Args:
             portfolio_id: 포트폴리오 ID
             proposal_type: SECTOR_REBALANCE | RISK_REDUCTION | PERIODIC | AUTO
+            optimization_method: MIN_VARIANCE | MEAN_VARIANCE | RISK_PARITY
+                지정하면 고정 기준 대신 최적화된 목표 비중으로 액션 계산
 
         Returns:
             리밸런싱 제안 내용
         """
+        # 포트폴리오 분석 (체크와 제안이 같은 분석 결과를 공유)
+        analysis = await self.analyzer.analyze_portfolio(portfolio_id)
+
         # 현재 상태 분석
-        check_result = await self.check_rebalancing_needed(portfolio_id)
+        check_result = await self.check_rebalancing_needed(portfolio_id, analysis)
 
         if not check_result['needs_rebalancing'] and proposal_type == "AUTO":
             return None
 
-        # 포트폴리오 분석
-        analysis = await self.analyzer.analyze_portfolio(portfolio_id)
         holdings = analysis.get('holdings', [])
 
         if not holdings:
             return None
 
         # 현재 가격 업데이트
-        holdings_with_prices = await self._update_current_prices(holdings)
-
-        # 리밸런싱 액션 계산
-        actions = self._calculate_rebalancing_actions(
-            holdings_with_prices,
-            analysis,
-            proposal_type
-        )
+        holdings_with_prices = await run_blocking(self._update_current_prices, holdings)
+
+        target_risk = None
+        if optimization_method:
+            # 공분산 행렬 기반 최적 목표 비중
+            actions, target_risk = await run_blocking(
+                self._calculate_optimized_actions,
+                holdings_with_prices,
+                optimization_method
+            )
+        else:
+            # 리밸런싱 액션 계산
+            actions = self._calculate_rebalancing_actions(
+                holdings_with_prices,
+                analysis,
+                proposal_type
+            )
 
         if not actions:
             return None
@@ -147,6 +255,12 @@ class Rebalancer:
             analysis
         )
 
+        if target_risk is not None:
+            # 목표 비중의 실제 변동성으로 대체
+            current_risk = analysis['risk'].get('volatility', 0)
+            expected_impact['target_risk_score'] = round(target_risk, 2)
+            expected_impact['risk_change'] = round(target_risk - current_risk, 2)
+
         # 제안 저장
         proposal = {
             'portfolio_id': portfolio_id,
@@ -165,7 +279,7 @@ class Rebalancer:
 
         return proposal
 
-    async def _update_current_prices(self, holdings: List[Dict]) -> List[Dict]:
+    def _update_current_prices(self, holdings: List[Dict]) -> List[Dict]:
         """현재 가격 업데이트"""
         updated_holdings = []
 
@@ -262,6 +376,58 @@ class Rebalancer:
 
         return actions
 
+    def _calculate_optimized_actions(self, holdings: List[Dict], method: str) -> tuple:
+        """최적 목표 비중 기반 액션과 목표 비중의 연간 변동성(%)"""
+        optimizer = self.create_optimizer(method)
+        target_weights = optimizer.optimize([h['ticker'] for h in holdings])
+        actions = self._calculate_target_actions(holdings, target_weights, f"{method} target")
+        return actions, optimizer.portfolio_volatility(target_weights)
+
+    def _calculate_target_actions(
+        self,
+        holdings: List[Dict],
+        target_weights: Dict[str, float],
+        reason: str
+    ) -> List[Dict]:
+        """목표 비중(0~1)으로부터 리밸런싱 액션 계산 (USD 기준 비중)"""
+        actions = []
+
+        total_value_usd = sum(h.get('total_value_usd', h['total_value']) for h in holdings)
+        if total_value_usd <= 0:
+            return actions
+
+        for holding in holdings:
+            ticker = holding['ticker']
+            if ticker not in target_weights:
+                continue
+
+            current_weight = holding.get('total_value_usd', holding['total_value']) / total_value_usd * 100
+            target_weight = target_weights[ticker] * 100
+
+            # 1% 이상 차이나는 경우만 추가
+            if abs(target_weight - current_weight) <= 1.0 or current_weight <= 0:
+                continue
+
+            # 비중 비율만큼 주식 수 조정 (통화와 무관)
+            target_shares = int(holding['shares'] * target_weight / current_weight)
+            shares_diff = target_shares - holding['shares']
+
+            actions.append({
+                'ticker': ticker,
+                'action': "INCREASE" if target_weight > current_weight else "REDUCE",
+                'current_weight': round(current_weight, 2),
+                'target_weight': round(target_weight, 2),
+                'current_shares': holding['shares'],
+                'target_shares': target_shares,
+                'shares_diff': shares_diff,
+                'current_price': holding['current_price'],
+                'amount': round(abs(shares_diff) * holding['current_price'], 2),
+                'reason': f"{reason}: {current_weight:.1f}% → {target_weight:.1f}%",
+                'currency': holding.get('currency', 'USD')
+            })
+
+        return actions
+
     def _calculate_expected_impact(
         self,
         holdings: List[Dict],
@@ -295,18 +461,23 @@ class Rebalancer:
 
     async def save_proposal(self, proposal: Dict) -> RebalanceProposal:
         """제안을 데이터베이스에 저장"""
-        db_proposal = RebalanceProposal(**proposal)
-        self.db.add(db_proposal)
-        self.db.commit()
-        self.db.refresh(db_proposal)
+        def save():
+            db_proposal = RebalanceProposal(**proposal)
+            self.db.add(db_proposal)
+            self.db.commit()
+            self.db.refresh(db_proposal)
+            return db_proposal
 
-        return db_proposal
+        return await run_blocking(save)
 
     async def execute_proposal(self, proposal_id: int):
         """리밸런싱 제안 실행
 
         실제 거래는 하지 않고, 포트폴리오 데이터만 업데이트
         """
+        return await run_blocking(self._execute_proposal, proposal_id)
+
+    def _execute_proposal(self, proposal_id: int):
         proposal = self.db.query(RebalanceProposal).filter(
             RebalanceProposal.id == proposal_id
         ).first()
@@ -340,5 +511,6 @@ class Rebalancer:
         proposal.executed_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
         self.db.commit()
+        self.db.refresh(proposal)
 
         return proposal
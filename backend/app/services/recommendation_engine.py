@@ -1,17 +1,52 @@
 """AI-Powered Stock Recommendation Engine - AI 기반 종목 추천 시스템"""
 import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
+import asyncio
 import os
 
 from app.models.portfolio import Portfolio
 from app.models.holding import Holding
-from app.models.sector import StockInfo, StockRecommendation, SectorType, AssetType
-from app.services.data_fetcher import StockDataFetcher
-from app.ml.predictor import StockPredictor
-from app.ml.gru_predictor import GRUPredictor
+from app.models.sector import StockInfo, StockRecommendation, RecommendationScore, SectorType, AssetType
+from app.ml.model_cache import predictor_cache
+from app.services.returns_cache import returns_matrix_cache
+from app.services.blocking import run_blocking
+from app.services.tracing import propagate
+
+# AI 예측을 병렬로 실행하는 워커 수
+MAX_EVALUATION_WORKERS = 8
+
+# 평가에 필요한 최소 가격 이력 (모델 입력 길이)
+MIN_PRICE_HISTORY = 60
+
+# 사전 계산 점수 유효 기간 (주말/휴일에도 마지막 거래일 점수 사용)
+PRECOMPUTED_SCORE_MAX_AGE = timedelta(days=4)
+
+# 종합 점수 가중치
+SCORE_WEIGHTS = {
+    'ai': 0.35,
+    'technical': 0.25,
+    'momentum': 0.20,
+    'diversification': 0.20
+}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = Lock()
+
+
+def get_evaluation_executor() -> ThreadPoolExecutor:
+    """추천 후보 평가용 공유 워커 풀"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=MAX_EVALUATION_WORKERS, thread_name_prefix="recommendation"
+            )
+        return _executor
 
 
 class RecommendationEngine:
@@ -27,6 +62,7 @@ class RecommendationEngine:
     def __init__(self, db: Session):
         self.db = db
         self.models_dir = "models"
+        self._model_files = None  # 모델 디렉토리 목록 (요청당 한 번 조회)
 
     async def generate_recommendations(
         self,
@@ -44,32 +80,29 @@ class RecommendationEngine:
         Returns:
             추천 종목 리스트
         """
-        # 현재 포트폴리오 분석
-        current_holdings = {}
-        if portfolio_id:
-            holdings = self.db.query(Holding).filter(
-                Holding.portfolio_id == portfolio_id
-            ).all()
-            current_holdings = {h.ticker: h for h in holdings}
+        # 보유 종목, 후보 종목, 사전 계산 점수 조회 (워커 풀에서 실행)
+        current_holdings, candidate_stocks, scores, holding_profile = await run_blocking(
+            self._load_inputs, portfolio_id, focus_sectors
+        )
 
-        # 추천 후보 종목 가져오기
-        candidate_stocks = self._get_candidate_stocks(focus_sectors)
+        # 사전 계산 점수가 없는 종목만 즉시 계산
+        missing = [stock for stock in candidate_stocks if stock.ticker not in scores]
+        if missing:
+            scores.update(await self.score_candidates(missing))
 
         # 각 종목 평가
         recommendations = []
         for stock in candidate_stocks:
-            # 이미 보유 중인 종목은 추가 매수/매도 판단
-            is_holding = stock.ticker in current_holdings
+            if stock.ticker not in scores:
+                continue
 
-            # 종목 평가
-            evaluation = await self._evaluate_stock(
+            recommendations.append(self._build_recommendation(
                 stock,
+                scores[stock.ticker],
                 portfolio_id,
-                current_holdings
-            )
-
-            if evaluation:
-                recommendations.append(evaluation)
+                current_holdings,
+                holding_profile
+            ))
 
         # 점수순 정렬
         recommendations.sort(key=lambda x: x['confidence_score'], reverse=True)
@@ -77,6 +110,27 @@ class RecommendationEngine:
         # 상위 N개 추천
         return recommendations[:max_recommendations]
 
+    def _load_inputs(self, portfolio_id: Optional[int], focus_sectors: Optional[List[str]]) -> tuple:
+        """(보유 종목, 후보 종목, 사전 계산 점수, 보유 종목 섹터/국가)"""
+        # 현재 포트폴리오 분석
+        current_holdings = {}
+        if portfolio_id:
+            holdings = self.db.query(Holding).filter(
+                Holding.portfolio_id == portfolio_id
+            ).all()
+            current_holdings = {h.ticker: h for h in holdings}
+
+        # 추천 후보 종목 가져오기
+        candidate_stocks = self._get_candidate_stocks(focus_sectors)
+
+        # 사전 계산된 점수
+        scores = self._load_precomputed_scores(candidate_stocks)
+
+        # 보유 종목 섹터/국가 (한 번만 조회)
+        holding_profile = self._load_holding_profile(current_holdings)
+
+        return current_holdings, candidate_stocks, scores, holding_profile
+
     def _get_candidate_stocks(self, focus_sectors: Optional[List[str]] = None) -> List[StockInfo]:
         """추천 후보 종목 가져오기"""
         query = self.db.query(StockInfo)
@@ -87,124 +141,220 @@ class RecommendationEngine:
             if sector_enums:
                 query = query.filter(StockInfo.sector.in_(sector_enums))
 
-        # 훈련된 모델이 있는 종목만
+        # 훈련된 모델이 있는 종목만 (모델 디렉토리는 한 번만 조회)
         all_stocks = query.all()
-        candidate_stocks = []
+        return [stock for stock in all_stocks if self._model_file(stock.ticker)]
+
+    def _model_file(self, ticker: str) -> Optional[tuple]:
+        """(모델 경로, 모델 종류) - GRU 우선, 없으면 None"""
+        if self._model_files is None:
+            try:
+                self._model_files = set(os.listdir(self.models_dir))
+            except OSError:
+                self._model_files = set()
+
+        gru_filename = f"{ticker.replace('.', '_')}_GRU_model.h5"
+        model_filename = f"{ticker.replace('.', '_')}_LSTM_model.h5"
+        if gru_filename in self._model_files:
+            return os.path.join(self.models_dir, gru_filename), "GRU"
+        if model_filename in self._model_files:
+            return os.path.join(self.models_dir, model_filename), "LSTM"
+        return None
+
+    async def score_candidates(self, stocks: List[StockInfo]) -> Dict[str, Dict]:
+        """후보 종목 점수 일괄 계산
 
-        for stock in all_stocks:
-            model_filename = f"{stock.ticker.replace('.', '_')}_LSTM_model.h5"
-            gru_filename = f"{stock.ticker.replace('.', '_')}_GRU_model.h5"
-            model_path = os.path.join(self.models_dir, model_filename)
-            gru_path = os.path.join(self.models_dir, gru_filename)
-
-            if os.path.exists(model_path) or os.path.exists(gru_path):
-                candidate_stocks.append(stock)
+        Returns:
+            {ticker: {'ai': float, 'technical': float, 'momentum': float,
+                      'current_price': float}} (데이터가 부족한 종목 제외)
+        """
+        if not stocks:
+            return {}
+
+        # 가격 적재와 지표 계산은 워커 풀에서 실행
+        closes, technical, momentum = await run_blocking(self._score_prices, stocks)
+        if not closes:
+            return {}
+        tickers = list(closes)
+
+        # AI 예측 점수 (제한된 워커 풀에서 병렬 실행)
+        loop = asyncio.get_running_loop()
+        executor = get_evaluation_executor()
+        score_ai = propagate(self._calculate_ai_prediction_score)
+        ai_scores = await asyncio.gather(*(
+            loop.run_in_executor(executor, score_ai, ticker, closes[ticker])
+            for ticker in tickers
+        ))
+
+        return {
+            ticker: {
+                'ai': float(ai_scores[i]),
+                'technical': float(technical[i]),
+                'momentum': float(momentum[i]),
+                'current_price': float(closes[ticker][-1]),
+            }
+            for i, ticker in enumerate(tickers)
+        }
 
-        return candidate_stocks
+    async def precompute_scores(self) -> int:
+        """전체 후보 종목 점수 사전 계산 후 저장 (스케줄러 작업)
 
-    async def _evaluate_stock(
+        Returns:
+            저장된 종목 수
+        """
+        candidate_stocks = await run_blocking(self._get_candidate_stocks)
+        scores = await self.score_candidates(candidate_stocks)
+        if not scores:
+            return 0
+
+        return await run_blocking(self._save_scores, scores)
+
+    def _save_scores(self, scores: Dict[str, Dict]) -> int:
+        """점수 upsert (한 번의 조회와 커밋)"""
+        existing = {
+            row.ticker: row
+            for row in self.db.query(RecommendationScore).filter(
+                RecommendationScore.ticker.in_(list(scores))
+            ).all()
+        }
+
+        computed_at = datetime.now()
+        for ticker, component in scores.items():
+            row = existing.get(ticker)
+            if row is None:
+                row = RecommendationScore(ticker=ticker)
+                self.db.add(row)
+            row.ai_prediction_score = component['ai']
+            row.technical_score = component['technical']
+            row.momentum_score = component['momentum']
+            row.base_score = self._base_score(component)
+            row.current_price = component['current_price']
+            row.computed_at = computed_at
+
+        # 한 번에 커밋
+        self.db.commit()
+        return len(scores)
+
+    def _load_precomputed_scores(self, stocks: List[StockInfo]) -> Dict[str, Dict]:
+        """유효 기간 내 사전 계산 점수 (score_candidates와 같은 형식)"""
+        if not stocks:
+            return {}
+
+        rows = self.db.query(RecommendationScore).filter(
+            RecommendationScore.ticker.in_([stock.ticker for stock in stocks]),
+            RecommendationScore.computed_at >= datetime.now() - PRECOMPUTED_SCORE_MAX_AGE
+        ).all()
+
+        return {
+            row.ticker: {
+                'ai': row.ai_prediction_score,
+                'technical': row.technical_score,
+                'momentum': row.momentum_score,
+                'current_price': row.current_price,
+            }
+            for row in rows
+        }
+
+    @staticmethod
+    def _base_score(scores: Dict) -> float:
+        """다각화 항목을 제외한 가중 점수"""
+        return (
+            scores['ai'] * SCORE_WEIGHTS['ai'] +
+            scores['technical'] * SCORE_WEIGHTS['technical'] +
+            scores['momentum'] * SCORE_WEIGHTS['momentum']
+        )
+
+    def _score_prices(self, stocks: List[StockInfo]) -> tuple:
+        """(종목별 종가, 기술적 점수, 모멘텀 점수) - 가격 데이터가 부족한 종목 제외"""
+        # 1년 종가 (수익률 행렬 캐시, 누락 종목만 일괄 다운로드)
+        universe = returns_matrix_cache.get_snapshot([stock.ticker for stock in stocks])
+        closes = {}
+        for stock in stocks:
+            if stock.ticker in universe['index']:
+                series = universe['closes'][stock.ticker].dropna().to_numpy(dtype=np.float64)
+                if len(series) >= MIN_PRICE_HISTORY:
+                    closes[stock.ticker] = series
+        if not closes:
+            return {}, np.zeros(0), np.zeros(0)
+
+        matrix = self._aligned_closes(list(closes.values()))
+
+        # 기술적/모멘텀 점수 (전 종목 벡터 연산)
+        return closes, self._calculate_technical_scores(matrix), self._calculate_momentum_scores(matrix)
+
+    def _build_recommendation(
         self,
         stock: StockInfo,
+        scores: Dict,
         portfolio_id: Optional[int],
-        current_holdings: Dict
-    ) -> Optional[Dict]:
-        """종목 평가 및 점수 계산"""
-        try:
-            # 가격 데이터 가져오기
-            price_data = StockDataFetcher.fetch_yahoo_finance(stock.ticker, period="1y")
-            if price_data is None or price_data.empty or len(price_data) < 60:
-                return None
-
-            # 1. AI 예측 점수
-            ai_score = await self._calculate_ai_prediction_score(stock.ticker, price_data)
-
-            # 2. 기술적 분석 점수
-            technical_score = self._calculate_technical_score(price_data)
-
-            # 3. 모멘텀 점수
-            momentum_score = self._calculate_momentum_score(price_data)
-
-            # 4. 다각화 점수 (포트폴리오가 있는 경우)
-            diversification_score = 0.5  # 기본값
-            if portfolio_id and current_holdings:
-                diversification_score = self._calculate_diversification_benefit(
-                    stock, current_holdings
-                )
-
-            # 종합 점수 계산 (가중 평균)
-            weights = {
-                'ai': 0.35,
-                'technical': 0.25,
-                'momentum': 0.20,
-                'diversification': 0.20
-            }
-
-            confidence_score = (
-                ai_score * weights['ai'] +
-                technical_score * weights['technical'] +
-                momentum_score * weights['momentum'] +
-                diversification_score * weights['diversification']
-            )
-
-            # 매매 액션 결정
-            action, reason_category, reason_detail = self._determine_action(
-                stock.ticker,
-                current_holdings,
-                confidence_score,
-                ai_score,
-                technical_score
-            )
-
-            # 목표 비중 계산
-            target_weight = self._calculate_target_weight(
-                confidence_score,
-                stock.is_etf
+        current_holdings: Dict,
+        holding_profile: tuple
+    ) -> Dict:
+        """점수로부터 추천 항목 생성"""
+        ai_score = scores['ai']
+        technical_score = scores['technical']
+        momentum_score = scores['momentum']
+
+        # 다각화 점수 (포트폴리오가 있는 경우)
+        diversification_score = 0.5  # 기본값
+        if portfolio_id and current_holdings:
+            diversification_score = self._calculate_diversification_benefit(
+                stock, holding_profile
             )
 
-            current_price = float(price_data['close'].iloc[-1])
-
-            return {
-                'ticker': stock.ticker,
-                'name': stock.name,
-                'action': action,
-                'confidence_score': round(confidence_score, 3),
-                'target_weight': round(target_weight, 2),
-                'reason_category': reason_category,
-                'reason_detail': reason_detail,
-                'ai_prediction_score': round(ai_score, 3),
-                'technical_score': round(technical_score, 3),
-                'momentum_score': round(momentum_score, 3),
-                'diversification_score': round(diversification_score, 3),
-                'current_price': round(current_price, 2),
-                'sector': stock.sector.value if stock.sector else None,
-                'is_etf': stock.is_etf,
-                'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'expires_at': (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d %H:%M:%S')
-            }
-
-        except Exception as e:
-            print(f"Error evaluating {stock.ticker}: {e}")
-            return None
-
-    async def _calculate_ai_prediction_score(self, ticker: str, price_data: pd.DataFrame) -> float:
-        """AI 예측 점수 계산 (0.0 - 1.0)"""
+        # 종합 점수 계산 (가중 평균)
+        confidence_score = (
+            self._base_score(scores) +
+            diversification_score * SCORE_WEIGHTS['diversification']
+        )
+
+        # 매매 액션 결정
+        action, reason_category, reason_detail = self._determine_action(
+            stock.ticker,
+            current_holdings,
+            confidence_score,
+            ai_score,
+            technical_score
+        )
+
+        # 목표 비중 계산
+        target_weight = self._calculate_target_weight(
+            confidence_score,
+            stock.is_etf
+        )
+
+        return {
+            'ticker': stock.ticker,
+            'name': stock.name,
+            'action': action,
+            'confidence_score': round(confidence_score, 3),
+            'target_weight': round(target_weight, 2),
+            'reason_category': reason_category,
+            'reason_detail': reason_detail,
+            'ai_prediction_score': round(ai_score, 3),
+            'technical_score': round(technical_score, 3),
+            'momentum_score': round(momentum_score, 3),
+            'diversification_score': round(diversification_score, 3),
+            'current_price': round(scores['current_price'], 2),
+            'sector': stock.sector.value if stock.sector else None,
+            'is_etf': stock.is_etf,
+            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'expires_at': (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+    def _calculate_ai_prediction_score(self, ticker: str, closes: np.ndarray) -> float:
+        """AI 예측 점수 계산 (0.0 - 1.0) - 워커 스레드에서 실행"""
         try:
-            # 모델 파일 찾기 (LSTM 또는 GRU)
-            model_filename = f"{ticker.replace('.', '_')}_LSTM_model.h5"
-            gru_filename = f"{ticker.replace('.', '_')}_GRU_model.h5"
-            model_path = os.path.join(self.models_dir, model_filename)
-            gru_path = os.path.join(self.models_dir, gru_filename)
-
-            predictor = None
-            if os.path.exists(gru_path):
-                predictor = GRUPredictor(model_path=gru_path)
-            elif os.path.exists(model_path):
-                predictor = StockPredictor(model_path=model_path)
-            else:
+            # 모델 파일 찾기 (GRU 우선, 메모리 상주 캐시 사용)
+            model_file = self._model_file(ticker)
+            cached = predictor_cache.get(*model_file) if model_file else None
+            if cached is None:
                 return 0.5  # 모델 없으면 중립
 
             # 예측 실행
-            prediction = predictor.predict(price_data.tail(60))
+            predictor, predictor_lock = cached
+            with predictor_lock:
+                prediction = predictor.predict(pd.DataFrame({'close': closes[-MIN_PRICE_HISTORY:]}))
 
             # 예측 상승률을 점수로 변환 (-10% ~ +10% → 0.0 ~ 1.0)
             change_percent = prediction['change_percent']
@@ -223,137 +373,120 @@ class RecommendationEngine:
             print(f"AI prediction error for {ticker}: {e}")
             return 0.5
 
-    def _calculate_technical_score(self, price_data: pd.DataFrame) -> float:
-        """기술적 분석 점수 (RSI, MACD, Bollinger Bands)"""
-        try:
-            close = price_data['close']
-
+    @staticmethod
+    def _aligned_closes(series_list: List[np.ndarray]) -> np.ndarray:
+        """종목별 종가를 최근일 기준으로 정렬한 (일수 x 종목) 행렬, 앞쪽은 NaN"""
+        length = max(len(series) for series in series_list)
+        matrix = np.full((length, len(series_list)), np.nan)
+        for i, series in enumerate(series_list):
+            matrix[length - len(series):, i] = series
+        return matrix
+
+    def _calculate_technical_scores(self, closes: np.ndarray) -> np.ndarray:
+        """기술적 분석 점수 (RSI, MACD, Bollinger Bands) - 종목별 벡터"""
+        with np.errstate(divide='ignore', invalid='ignore'):
             # RSI (Relative Strength Index)
-            rsi = self._calculate_rsi(close, period=14)
-            rsi_score = self._normalize_rsi(rsi)
+            rsi_score = self._normalize_rsi(self._calculate_rsi(closes, period=14))
 
             # MACD
-            macd_score = self._calculate_macd_score(close)
+            macd_score = self._calculate_macd_score(closes)
 
             # Bollinger Bands
-            bb_score = self._calculate_bollinger_score(close)
+            bb_score = self._calculate_bollinger_score(closes)
 
             # 가중 평균
-            technical_score = (rsi_score * 0.4 + macd_score * 0.3 + bb_score * 0.3)
+            technical_score = rsi_score * 0.4 + macd_score * 0.3 + bb_score * 0.3
 
-            return max(0.0, min(1.0, technical_score))
+        return np.where(np.isnan(technical_score), 0.5, np.clip(technical_score, 0.0, 1.0))
 
-        except Exception as e:
-            print(f"Technical analysis error: {e}")
-            return 0.5
-
-    def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> float:
-        """RSI 계산"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    def _calculate_rsi(self, closes: np.ndarray, period: int = 14) -> np.ndarray:
+        """RSI 계산 (최근 period일 평균 상승/하락폭)"""
+        delta = np.diff(closes[-(period + 1):], axis=0)
+        gain = np.maximum(delta, 0).mean(axis=0)
+        loss = np.maximum(-delta, 0).mean(axis=0)
 
         rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-
-        return rsi.iloc[-1]
+        return 100 - (100 / (1 + rs))
 
-    def _normalize_rsi(self, rsi: float) -> float:
+    def _normalize_rsi(self, rsi: np.ndarray) -> np.ndarray:
         """RSI를 점수로 변환 (0-1)
 
         RSI < 30: 과매도 (매수 신호) → 높은 점수
         RSI > 70: 과매수 (매도 신호) → 낮은 점수
+        30-70 사이: 중립 구간 → 0.4 - 0.6
         """
-        if rsi < 30:
-            return 0.8 + (30 - rsi) / 100  # 0.8 - 1.0
-        elif rsi > 70:
-            return 0.2 - (rsi - 70) / 100  # 0.0 - 0.2
-        else:
-            # 30-70 사이: 중립 구간
-            return 0.4 + (50 - abs(rsi - 50)) / 100  # 0.4 - 0.6
+        return np.where(
+            rsi < 30, 0.8 + (30 - rsi) / 100,
+            np.where(rsi > 70, 0.2 - (rsi - 70) / 100, 0.4 + (50 - np.abs(rsi - 50)) / 100)
+        )
 
-    def _calculate_macd_score(self, prices: pd.Series) -> float:
+    def _calculate_macd_score(self, closes: np.ndarray) -> np.ndarray:
         """MACD 점수 계산"""
-        try:
-            # MACD 계산
-            exp1 = prices.ewm(span=12, adjust=False).mean()
-            exp2 = prices.ewm(span=26, adjust=False).mean()
-            macd = exp1 - exp2
-            signal = macd.ewm(span=9, adjust=False).mean()
-
-            # 최근 MACD 크로스오버 확인
-            macd_diff = macd.iloc[-1] - signal.iloc[-1]
-
-            # MACD가 시그널 위에 있으면 상승 신호
-            if macd_diff > 0:
-                return 0.6 + min(0.4, abs(macd_diff) / prices.iloc[-1] * 100)
-            else:
-                return 0.4 - min(0.4, abs(macd_diff) / prices.iloc[-1] * 100)
+        frame = pd.DataFrame(closes)
+        exp1 = frame.ewm(span=12, adjust=False).mean()
+        exp2 = frame.ewm(span=26, adjust=False).mean()
+        macd = exp1 - exp2
+        signal = macd.ewm(span=9, adjust=False).mean()
 
-        except:
-            return 0.5
+        # 최근 MACD 크로스오버 확인
+        macd_diff = (macd.iloc[-1] - signal.iloc[-1]).to_numpy()
+        strength = np.minimum(0.4, np.abs(macd_diff) / closes[-1] * 100)
+
+        # MACD가 시그널 위에 있으면 상승 신호
+        return np.where(macd_diff > 0, 0.6 + strength, 0.4 - strength)
 
-    def _calculate_bollinger_score(self, prices: pd.Series, period: int = 20) -> float:
+    def _calculate_bollinger_score(self, closes: np.ndarray, period: int = 20) -> np.ndarray:
         """볼린저 밴드 점수"""
-        try:
-            sma = prices.rolling(window=period).mean()
-            std = prices.rolling(window=period).std()
-
-            upper_band = sma + (std * 2)
-            lower_band = sma - (std * 2)
-
-            current_price = prices.iloc[-1]
-            current_sma = sma.iloc[-1]
-            current_upper = upper_band.iloc[-1]
-            current_lower = lower_band.iloc[-1]
-
-            # 현재 가격이 밴드 내 어디에 위치하는지 (0-1)
-            band_position = (current_price - current_lower) / (current_upper - current_lower)
-
-            # 하단 근처 (0-0.2): 과매도 → 높은 점수
-            # 상단 근처 (0.8-1.0): 과매수 → 낮은 점수
-            if band_position < 0.2:
-                return 0.8
-            elif band_position > 0.8:
-                return 0.2
-            else:
-                return 0.5
+        window = closes[-period:]
+        sma = window.mean(axis=0)
+        std = window.std(axis=0, ddof=1)
 
-        except:
-            return 0.5
+        upper_band = sma + (std * 2)
+        lower_band = sma - (std * 2)
 
-    def _calculate_momentum_score(self, price_data: pd.DataFrame) -> float:
-        """모멘텀 점수 (최근 추세)"""
-        try:
-            close = price_data['close']
+        # 현재 가격이 밴드 내 어디에 위치하는지 (0-1)
+        band_position = (closes[-1] - lower_band) / (upper_band - lower_band)
 
-            # 여러 기간의 수익률
-            returns_5d = (close.iloc[-1] / close.iloc[-6] - 1)
-            returns_20d = (close.iloc[-1] / close.iloc[-21] - 1)
-            returns_60d = (close.iloc[-1] / close.iloc[-61] - 1)
+        # 하단 근처 (0-0.2): 과매도 → 높은 점수
+        # 상단 근처 (0.8-1.0): 과매수 → 낮은 점수
+        return np.where(band_position < 0.2, 0.8, np.where(band_position > 0.8, 0.2, 0.5))
 
-            # 가중 평균 (최근이 더 중요)
-            momentum = (returns_5d * 0.5 + returns_20d * 0.3 + returns_60d * 0.2)
+    def _calculate_momentum_scores(self, closes: np.ndarray) -> np.ndarray:
+        """모멘텀 점수 (최근 추세) - 종목별 벡터"""
+        if len(closes) < 61:
+            return np.full(closes.shape[1], 0.5)
 
-            # -20% ~ +20% 를 0-1로 정규화
-            normalized = (momentum + 0.2) / 0.4
-            return max(0.0, min(1.0, normalized))
+        # 여러 기간의 수익률
+        returns_5d = closes[-1] / closes[-6] - 1
+        returns_20d = closes[-1] / closes[-21] - 1
+        returns_60d = closes[-1] / closes[-61] - 1
 
-        except:
-            return 0.5
+        # 가중 평균 (최근이 더 중요)
+        momentum = (returns_5d * 0.5 + returns_20d * 0.3 + returns_60d * 0.2)
+
+        # -20% ~ +20% 를 0-1로 정규화
+        normalized = np.clip((momentum + 0.2) / 0.4, 0.0, 1.0)
+        return np.where(np.isnan(normalized), 0.5, normalized)
+
+    def _load_holding_profile(self, current_holdings: Dict) -> tuple:
+        """보유 종목의 (섹터 집합, 국가 집합) - 한 번의 쿼리"""
+        if not current_holdings:
+            return set(), set()
+
+        stock_infos = self.db.query(StockInfo).filter(
+            StockInfo.ticker.in_(list(current_holdings))
+        ).all()
+        current_sectors = {info.sector.value for info in stock_infos if info.sector}
+        current_countries = {info.country for info in stock_infos}
+        return current_sectors, current_countries
 
     def _calculate_diversification_benefit(
         self,
         stock: StockInfo,
-        current_holdings: Dict
+        holding_profile: tuple
     ) -> float:
         """다각화 기여도 점수"""
-        # 섹터 다각화
-        current_sectors = set()
-        for ticker, holding in current_holdings.items():
-            stock_info = self.db.query(StockInfo).filter(StockInfo.ticker == ticker).first()
-            if stock_info and stock_info.sector:
-                current_sectors.add(stock_info.sector.value)
+        current_sectors, current_countries = holding_profile
 
         # 새로운 섹터면 높은 점수
         if stock.sector and stock.sector.value not in current_sectors:
@@ -362,12 +495,6 @@ class RecommendationEngine:
             sector_score = 0.3
 
         # 지역 다각화
-        current_countries = set()
-        for ticker, holding in current_holdings.items():
-            stock_info = self.db.query(StockInfo).filter(StockInfo.ticker == ticker).first()
-            if stock_info:
-                current_countries.add(stock_info.country)
-
         if stock.country not in current_countries:
             geo_score = 0.7
         else:
@@ -435,6 +562,9 @@ class RecommendationEngine:
         portfolio_id: Optional[int] = None
     ):
         """추천 결과를 데이터베이스에 저장"""
+        await run_blocking(self._save_recommendations, recommendations, portfolio_id)
+
+    def _save_recommendations(self, recommendations: List[Dict], portfolio_id: Optional[int]):
         for rec in recommendations:
             recommendation = StockRecommendation(
                 portfolio_id=portfolio_id,
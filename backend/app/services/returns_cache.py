@@ -0,0 +1,256 @@
+"""Daily-refreshed returns matrix and covariance cache for portfolio risk"""
+from datetime import date
+from threading import Event, Lock
+from typing import Dict, List, Optional
+import logging
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+logger = logging.getLogger(__name__)
+
+# History used for risk metrics and the market benchmark
+HISTORY_PERIOD = "1y"
+MARKET_TICKER = "SPY"
+
+# Minimum overlapping market days for a meaningful beta
+MIN_BETA_OBSERVATIONS = 30
+
+
+class ReturnsMatrixCache:
+    """
+    Thread-safe universe of daily closes and derived risk statistics
+
+    Every ticker ever requested today (plus the market benchmark) lives in
+    one date x ticker close matrix on the union trading calendar. Missing
+    tickers are downloaded together in a single batched request; the whole
+    universe is dropped on the first request of a new day.
+
+    From the matrix a snapshot is derived once per change: the returns
+    matrix R (zero return on days a ticker's market was closed), the mask
+    of days each ticker actually traded, per-ticker betas against the
+    market and the last price/return per ticker.
+
+    The union calendar depends on which tickers happen to be loaded, so
+    portfolio statistics go through portfolio_view(), which keeps only the
+    days at least one of the portfolio's tickers traded. On those rows a
+    portfolio's variance is w'Σw and its return series is R·w, whatever
+    other markets are in the universe.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._day: Optional[date] = None
+        self._generation = 0
+        self._closes = pd.DataFrame()
+        self._unavailable = set()
+        self._snapshot: Optional[Dict] = None
+        # ticker -> Event set when the download fetching it finishes
+        self._in_flight: Dict[str, Event] = {}
+
+    def get_snapshot(self, tickers: List[str]) -> Dict:
+        """
+        Risk snapshot covering ``tickers`` (unavailable tickers are absent)
+
+        Downloads run outside the lock, so requests for tickers that are
+        already loaded never wait on the provider. A ticker another request
+        is already downloading is waited for instead of fetched twice.
+
+        Returns:
+            Dict with 'tickers', 'index' (ticker -> column), 'returns' (T x N),
+            'traded' (T x N, days each ticker had a return), 'beta' (N),
+            'market_mask' (T, days the market traded), 'last_price' (N),
+            'last_return' (N) and 'closes' (date x ticker frame, NaN on days a
+            ticker did not trade; read-only)
+        """
+        wanted = list(dict.fromkeys(list(tickers) + [MARKET_TICKER]))
+        # Tickers already fetched or waited for by this call; a failed download is not retried here
+        attempted = set()
+
+        while True:
+            with self._lock:
+                if self._day != date.today():
+                    self._reset(date.today())
+
+                missing = [
+                    t for t in wanted
+                    if t not in self._closes.columns and t not in self._unavailable and t not in attempted
+                ]
+                if not missing:
+                    if self._snapshot is None:
+                        self._snapshot = self._build_snapshot()
+                    return self._snapshot
+
+                waiting = {self._in_flight[t] for t in missing if t in self._in_flight}
+                to_load = [t for t in missing if t not in self._in_flight]
+                done = Event()
+                for t in to_load:
+                    self._in_flight[t] = done
+                generation = self._generation
+
+            attempted.update(missing)
+            if to_load:
+                try:
+                    closes = self._download(to_load)
+                    with self._lock:
+                        if self._generation == generation:
+                            self._merge(to_load, closes)
+                finally:
+                    with self._lock:
+                        for t in to_load:
+                            if self._in_flight.get(t) is done:
+                                del self._in_flight[t]
+                    done.set()
+
+            for event in waiting:
+                event.wait()
+
+    def invalidate(self):
+        """Drop the universe; it is rebuilt on the next request"""
+        with self._lock:
+            self._day = None
+
+    def get_stats(self):
+        """Get cache statistics"""
+        with self._lock:
+            return {
+                "day": self._day.isoformat() if self._day else None,
+                "tickers": len(self._closes.columns),
+                "observations": len(self._closes),
+                "unavailable": sorted(self._unavailable),
+                "in_flight": sorted(self._in_flight),
+            }
+
+    def _reset(self, day: date):
+        # Downloads started before the reset are discarded when they finish
+        self._day = day
+        self._generation += 1
+        self._closes = pd.DataFrame()
+        self._unavailable = set()
+        self._snapshot = None
+        self._in_flight = {}
+
+    def _download(self, tickers: List[str]) -> Optional[pd.DataFrame]:
+        """Closes for ``tickers`` in one request (None if the request failed)"""
+        try:
+            raw = yf.download(
+                tickers, period=HISTORY_PERIOD, interval="1d",
+                auto_adjust=True, progress=False, group_by="column"
+            )
+        except Exception as e:
+            logger.error(f"Error downloading returns history: {e}")
+            return None
+
+        closes = raw["Close"] if raw is not None and not raw.empty else pd.DataFrame()
+        if isinstance(closes, pd.Series):
+            closes = closes.to_frame(tickers[0])
+        if not closes.empty and closes.index.tz is not None:
+            closes.index = closes.index.tz_localize(None)
+        return closes
+
+    def _merge(self, tickers: List[str], closes: Optional[pd.DataFrame]):
+        """Join downloaded closes into the universe (caller holds the lock)"""
+        if closes is None:
+            return
+
+        loaded = [t for t in tickers if t in closes.columns and closes[t].notna().sum() > 1]
+        self._unavailable.update(set(tickers) - set(loaded))
+        if not loaded:
+            return
+
+        self._closes = self._closes.join(closes[loaded], how="outer").sort_index()
+        self._snapshot = None
+        logger.info(f"📈 Returns cache loaded {len(loaded)} tickers ({len(self._closes.columns)} total)")
+
+    def _build_snapshot(self) -> Dict:
+        closes = self._closes
+        tickers = list(closes.columns)
+        if not tickers:
+            return {
+                'tickers': [], 'index': {}, 'returns': np.zeros((0, 0)),
+                'traded': np.zeros((0, 0), dtype=bool), 'beta': np.zeros(0),
+                'market_mask': np.zeros(0, dtype=bool),
+                'last_price': np.zeros(0), 'last_return': np.zeros(0),
+                'closes': closes,
+            }
+
+        # Carry closes over holidays so those days are zero-return days
+        filled = closes.ffill()
+        changes = filled.pct_change(fill_method=None).iloc[1:]
+        returns = changes.fillna(0.0).to_numpy()
+        # A ticker trades on a row when it closed that day after an earlier close
+        traded = (closes.iloc[1:].notna() & changes.notna()).to_numpy()
+
+        # Last price and the return of the last bar each ticker actually traded
+        last_price = filled.iloc[-1].to_numpy(dtype=np.float64)
+        last_return = np.array([
+            series.iloc[-1] / series.iloc[-2] - 1 if len(series) > 1 else np.nan
+            for series in (closes[t].dropna() for t in tickers)
+        ])
+
+        # Betas on days the market traded: cov(r_i, r_m) / var(r_m)
+        beta = np.ones(len(tickers))
+        market_mask = np.zeros(len(returns), dtype=bool)
+        if MARKET_TICKER in tickers:
+            m = tickers.index(MARKET_TICKER)
+            market_mask = traded[:, m]
+            market = returns[market_mask, m]
+            if len(market) >= MIN_BETA_OBSERVATIONS and np.var(market) > 0:
+                centered = returns[market_mask] - returns[market_mask].mean(axis=0)
+                covariance_with_market = centered.T @ (market - market.mean()) / (len(market) - 1)
+                beta = covariance_with_market / np.var(market, ddof=1)
+
+        return {
+            'tickers': tickers,
+            'index': {t: i for i, t in enumerate(tickers)},
+            'returns': returns,
+            'traded': traded,
+            'beta': beta,
+            'market_mask': market_mask,
+            'last_price': last_price,
+            'last_return': last_return,
+            'closes': closes,
+        }
+
+
+def portfolio_view(snapshot: Dict, tickers: List[str]) -> Dict:
+    """
+    Returns and covariance of ``tickers`` on their own trading days
+
+    Rows where none of the tickers traded exist only because another
+    market is in the universe; they are dropped so the statistics do not
+    depend on what else has been loaded today.
+
+    Returns:
+        Dict with 'tickers' (the available ones, in order), 'index'
+        (ticker -> column of the view), 'columns' (snapshot columns),
+        'rows' (T, kept snapshot rows), 'returns' (rows x k) and
+        'covariance' (k x k, daily)
+    """
+    present = [t for t in dict.fromkeys(tickers) if t in snapshot['index']]
+    columns = [snapshot['index'][t] for t in present]
+    if not columns:
+        rows = np.zeros(len(snapshot['returns']), dtype=bool)
+        returns = np.zeros((0, 0))
+    else:
+        rows = snapshot['traded'][:, columns].any(axis=1)
+        returns = snapshot['returns'][np.ix_(rows, columns)]
+
+    k = len(columns)
+    covariance = np.zeros((k, k))
+    if len(returns) > 1:
+        covariance = np.atleast_2d(np.cov(returns, rowvar=False))
+
+    return {
+        'tickers': present,
+        'index': {t: i for i, t in enumerate(present)},
+        'columns': columns,
+        'rows': rows,
+        'returns': returns,
+        'covariance': covariance,
+    }
+
+
+# Global cache instance
+returns_matrix_cache = ReturnsMatrixCache()
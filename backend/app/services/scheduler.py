@@ -1,13 +1,16 @@
 """Background scheduler for automatic data collection and model training"""
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.base import STATE_PAUSED
 from apscheduler.triggers.cron import CronTrigger
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
+from app.config import get_settings
 from app.database import SessionLocal
 from app.models.holding import Holding
 from app.models.stock_price import StockPrice
 from app.models.scheduler_log import SchedulerLog
 from app.services.data_fetcher import StockDataFetcher
+from app.services.leader_election import DEFAULT_LOCK_FILE, LeaderElector
 import logging
 import os
 import sys
@@ -250,6 +253,15 @@ def refresh_prediction_cache():
                 logger.error(f"❌ Failed to refresh cache for {ticker}: {str(e)}")
 
         logger.info(f"Cache refresh completed: {success_count} success, {failed_count} failed")
+
+        # Materialize the treemap and sector views from the fresh predictions
+        try:
+            from app.services.prediction_snapshot import PredictionSnapshotService
+            PredictionSnapshotService(db, model_dir=model_dir).refresh()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"❌ Failed to rebuild prediction snapshots: {str(e)}")
+
         log_job_complete(log_id, success_count, failed_count)
         db.close()
 
@@ -258,6 +270,97 @@ def refresh_prediction_cache():
         log_job_failed(log_id, str(e))
 
 
+def refresh_model_signals():
+    """Replay retrained models walk-forward so backtests find current signals"""
+    log_id = log_job_start("refresh_model_signals", "모델 신호 갱신")
+    db = SessionLocal()
+    try:
+        from app.services.walk_forward import MODEL_DIR, WalkForwardEvaluator
+
+        if not os.path.exists(MODEL_DIR):
+            log_job_complete(log_id, 0, 0, "Model directory does not exist")
+            return
+
+        # Same naming as the walk-forward model path (AAPL_model.h5, 005930_KS_model.h5)
+        tickers = [
+            file.replace("_model.h5", "").replace("_", ".")
+            for file in os.listdir(MODEL_DIR)
+            if file.endswith("_model.h5")
+        ]
+        logger.info(f"🔁 Refreshing walk-forward signals for {len(tickers)} models...")
+
+        evaluator = WalkForwardEvaluator(db)
+        success_count = 0
+        failed_count = 0
+        for ticker in tickers:
+            try:
+                # Replays only when the stored signals predate the model file
+                evaluator.get_signals(ticker, refresh=True)
+                success_count += 1
+            except Exception as e:
+                db.rollback()
+                failed_count += 1
+                logger.error(f"❌ Failed to refresh signals for {ticker}: {str(e)}")
+
+        logger.info(f"Model signal refresh completed: {success_count} success, {failed_count} failed")
+        log_job_complete(log_id, success_count, failed_count)
+
+    except Exception as e:
+        logger.error(f"Error in refresh_model_signals: {e}")
+        db.rollback()
+        log_job_failed(log_id, str(e))
+    finally:
+        db.close()
+
+
+def precompute_recommendation_scores():
+    """Precompute recommendation component scores (after daily price collection)"""
+    log_id = log_job_start("precompute_recommendations", "추천 점수 사전 계산")
+    db = SessionLocal()
+    try:
+        from app.services.recommendation_engine import RecommendationEngine
+        from app.services.returns_cache import returns_matrix_cache
+        import asyncio
+
+        # Closes loaded earlier today do not include the bar just collected
+        returns_matrix_cache.invalidate()
+
+        logger.info("🧮 Precomputing recommendation scores...")
+        saved_count = asyncio.run(RecommendationEngine(db).precompute_scores())
+
+        logger.info(f"Recommendation scores precomputed: {saved_count} tickers")
+        log_job_complete(log_id, saved_count, 0, f"Scored {saved_count} tickers")
+
+    except Exception as e:
+        logger.error(f"Error in precompute_recommendation_scores: {e}")
+        db.rollback()
+        log_job_failed(log_id, str(e))
+    finally:
+        db.close()
+
+
+def build_missing_prediction_snapshots():
+    """Build the summary/sector snapshots once if none exist yet (e.g. a fresh database)"""
+    db = SessionLocal()
+    try:
+        from app.models.prediction_snapshot import PredictionSnapshot
+        from app.services.prediction_snapshot import PredictionSnapshotService
+
+        if db.query(PredictionSnapshot.ticker).first() is not None:
+            return
+
+        log_id = log_job_start("build_prediction_snapshots", "예측 스냅샷 초기 생성")
+        try:
+            rows = PredictionSnapshotService(db, model_dir="models").refresh()
+            log_job_complete(log_id, rows, 0)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"❌ Failed to build prediction snapshots: {str(e)}")
+            log_job_failed(log_id, str(e))
+    finally:
+        db.close()
+
+
 def start_scheduler():
     """Start the background scheduler"""
     if scheduler.running:
@@ -292,6 +395,31 @@ def start_scheduler():
         replace_existing=True
     )
 
+    # Schedule recommendation score precomputation after each price collection
+    scheduler.add_job(
+        precompute_recommendation_scores,
+        trigger=CronTrigger(
+            day_of_week='mon-fri',
+            hour=15,
+            minute=50
+        ),
+        id='precompute_recommendations_kr',
+        name='Precompute recommendation scores (KR market close)',
+        replace_existing=True
+    )
+
+    scheduler.add_job(
+        precompute_recommendation_scores,
+        trigger=CronTrigger(
+            day_of_week='tue-sat',
+            hour=6,
+            minute=20
+        ),
+        id='precompute_recommendations_us',
+        name='Precompute recommendation scores (US market close)',
+        replace_existing=True
+    )
+
     # Schedule actual price updates for predictions
     # Run after both market collections (evening)
     scheduler.add_job(
@@ -373,6 +501,19 @@ def start_scheduler():
         replace_existing=True
     )
 
+    # Schedule walk-forward signal refresh (after the morning training jobs)
+    scheduler.add_job(
+        refresh_model_signals,
+        trigger=CronTrigger(
+            day_of_week='mon-fri',
+            hour=12,
+            minute=0
+        ),
+        id='refresh_model_signals',
+        name='Refresh walk-forward model signals (daily)',
+        replace_existing=True
+    )
+
     # Schedule portfolio rebalancing check (daily at 5 PM after market close)
     scheduler.add_job(
         check_portfolio_rebalancing,
@@ -386,18 +527,31 @@ def start_scheduler():
         replace_existing=True
     )
 
+    # Build the prediction snapshots right away if they have never been built;
+    # the summary/sector endpoints serve an empty payload until then
+    scheduler.add_job(
+        build_missing_prediction_snapshots,
+        id='build_prediction_snapshots',
+        name='Build missing prediction snapshots (once at startup)',
+        replace_existing=True
+    )
+
     scheduler.start()
     logger.info("Scheduler started successfully")
     logger.info("Scheduled jobs:")
     logger.info("  - collect_prices_kr: Mon-Fri 15:35 (한국 장 종료 후 가격 수집)")
     logger.info("  - collect_prices_us: Tue-Sat 06:05 (미국 장 종료 후 가격 수집)")
+    logger.info("  - precompute_recommendations_kr: Mon-Fri 15:50 (추천 점수 사전 계산)")
+    logger.info("  - precompute_recommendations_us: Tue-Sat 06:20 (추천 점수 사전 계산)")
     logger.info("  - update_actuals: Mon-Fri 16:00 (예측 실제 가격 업데이트)")
     logger.info("  - cleanup_data: Sun 02:00 (데이터 정리)")
     logger.info("  - train_portfolio: Mon-Fri 08:00 (포트폴리오 매일 훈련)")
     logger.info("  - train_untrained: Mon-Fri 08:30 (미훈련 추천주 매일 훈련)")
     logger.info("  - train_weekly: Mon 09:00 (전체 추천주 주간 훈련)")
-    logger.info("  - refresh_cache: Mon-Fri 09:00-17:00 every 30min (예측 캐시 갱신)")
+    logger.info("  - refresh_cache: Mon-Fri 09:00-17:00 every 30min (예측 캐시 갱신 + 요약/섹터 스냅샷)")
+    logger.info("  - refresh_model_signals: Mon-Fri 12:00 (재훈련 모델 신호 갱신)")
     logger.info("  - check_rebalancing: Mon-Fri 17:00 (포트폴리오 리밸런싱 체크)")
+    logger.info("  - build_prediction_snapshots: once at startup (스냅샷이 없을 때만 생성)")
 
 
 def stop_scheduler():
@@ -564,51 +718,55 @@ def check_portfolio_rebalancing():
 
         rebalancer = Rebalancer(db)
 
-        checked_count = 0
+        # One event loop for all portfolios; held tickers are loaded once
+        import asyncio
+        results = asyncio.run(rebalancer.check_portfolios(portfolios))
+
+        checked_count = len(results)
         needs_rebalancing = 0
-        notification_count = 0
+        alerts = []
 
         for portfolio in portfolios:
-            try:
-                # Check if rebalancing is needed using async wrapper
-                import asyncio
-                check_result = asyncio.run(rebalancer.check_rebalancing_needed(portfolio.id))
-
-                checked_count += 1
+            check_result = results.get(portfolio.id)
+            if check_result is None:
+                continue
 
-                if check_result['needs_rebalancing']:
-                    needs_rebalancing += 1
-                    severity = check_result['severity']
-                    triggers = check_result['triggers']
-                    severity_score = check_result.get('severity_score', 0)
+            if check_result['needs_rebalancing']:
+                needs_rebalancing += 1
+                severity = check_result['severity']
+                triggers = check_result['triggers']
+                severity_score = check_result.get('severity_score', 0)
 
-                    logger.info(f"⚠️ Portfolio {portfolio.name} (ID: {portfolio.id}) needs rebalancing - Severity: {severity}")
-                    logger.info(f"   Triggers: {', '.join(triggers)}")
+                logger.info(f"⚠️ Portfolio {portfolio.name} (ID: {portfolio.id}) needs rebalancing - Severity: {severity}")
+                logger.info(f"   Triggers: {', '.join(triggers)}")
 
-                    # Create notification for user using existing method
-                    details = {
+                alerts.append({
+                    'user_id': portfolio.user_id,  # Send to portfolio owner
+                    'portfolio_name': portfolio.name,
+                    'deviation_percent': severity_score,  # Use severity score as deviation indicator
+                    'details': {
                         'portfolio_id': portfolio.id,
                         'severity': severity,
                         'triggers': triggers,
                         'severity_score': severity_score,
                         'timestamp': datetime.utcnow().isoformat()
                     }
+                })
 
-                    NotificationService.create_rebalance_notification(
-                        db=db,
-                        user_id=portfolio.user_id,  # Send to portfolio owner
-                        portfolio_name=portfolio.name,
-                        deviation_percent=severity_score,  # Use severity score as deviation indicator
-                        details=details
-                    )
-                    notification_count += 1
+            else:
+                logger.info(f"✅ Portfolio {portfolio.name} (ID: {portfolio.id}) is balanced")
 
-                else:
-                    logger.info(f"✅ Portfolio {portfolio.name} (ID: {portfolio.id}) is balanced")
+        # Batch-solve minimum-variance targets for every flagged portfolio
+        try:
+            flagged = [alert['details']['portfolio_id'] for alert in alerts]
+            targets = rebalancer.optimize_portfolios(flagged)
+            for alert in alerts:
+                alert['details']['target_weights'] = targets.get(alert['details']['portfolio_id'], {})
+        except Exception as e:
+            logger.error(f"❌ Failed to optimize target weights: {e}")
 
-            except Exception as e:
-                logger.error(f"❌ Failed to check portfolio {portfolio.id}: {str(e)}")
-                continue
+        # Create all notifications in one insert
+        notification_count = NotificationService.create_rebalance_notifications(db, alerts)
 
         logger.info(f"Rebalancing check completed: {checked_count} checked, {needs_rebalancing} need rebalancing, {notification_count} notifications sent")
         log_job_complete(log_id, checked_count, 0, f"{needs_rebalancing} portfolios need rebalancing")
@@ -669,3 +827,29 @@ def run_manual_collection():
     """Manually trigger price collection (for testing)"""
     logger.info("Manual price collection triggered")
     collect_stock_prices()
+
+
+def _run_as_leader():
+    """Start (or resume) the cron jobs in this process"""
+    if scheduler.state == STATE_PAUSED:
+        scheduler.resume()
+        logger.info("Scheduler resumed")
+    else:
+        start_scheduler()
+
+
+def _pause_as_follower():
+    """Stop launching cron jobs here; runs already in progress finish"""
+    if scheduler.running:
+        scheduler.pause()
+        logger.info("Scheduler paused")
+
+
+# Only the elected process runs the cron jobs; the others stand by for failover
+_settings = get_settings()
+scheduler_elector = LeaderElector(
+    on_elected=_run_as_leader,
+    on_demoted=_pause_as_follower,
+    lock_file=_settings.scheduler_lock_file or DEFAULT_LOCK_FILE,
+    lease_seconds=_settings.scheduler_lease_seconds,
+)
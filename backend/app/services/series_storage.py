@@ -0,0 +1,101 @@
+"""Compact binary storage and retrieval helpers for daily time series
+
+Series are stored as two little-endian typed arrays: int32 day numbers
+(days since 1970-01-01) and float64 values. A 5-year daily equity curve
+takes about 15 KB instead of ~1,250 JSON dicts, and decoding is a single
+``np.frombuffer`` call.
+"""
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+DATE_DTYPE = '<i4'
+VALUE_DTYPE = '<f8'
+
+
+def encode_dates(dates) -> bytes:
+    """Encode datetimes/dates as int32 day numbers"""
+    days = np.array(
+        [d.date() if isinstance(d, datetime) else d for d in dates],
+        dtype='datetime64[D]'
+    )
+    return days.astype(DATE_DTYPE).tobytes()
+
+
+def encode_values(values) -> bytes:
+    """Encode values as float64"""
+    return np.asarray(values, dtype=VALUE_DTYPE).tobytes()
+
+
+def decode_series(date_blob: bytes, value_blob: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """Decode stored blobs into (datetime64[D] dates, float64 values)"""
+    days = np.frombuffer(date_blob, dtype=DATE_DTYPE).astype('datetime64[D]')
+    values = np.frombuffer(value_blob, dtype=VALUE_DTYPE)
+    return days, values
+
+
+def series_from_points(points: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """Legacy JSON [{'date': iso, 'value': v}] points as typed arrays"""
+    days = np.array([p['date'][:10] for p in points], dtype='datetime64[D]')
+    values = np.array([p['value'] for p in points], dtype=np.float64)
+    return days, values
+
+
+def slice_range(
+    days: np.ndarray,
+    values: np.ndarray,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Inclusive date-range slice via binary search on the sorted dates"""
+    lo = np.searchsorted(days, np.datetime64(start_date, 'D'), side='left') if start_date else 0
+    hi = np.searchsorted(days, np.datetime64(end_date, 'D'), side='right') if end_date else len(days)
+    return days[lo:hi], values[lo:hi]
+
+
+def lttb_indices(values: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling
+
+    Keeps the first and last points and, per bucket, the point forming the
+    largest triangle with the previously kept point and the next bucket's
+    average, which preserves peaks and troughs for charting.
+
+    Returns:
+        Sorted indices of the points to keep
+    """
+    n = len(values)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    x = np.arange(n, dtype=np.float64)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for b in range(max_points - 2):
+        start, end = edges[b], edges[b + 1]
+        next_start = end
+        next_end = edges[b + 2] if b + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = values[next_start:next_end].mean()
+
+        # Twice the triangle area for every candidate in the bucket at once
+        area = np.abs(
+            (x[previous] - avg_x) * (values[start:end] - values[previous])
+            - (x[previous] - x[start:end]) * (avg_y - values[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[b + 1] = previous
+
+    return selected
+
+
+def series_to_points(days: np.ndarray, values: np.ndarray) -> List[Dict]:
+    """Typed arrays as [{'date': 'YYYY-MM-DD', 'value': v}] for JSON responses"""
+    return [
+        {'date': d, 'value': v}
+        for d, v in zip(np.datetime_as_string(days, unit='D').tolist(), values.tolist())
+    ]
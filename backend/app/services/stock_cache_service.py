@@ -1,6 +1,7 @@
 """Stock data caching service for performance optimization"""
 import yfinance as yf
-from typing import Dict, Optional, Tuple
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
 from datetime import date, datetime, timedelta
 from sqlalchemy.orm import Session
 from app.models.stock_price_cache import StockPriceCache, StockMetadata
@@ -94,39 +95,17 @@ class StockCacheService:
 
         # Fetch from API
         try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
-
-            sector = info.get("sector", "Unknown")
-            industry = info.get("industry", "Unknown")
-            country = info.get("country", "Unknown")
-
-            # Handle Korean stocks
-            if ticker.endswith(".KS") or ticker.endswith(".KQ"):
-                country = "South Korea"
-
-            dividend_rate = info.get("dividendRate", 0)
-            dividend_yield = info.get("dividendYield", 0)
+            fields = StockCacheService._fetch_metadata_fields(ticker)
 
             # Update or create metadata
             metadata = db.query(StockMetadata).filter(StockMetadata.ticker == ticker).first()
 
             if metadata:
-                metadata.sector = sector
-                metadata.industry = industry
-                metadata.country = country
-                metadata.dividend_rate = dividend_rate
-                metadata.dividend_yield = dividend_yield
+                for key, value in fields.items():
+                    setattr(metadata, key, value)
                 metadata.last_updated = datetime.now()
             else:
-                metadata = StockMetadata(
-                    ticker=ticker,
-                    sector=sector,
-                    industry=industry,
-                    country=country,
-                    dividend_rate=dividend_rate,
-                    dividend_yield=dividend_yield,
-                )
+                metadata = StockMetadata(ticker=ticker, **fields)
                 db.add(metadata)
 
             db.commit()
@@ -138,24 +117,175 @@ class StockCacheService:
             return None
 
     @staticmethod
-    def batch_refresh_prices(db: Session, tickers: list[str]) -> Dict[str, Tuple[float, float]]:
+    def _fetch_metadata_fields(ticker: str) -> Dict:
+        """Fetch sector/country/dividend fields from the provider"""
+        info = yf.Ticker(ticker).info
+
+        country = info.get("country", "Unknown")
+
+        # Handle Korean stocks
+        if ticker.endswith(".KS") or ticker.endswith(".KQ"):
+            country = "South Korea"
+
+        return {
+            "sector": info.get("sector", "Unknown"),
+            "industry": info.get("industry", "Unknown"),
+            "country": country,
+            "dividend_rate": info.get("dividendRate", 0),
+            "dividend_yield": info.get("dividendYield", 0),
+        }
+
+    @staticmethod
+    def get_stock_prices(
+        db: Session, tickers: List[str], force_refresh: bool = False
+    ) -> Dict[str, Tuple[float, float]]:
         """
-        Batch refresh prices for multiple tickers
-        Returns: Dict of ticker -> (current_price, previous_close)
+        Get prices for many tickers with one cache query and one batched download
+        Returns: Dict of ticker -> (current_price, previous_close), (0.0, 0.0) if unavailable
         """
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            return {}
+
+        today = date.today()
+        cached_rows = {
+            row.ticker: row
+            for row in db.query(StockPriceCache).filter(
+                StockPriceCache.ticker.in_(tickers),
+                StockPriceCache.price_date == today,
+            ).all()
+        }
+
         results = {}
+        stale = []
         for ticker in tickers:
-            try:
-                current_price, previous_close = StockCacheService.get_stock_price(
-                    db, ticker, force_refresh=True
-                )
-                results[ticker] = (current_price, previous_close)
-            except Exception as e:
-                print(f"⚠️ Error refreshing {ticker}: {e}")
+            cached = cached_rows.get(ticker)
+            if cached and not force_refresh and cached.cached_at:
+                cache_age = datetime.now() - cached.cached_at.replace(tzinfo=None)
+                if cache_age < timedelta(hours=StockCacheService.PRICE_CACHE_HOURS):
+                    results[ticker] = (cached.current_price, cached.previous_close)
+                    continue
+            stale.append(ticker)
+
+        if not stale:
+            return results
+
+        fetched = StockCacheService._download_prices(stale)
+        for ticker in stale:
+            if ticker not in fetched:
                 results[ticker] = (0.0, 0.0)
+                continue
+
+            current_price, previous_close = fetched[ticker]
+            cached = cached_rows.get(ticker)
+            if cached:
+                cached.current_price = current_price
+                cached.previous_close = previous_close
+                cached.cached_at = datetime.now()
+            else:
+                db.add(StockPriceCache(
+                    ticker=ticker,
+                    current_price=current_price,
+                    previous_close=previous_close,
+                    price_date=today,
+                ))
+            results[ticker] = (current_price, previous_close)
 
+        # One commit for the whole batch
+        db.commit()
         return results
 
+    @staticmethod
+    def _download_prices(tickers: List[str]) -> Dict[str, Tuple[float, float]]:
+        """
+        Latest and previous close for many tickers in a single provider request
+        Returns: Dict of ticker -> (current_price, previous_close) for tickers with data
+        """
+        try:
+            raw = yf.download(
+                tickers, period="5d", interval="1d",
+                auto_adjust=False, progress=False, group_by="column"
+            )
+        except Exception as e:
+            print(f"⚠️ Error downloading prices for {len(tickers)} tickers: {e}")
+            return {}
+
+        if raw is None or raw.empty:
+            return {}
+
+        closes = raw["Close"]
+        if isinstance(closes, pd.Series):
+            closes = closes.to_frame(tickers[0])
+
+        prices = {}
+        for ticker in tickers:
+            if ticker not in closes.columns:
+                continue
+            series = closes[ticker].dropna()
+            if series.empty:
+                continue
+            current_price = float(series.iloc[-1])
+            previous_close = float(series.iloc[-2]) if len(series) > 1 else current_price
+            prices[ticker] = (current_price, previous_close)
+        return prices
+
+    @staticmethod
+    def get_stocks_metadata(
+        db: Session, tickers: List[str], force_refresh: bool = False
+    ) -> Dict[str, StockMetadata]:
+        """
+        Get metadata for many tickers with one cache query
+        Only missing or expired tickers are fetched, and all updates share one commit.
+        Returns: Dict of ticker -> StockMetadata (tickers that could not be fetched are omitted)
+        """
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            return {}
+
+        query = db.query(StockMetadata).filter(StockMetadata.ticker.in_(tickers))
+        cached = {row.ticker: row for row in query.all()}
+
+        stale = []
+        for ticker in tickers:
+            metadata = cached.get(ticker)
+            if metadata and not force_refresh and metadata.last_updated:
+                cache_age = datetime.now() - metadata.last_updated.replace(tzinfo=None)
+                if cache_age < timedelta(days=StockCacheService.METADATA_CACHE_DAYS):
+                    continue
+            stale.append(ticker)
+
+        if not stale:
+            return cached
+
+        # The provider has no batch profile endpoint; with a 30 day TTL misses are rare
+        for ticker in stale:
+            try:
+                fields = StockCacheService._fetch_metadata_fields(ticker)
+            except Exception as e:
+                print(f"⚠️ Error fetching metadata for {ticker}: {e}")
+                continue
+
+            metadata = cached.get(ticker)
+            if metadata:
+                for key, value in fields.items():
+                    setattr(metadata, key, value)
+                metadata.last_updated = datetime.now()
+            else:
+                db.add(StockMetadata(ticker=ticker, **fields))
+
+        db.commit()
+
+        # Reload every row in one query instead of refreshing them one by one
+        return {row.ticker: row for row in query.all()}
+
+    @staticmethod
+    def batch_refresh_prices(db: Session, tickers: list[str]) -> Dict[str, Tuple[float, float]]:
+        """
+        Batch refresh prices for multiple tickers
+        Returns: Dict of ticker -> (current_price, previous_close)
+        """
+        return StockCacheService.get_stock_prices(db, tickers, force_refresh=True)
+
     @staticmethod
     def cleanup_old_cache(db: Session, days: int = 7) -> int:
         """
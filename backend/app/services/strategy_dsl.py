@@ -0,0 +1,335 @@
+"""Safe expression language for user-defined backtest signals
+
+Strategies of type ``EXPRESSION`` describe their signals as expressions
+over the price panel, e.g.::
+
+    {"entry": "sma(close, 20) > sma(close, 50) and rsi(close, 14) < 70",
+     "exit": "crosses_below(close, sma(close, 20))"}
+
+Expressions are parsed with ``ast`` against a whitelist (no attribute
+access, subscripts, lambdas or arbitrary calls) and compiled once into a
+tree of closures over NumPy arrays, so evaluating one is a handful of
+vectorized operations. Names that are neither panel series nor functions
+are strategy parameters, which makes expressions sweepable:
+``sma(close, fast) > sma(close, slow)`` with a grid over fast/slow.
+"""
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, Optional
+import ast
+import operator
+
+import numpy as np
+import pandas as pd
+
+from app.services.backtest_core import positions_from_signals
+
+# Guard rails for user-supplied expressions
+MAX_EXPRESSION_LENGTH = 500
+MAX_EXPRESSION_NODES = 200
+MAX_WINDOW = 1000
+
+# Panel arrays an expression may reference
+SERIES_NAMES = ('open', 'high', 'low', 'close', 'volume', 'direction', 'confidence')
+
+# Series derived from model predictions rather than prices
+SIGNAL_SERIES = frozenset({'direction', 'confidence'})
+
+
+class StrategyExpressionError(ValueError):
+    """Invalid or unsafe strategy expression"""
+
+
+def _window(value) -> int:
+    window = int(value)
+    if not 1 <= window <= MAX_WINDOW:
+        raise StrategyExpressionError(f"Window must be between 1 and {MAX_WINDOW}, got {window}")
+    return window
+
+
+def _series(values) -> pd.Series:
+    return pd.Series(np.asarray(values, dtype=np.float64))
+
+
+def _sma(x, n):
+    return _series(x).rolling(_window(n)).mean().to_numpy()
+
+
+def _ema(x, n):
+    return _series(x).ewm(span=_window(n), adjust=False, min_periods=_window(n)).mean().to_numpy()
+
+
+def _wilder_average(values: np.ndarray, n: int) -> np.ndarray:
+    """Wilder smoothing seeded with the simple mean of the first n values"""
+    out = np.full(len(values) + 1, np.nan)
+    if len(values) < n:
+        return out
+    seeded = np.concatenate(([values[:n].mean()], values[n:]))
+    out[n:] = pd.Series(seeded).ewm(alpha=1 / n, adjust=False).mean().to_numpy()
+    return out
+
+
+def _rsi(x, n=14):
+    """Wilder's RSI"""
+    n = _window(n)
+    delta = np.diff(np.asarray(x, dtype=np.float64))
+    gain = _wilder_average(np.maximum(delta, 0), n)
+    loss = _wilder_average(np.maximum(-delta, 0), n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - 100 / (1 + gain / loss)
+    return np.where((loss == 0) & ~np.isnan(gain), 100.0, rsi)
+
+
+def _stdev(x, n):
+    return _series(x).rolling(_window(n)).std(ddof=0).to_numpy()
+
+
+def _highest(x, n):
+    return _series(x).rolling(_window(n)).max().to_numpy()
+
+
+def _lowest(x, n):
+    return _series(x).rolling(_window(n)).min().to_numpy()
+
+
+def _shift(x, n=1):
+    return _series(x).shift(_window(n)).to_numpy()
+
+
+def _roc(x, n=1):
+    """Rate of change over n bars in %"""
+    return (_series(x).pct_change(_window(n), fill_method=None) * 100).to_numpy()
+
+
+def _crossing_operands(a, b):
+    """Broadcast both sides; two scalars become one bar that can never cross"""
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64))
+    return np.atleast_1d(a), np.atleast_1d(b)
+
+
+def _crosses_above(a, b):
+    a, b = _crossing_operands(a, b)
+    prev = np.concatenate(([False], a[:-1] <= b[:-1]))
+    return (a > b) & prev
+
+
+def _crosses_below(a, b):
+    a, b = _crossing_operands(a, b)
+    prev = np.concatenate(([False], a[:-1] >= b[:-1]))
+    return (a < b) & prev
+
+
+FUNCTIONS: Dict[str, Callable] = {
+    'sma': _sma,
+    'ema': _ema,
+    'rsi': _rsi,
+    'stdev': _stdev,
+    'highest': _highest,
+    'lowest': _lowest,
+    'shift': _shift,
+    'roc': _roc,
+    'crosses_above': _crosses_above,
+    'crosses_below': _crosses_below,
+    'abs': np.abs,
+    'min': np.minimum,
+    'max': np.maximum,
+}
+
+_BINARY_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+}
+
+_COMPARE_OPS = {
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+
+# Evaluated node: (panel, params) -> array or scalar
+Node = Callable[[Dict[str, np.ndarray], Dict], object]
+
+
+class CompiledExpression:
+    """A parsed expression ready to evaluate against price panels"""
+
+    def __init__(self, source: str, root: Node, parameters: FrozenSet[str], series: FrozenSet[str] = frozenset()):
+        self.source = source
+        self.parameters = parameters
+        self.series = series
+        self._root = root
+
+    def evaluate(self, panel: Dict[str, np.ndarray], params: Optional[Dict] = None) -> np.ndarray:
+        """Evaluate as a boolean array over the panel; NaN comparisons are False"""
+        params = params or {}
+        missing = self.parameters - set(params)
+        if missing:
+            raise StrategyExpressionError(f"Missing parameters for expression: {sorted(missing)}")
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = self._root(panel, params)
+        return np.broadcast_to(np.asarray(result, dtype=bool), (len(panel['close']),))
+
+
+class _Compiler:
+    """Translate a whitelisted AST into closures"""
+
+    def __init__(self):
+        self.parameters = set()
+        self.series = set()
+
+    def compile(self, node: ast.AST) -> Node:
+        method = getattr(self, f"_{type(node).__name__}", None)
+        if method is None:
+            raise StrategyExpressionError(f"Unsupported syntax: {type(node).__name__}")
+        return method(node)
+
+    def _Expression(self, node):
+        return self.compile(node.body)
+
+    def _Constant(self, node):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise StrategyExpressionError(f"Only numeric constants are allowed, got {node.value!r}")
+        value = node.value
+        return lambda panel, params: value
+
+    def _Name(self, node):
+        name = node.id
+        if name in SERIES_NAMES:
+            self.series.add(name)
+            return lambda panel, params: panel[name]
+        if name in FUNCTIONS:
+            raise StrategyExpressionError(f"Function '{name}' must be called")
+        self.parameters.add(name)
+        return lambda panel, params: params[name]
+
+    def _BoolOp(self, node):
+        values = [self.compile(v) for v in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+
+        def evaluate(panel, params):
+            result = np.asarray(values[0](panel, params), dtype=bool)
+            for value in values[1:]:
+                result = combine(result, np.asarray(value(panel, params), dtype=bool))
+            return result
+        return evaluate
+
+    def _UnaryOp(self, node):
+        operand = self.compile(node.operand)
+        if isinstance(node.op, ast.Not):
+            return lambda panel, params: np.logical_not(operand(panel, params))
+        if isinstance(node.op, ast.USub):
+            return lambda panel, params: -np.asarray(operand(panel, params), dtype=np.float64)
+        if isinstance(node.op, ast.UAdd):
+            return operand
+        raise StrategyExpressionError(f"Unsupported operator: {type(node.op).__name__}")
+
+    def _BinOp(self, node):
+        op = _BINARY_OPS.get(type(node.op))
+        if op is None:
+            raise StrategyExpressionError(f"Unsupported operator: {type(node.op).__name__}")
+        left, right = self.compile(node.left), self.compile(node.right)
+        return lambda panel, params: op(
+            np.asarray(left(panel, params), dtype=np.float64),
+            np.asarray(right(panel, params), dtype=np.float64),
+        )
+
+    def _Compare(self, node):
+        operands = [self.compile(node.left)] + [self.compile(c) for c in node.comparators]
+        ops = []
+        for op in node.ops:
+            if type(op) not in _COMPARE_OPS:
+                raise StrategyExpressionError(f"Unsupported comparison: {type(op).__name__}")
+            ops.append(_COMPARE_OPS[type(op)])
+
+        def evaluate(panel, params):
+            # Chained comparisons: a < b < c means a < b and b < c
+            values = [np.asarray(o(panel, params), dtype=np.float64) for o in operands]
+            result = ops[0](values[0], values[1])
+            for i, op in enumerate(ops[1:], start=1):
+                result = result & op(values[i], values[i + 1])
+            return result
+        return evaluate
+
+    def _Call(self, node):
+        if not isinstance(node.func, ast.Name):
+            raise StrategyExpressionError("Only named functions can be called")
+        if node.func.id not in FUNCTIONS:
+            raise StrategyExpressionError(
+                f"Unknown function '{node.func.id}'. Available: {sorted(FUNCTIONS)}"
+            )
+        if node.keywords:
+            raise StrategyExpressionError("Keyword arguments are not supported")
+
+        function = FUNCTIONS[node.func.id]
+        args = [self.compile(a) for a in node.args]
+
+        def evaluate(panel, params):
+            try:
+                return function(*[a(panel, params) for a in args])
+            except TypeError as e:
+                raise StrategyExpressionError(f"{node.func.id}(): {e}")
+        return evaluate
+
+
+@lru_cache(maxsize=256)
+def compile_expression(source: str) -> CompiledExpression:
+    """Parse and compile an expression (cached by source text)"""
+    if not source or not source.strip():
+        raise StrategyExpressionError("Expression is empty")
+    if len(source) > MAX_EXPRESSION_LENGTH:
+        raise StrategyExpressionError(f"Expression longer than {MAX_EXPRESSION_LENGTH} characters")
+
+    try:
+        tree = ast.parse(source.strip(), mode='eval')
+    except SyntaxError as e:
+        raise StrategyExpressionError(f"Invalid expression syntax: {e.msg}")
+
+    if sum(1 for _ in ast.walk(tree)) > MAX_EXPRESSION_NODES:
+        raise StrategyExpressionError("Expression is too complex")
+
+    compiler = _Compiler()
+    root = compiler.compile(tree)
+    return CompiledExpression(source, root, frozenset(compiler.parameters), frozenset(compiler.series))
+
+
+def expression_uses_signals(params: Optional[Dict]) -> bool:
+    """True if the entry/exit expressions read prediction series (direction, confidence)"""
+    for key in ('entry', 'exit'):
+        source = (params or {}).get(key)
+        if source and compile_expression(source).series & SIGNAL_SERIES:
+            return True
+    return False
+
+
+def validate_expression_parameters(params: Dict) -> None:
+    """Check an EXPRESSION strategy's parameters compile (raises on error)"""
+    if not params or 'entry' not in params:
+        raise StrategyExpressionError("EXPRESSION strategies need an 'entry' expression")
+
+    for key in ('entry', 'exit'):
+        if params.get(key) is None:
+            continue
+        expression = compile_expression(params[key])
+        missing = expression.parameters - set(params)
+        if missing:
+            raise StrategyExpressionError(f"Missing parameters for '{key}': {sorted(missing)}")
+
+
+def expression_positions(panel: Dict[str, np.ndarray], params: Dict) -> np.ndarray:
+    """
+    Position state for an EXPRESSION strategy
+
+    Without an exit expression the strategy is long exactly while ``entry``
+    holds; with one, ``entry`` opens and ``exit`` closes the position.
+    """
+    entries = compile_expression(params['entry']).evaluate(panel, params)
+    if params.get('exit') is None:
+        return entries.copy()
+
+    exits = compile_expression(params['exit']).evaluate(panel, params)
+    return positions_from_signals(entries, exits)
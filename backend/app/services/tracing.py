@@ -0,0 +1,296 @@
+"""Lightweight request tracing with a slow-request JSON exporter
+
+Every HTTP request opens a root span; DB queries, provider calls, model
+loads, inference and serialization open child spans. The current span is
+kept in a ContextVar, so it follows awaits and tasks, is copied into
+Starlette's threadpool for sync handlers, and is handed to our own worker
+pools through propagate(). When a request finishes, its trace is written
+only if it took longer than the slow threshold; fast traces are dropped.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Requests slower than this keep their full trace (in milliseconds)
+SLOW_REQUEST_MS = 1000
+
+# Spans kept per trace; a request running thousands of queries keeps the first ones
+MAX_SPANS_PER_TRACE = 500
+
+# SQL text kept on db.query spans (in characters)
+MAX_STATEMENT_LENGTH = 300
+
+DEFAULT_EXPORT_PATH = "logs/slow_traces.jsonl"
+
+
+class Trace:
+    """Spans of one request, finished spans appended from any thread"""
+
+    def __init__(self, name: str):
+        self.trace_id = secrets.token_hex(16)
+        self.name = name
+        self.started_at = datetime.utcnow()
+        self.start = time.perf_counter()
+        self.spans: List[Dict] = []
+        self.dropped = 0
+        self._lock = Lock()
+
+    def record(self, span: "Span"):
+        with self._lock:
+            if len(self.spans) >= MAX_SPANS_PER_TRACE:
+                self.dropped += 1
+                return
+            self.spans.append(span.to_dict(self.start))
+
+    def to_dict(self, duration_ms: float, attributes: Dict[str, Any]) -> Dict:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s["start_ms"])
+            return {
+                "trace_id": self.trace_id,
+                "name": self.name,
+                "started_at": self.started_at.isoformat(),
+                "duration_ms": round(duration_ms, 3),
+                "attributes": attributes,
+                "spans": spans,
+                "dropped_spans": self.dropped,
+            }
+
+
+class Span:
+    """One timed operation inside a trace"""
+
+    __slots__ = ("trace", "name", "span_id", "parent_id", "attributes", "start", "duration", "error", "thread")
+
+    def __init__(self, trace: Trace, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+        self.thread = threading.current_thread().name
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.start
+        self.trace.record(self)
+
+    def to_dict(self, trace_start: float) -> Dict:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ms": round((self.start - trace_start) * 1000, 3),
+            "duration_ms": round((self.duration or 0) * 1000, 3),
+            "thread": self.thread,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Child span of the current span for the with-block
+
+    Outside a traced request this is a no-op yielding None, so scheduler
+    jobs and scripts pay only a ContextVar lookup.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    child = Span(parent.trace, name, parent.span_id, attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        child.finish()
+
+
+def traced(name: str) -> Callable:
+    """Decorator running the function inside span(name)"""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def propagate(func: Callable) -> Callable:
+    """
+    Bind ``func`` to the current span for running on a worker thread
+
+    loop.run_in_executor and ThreadPoolExecutor do not copy context
+    variables, so spans opened on the worker would otherwise be lost.
+    The wrapper may run on several threads at once.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return func
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _current_span.set(parent)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current_span.reset(token)
+    return wrapper
+
+
+def instrument_engine(engine):
+    """Open a db.query span around every statement executed on ``engine``"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        parent = _current_span.get()
+        if parent is None:
+            return
+        query_span = Span(parent.trace, "db.query", parent.span_id, {
+            "statement": statement[:MAX_STATEMENT_LENGTH],
+        })
+        conn.info.setdefault("trace_spans", []).append(query_span)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get("trace_spans")
+        if spans:
+            query_span = spans.pop()
+            query_span.set_attribute("rows", cursor.rowcount)
+            query_span.finish()
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        spans = context.connection.info.get("trace_spans") if context.connection is not None else None
+        if spans:
+            query_span = spans.pop()
+            query_span.error = f"{type(context.original_exception).__name__}: {context.original_exception}"
+            query_span.finish()
+
+
+class JsonFileExporter:
+    """Appends one JSON document per trace to a local file (JSON Lines)"""
+
+    def __init__(self, path: str = DEFAULT_EXPORT_PATH):
+        self.path = path
+        self._lock = Lock()
+
+    def export(self, trace: Dict):
+        line = json.dumps(trace, default=str, separators=(",", ":"))
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class SlowRequestSampler:
+    """Keeps a trace only if its request took at least ``threshold_ms``"""
+
+    def __init__(self, threshold_ms: float = SLOW_REQUEST_MS):
+        self.threshold_ms = threshold_ms
+
+    def should_export(self, duration_ms: float) -> bool:
+        return duration_ms >= self.threshold_ms
+
+
+def _is_event_stream(headers) -> bool:
+    """True if raw ASGI response headers declare a text/event-stream body"""
+    for name, value in headers:
+        if name.lower() == b"content-type":
+            return value.split(b";")[0].strip().lower() == b"text/event-stream"
+    return False
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware opening the root span of each HTTP request
+
+    The trace is exported off the event loop, and only when the sampler
+    keeps it; the response is never delayed by the exporter. Streaming
+    responses (text/event-stream) last as long as the client listens, so
+    their duration is not latency and they are never exported.
+    """
+
+    def __init__(self, app, exporter: Optional[JsonFileExporter] = None, sampler: Optional[SlowRequestSampler] = None):
+        self.app = app
+        self.exporter = exporter or JsonFileExporter()
+        self.sampler = sampler or SlowRequestSampler()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope.get("method", "GET")
+        trace = Trace(f"{method} {scope.get('path', '')}")
+        root = Span(trace, "http.request", None, {"http.method": method, "http.path": scope.get("path", "")})
+        status_code = 500
+        streaming = False
+
+        async def send_wrapper(message):
+            nonlocal status_code, streaming
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                streaming = _is_event_stream(message.get("headers", []))
+            await send(message)
+
+        token = _current_span.set(root)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            root.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            root.set_attribute("http.status_code", status_code)
+            route = getattr(scope.get("route"), "path", None)
+            if route:
+                root.set_attribute("http.route", route)
+                trace.name = f"{method} {route}"
+            root.finish()
+
+            duration_ms = root.duration * 1000
+            if not streaming and self.sampler.should_export(duration_ms):
+                payload = trace.to_dict(duration_ms, dict(root.attributes))
+                loop = asyncio.get_running_loop()
+                loop.run_in_executor(None, self._export, payload)
+
+    def _export(self, payload: Dict):
+        try:
+            self.exporter.export(payload)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to export trace {payload['trace_id']}: {e}")
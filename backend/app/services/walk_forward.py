@@ -0,0 +1,189 @@
+"""Walk-forward evaluation of trained prediction models"""
+from datetime import date, datetime
+from typing import Optional
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.model_signal import ModelSignal
+from app.services.data_fetcher import StockDataFetcher
+
+logger = logging.getLogger(__name__)
+
+# Same directory and naming convention as the prediction endpoints
+MODEL_DIR = "models"
+
+# History replayed per evaluation; signals start after the lookback window
+EVALUATION_PERIOD = "5y"
+
+# Same action thresholds as the live /predictions/{ticker} endpoint
+BUY_THRESHOLD_PCT = 2.0
+SELL_THRESHOLD_PCT = -2.0
+
+
+def model_path_for(ticker: str) -> str:
+    """Path of the trained model file for a ticker"""
+    return os.path.join(MODEL_DIR, f"{ticker.replace('.', '_')}_model.h5")
+
+
+def action_for_change(change_percent: np.ndarray) -> np.ndarray:
+    """Vectorized BUY/SELL/HOLD mapping of predicted change %"""
+    return np.where(
+        change_percent > BUY_THRESHOLD_PCT, "BUY",
+        np.where(change_percent < SELL_THRESHOLD_PCT, "SELL", "HOLD")
+    )
+
+
+class WalkForwardEvaluator:
+    """Replay a trained model over every historical window in one batch
+
+    For each trading day the model sees only the preceding lookback window,
+    exactly like a live prediction made that day. All windows are stacked
+    into a single inference call and the resulting per-date signal series is
+    stored in ``model_signals`` keyed by model version, so strategies and
+    accuracy reports reuse it until the model is retrained.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def model_version(self, ticker: str) -> Optional[datetime]:
+        """Model file mtime, or None if no model is trained"""
+        path = model_path_for(ticker)
+        if not os.path.exists(path):
+            return None
+        return datetime.fromtimestamp(int(os.path.getmtime(path)))
+
+    def get_signals(
+        self,
+        ticker: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        refresh: bool = True,
+    ) -> pd.DataFrame:
+        """
+        Per-date signal series for a ticker
+
+        Args:
+            refresh: replay the model if stored signals are missing or stale;
+                when False only already-stored signals are returned
+
+        Returns:
+            DataFrame indexed by signal_date with current_price,
+            predicted_price, predicted_change_percent, confidence, action
+            (empty if no model/signals)
+        """
+        version = self.model_version(ticker)
+        if version is None:
+            return self._load_signals(ticker, None, start_date, end_date)
+
+        if refresh and not self._has_fresh_signals(ticker, version):
+            self.evaluate(ticker, version)
+
+        return self._load_signals(ticker, version, start_date, end_date)
+
+    def evaluate(self, ticker: str, version: Optional[datetime] = None) -> int:
+        """
+        Replay the model over all historical windows and store the signals
+
+        Returns:
+            Number of signals stored
+        """
+        from app.ml.predictor import StockPredictor
+
+        version = version or self.model_version(ticker)
+        if version is None:
+            raise ValueError(f"No trained model found for {ticker}")
+
+        df = StockDataFetcher.fetch_yahoo_finance(ticker, period=EVALUATION_PERIOD)
+        predictor = StockPredictor(model_path=model_path_for(ticker))
+        lookback = predictor.lookback_days
+
+        if df is None or len(df) < lookback:
+            raise ValueError(f"Need at least {lookback} days of data for {ticker}")
+
+        close = df['close'].to_numpy(dtype=np.float64)
+        signal_dates = pd.to_datetime(df['date']).dt.date.to_numpy()[lookback - 1:]
+
+        # Stack every lookback window into one (windows, lookback, 1) batch
+        scaled = predictor.scaler.transform(close.reshape(-1, 1))[:, 0]
+        windows = np.lib.stride_tricks.sliding_window_view(scaled, lookback)
+        X = windows.reshape(len(windows), lookback, 1)
+
+        predicted_scaled = predictor.model.predict(X, batch_size=512, verbose=0)
+        predicted = predictor.scaler.inverse_transform(predicted_scaled)[:, 0]
+
+        current = close[lookback - 1:]
+        change_percent = ((predicted - current) / current) * 100
+        confidence = np.maximum(0.5, 1.0 - np.abs(change_percent) / 10)
+        actions = action_for_change(change_percent)
+
+        # Replace this ticker's signals wholesale: stale versions are useless
+        self.db.query(ModelSignal).filter(ModelSignal.ticker == ticker).delete()
+        self.db.bulk_insert_mappings(ModelSignal, [
+            {
+                'ticker': ticker,
+                'signal_date': signal_dates[i],
+                'model_version': version,
+                'current_price': float(current[i]),
+                'predicted_price': float(predicted[i]),
+                'predicted_change_percent': float(change_percent[i]),
+                'confidence': float(confidence[i]),
+                'action': str(actions[i]),
+                'forecast_days': predictor.forecast_days,
+            }
+            for i in range(len(current))
+        ])
+        self.db.commit()
+
+        logger.info(f"✅ Walk-forward signals stored for {ticker}: {len(current)} days")
+        return len(current)
+
+    def _has_fresh_signals(self, ticker: str, version: datetime) -> bool:
+        """Signals exist for the current model version and are up to date"""
+        latest = self.db.query(func.max(ModelSignal.signal_date)).filter(
+            ModelSignal.ticker == ticker,
+            ModelSignal.model_version == version
+        ).scalar()
+
+        if latest is None:
+            return False
+
+        # Allow weekends/holidays before replaying again
+        return (date.today() - latest).days <= 3
+
+    def _load_signals(
+        self,
+        ticker: str,
+        version: Optional[datetime],
+        start_date: Optional[date],
+        end_date: Optional[date],
+    ) -> pd.DataFrame:
+        """Read stored signals as a date-indexed frame"""
+        query = self.db.query(
+            ModelSignal.signal_date,
+            ModelSignal.current_price,
+            ModelSignal.predicted_price,
+            ModelSignal.predicted_change_percent,
+            ModelSignal.confidence,
+            ModelSignal.action,
+            ModelSignal.forecast_days,
+        ).filter(ModelSignal.ticker == ticker)
+
+        if version is not None:
+            query = query.filter(ModelSignal.model_version == version)
+        if start_date:
+            query = query.filter(ModelSignal.signal_date >= start_date)
+        if end_date:
+            query = query.filter(ModelSignal.signal_date <= end_date)
+
+        rows = query.order_by(ModelSignal.signal_date).all()
+        columns = [
+            'signal_date', 'current_price', 'predicted_price',
+            'predicted_change_percent', 'confidence', 'action', 'forecast_days'
+        ]
+        return pd.DataFrame(rows, columns=columns).set_index('signal_date')
@@ -0,0 +1,94 @@
+"""Check that a slow insights request does not stall other requests
+
+Runs the app in-process, slows every returns history download down, fires
+GET /api/v1/portfolios/{id}/insights and keeps polling /health while it is
+in flight. With the analytics services offloading their blocking work to
+the worker pool, /health keeps answering immediately.
+
+Usage: python scripts/check_analytics_concurrency.py [portfolio_id]
+"""
+import sys
+import os
+import asyncio
+import time
+
+# Add backend directory to path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import httpx
+
+from app.main import app
+from app.database import SessionLocal
+from app.models.holding import Holding
+from app.services.returns_cache import returns_matrix_cache
+
+# Simulated provider latency per history download (in seconds)
+SLOW_DOWNLOAD_SECONDS = 3.0
+
+# /health must answer within this while insights is running (in seconds)
+MAX_HEALTH_LATENCY = 0.25
+
+
+def slow_down_downloads():
+    """Make every returns history download take SLOW_DOWNLOAD_SECONDS longer"""
+    load = returns_matrix_cache._load
+
+    def slow_load(tickers):
+        time.sleep(SLOW_DOWNLOAD_SECONDS)
+        return load(tickers)
+
+    returns_matrix_cache._load = slow_load
+    returns_matrix_cache.invalidate()
+
+
+async def check(portfolio_id: int) -> bool:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=120) as client:
+        started = time.perf_counter()
+        insights = asyncio.create_task(
+            client.get(f"/api/v1/portfolios/{portfolio_id}/insights")
+        )
+        await asyncio.sleep(0.1)
+
+        latencies = []
+        while not insights.done():
+            request_started = time.perf_counter()
+            response = await client.get("/health")
+            latencies.append(time.perf_counter() - request_started)
+            assert response.status_code == 200
+            await asyncio.sleep(0.05)
+
+        response = await insights
+        elapsed = time.perf_counter() - started
+
+    print(f"insights: HTTP {response.status_code} in {elapsed:.2f}s")
+    if not latencies:
+        print("❌ insights finished before /health could be polled")
+        return False
+
+    worst = max(latencies)
+    print(f"/health: {len(latencies)} requests while insights ran, worst {worst * 1000:.0f}ms")
+    return worst < MAX_HEALTH_LATENCY
+
+
+if __name__ == "__main__":
+    print("🧪 Checking analytics event-loop concurrency...")
+    print("=" * 60)
+
+    if len(sys.argv) > 1:
+        portfolio_id = int(sys.argv[1])
+    else:
+        db = SessionLocal()
+        holding = db.query(Holding).first()
+        db.close()
+        if holding is None:
+            print("❌ No portfolio with holdings found; pass a portfolio id")
+            sys.exit(1)
+        portfolio_id = holding.portfolio_id
+
+    slow_down_downloads()
+    if asyncio.run(check(portfolio_id)):
+        print(f"\n✅ /health stayed under {MAX_HEALTH_LATENCY * 1000:.0f}ms during a slow insights call")
+    else:
+        print(f"\n❌ /health was stalled by the insights call")
+        sys.exit(1)
@@ -4,7 +4,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from app.database import engine, Base
-from app.models.backtest import BacktestStrategy, BacktestRun, Trade
+from app.models.backtest import BacktestStrategy, BacktestRun, Trade, BacktestSweep
 
 if __name__ == "__main__":
     print("Creating backtesting tables...")
@@ -13,7 +13,8 @@ if __name__ == "__main__":
     Base.metadata.create_all(bind=engine, tables=[
         BacktestStrategy.__table__,
         BacktestRun.__table__,
-        Trade.__table__
+        Trade.__table__,
+        BacktestSweep.__table__
     ])
 
     print("✅ Backtesting tables created successfully!")
@@ -0,0 +1,34 @@
+"""Create model signal table in database"""
+import sys
+sys.path.append('.')
+
+from app.database import engine, Base
+from app.models.model_signal import ModelSignal
+
+def create_model_signal_table():
+    """Create the model_signals table"""
+    print("🔧 Creating model_signals table...")
+
+    try:
+        ModelSignal.__table__.create(bind=engine, checkfirst=True)
+
+        print("✅ model_signals table created successfully!")
+        print("📊 Table schema:")
+        print("  - id (Primary Key)")
+        print("  - ticker (Indexed)")
+        print("  - signal_date (Indexed)")
+        print("  - model_version (model file mtime)")
+        print("  - current_price")
+        print("  - predicted_price")
+        print("  - predicted_change_percent")
+        print("  - confidence")
+        print("  - action (BUY/SELL/HOLD)")
+        print("  - forecast_days")
+        print("  - created_at")
+
+    except Exception as e:
+        print(f"❌ Error creating table: {e}")
+        raise
+
+if __name__ == "__main__":
+    create_model_signal_table()
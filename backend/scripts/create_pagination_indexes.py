@@ -0,0 +1,31 @@
+"""Create (created_at, id) indexes used by keyset pagination on list endpoints"""
+import sys
+sys.path.append('.')
+
+from app.database import engine, Base
+from app.models.daily_prediction import DailyPrediction
+from app.models.notification import Notification
+from app.models.backtest import BacktestRun
+from app.models.scheduler_log import SchedulerLog
+from app.models.education import EducationArticle
+
+def create_pagination_indexes():
+    """Create the keyset pagination indexes on existing tables"""
+    print("🔧 Creating pagination indexes...")
+
+    try:
+        for model in (DailyPrediction, Notification, BacktestRun, SchedulerLog, EducationArticle):
+            for index in model.__table__.indexes:
+                if index.name and index.name.endswith("_id") and len(index.columns) == 2:
+                    index.create(bind=engine, checkfirst=True)
+                    columns = ", ".join(column.name for column in index.columns)
+                    print(f"  ✅ {index.name} ON {model.__tablename__} ({columns})")
+
+        print("✅ Pagination indexes created successfully!")
+
+    except Exception as e:
+        print(f"❌ Error creating indexes: {e}")
+        raise
+
+if __name__ == "__main__":
+    create_pagination_indexes()
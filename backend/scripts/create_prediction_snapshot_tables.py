@@ -0,0 +1,41 @@
+"""Create prediction summary and sector analysis snapshot tables in database"""
+import sys
+sys.path.append('.')
+
+from app.database import engine, Base
+from app.models.prediction_snapshot import PredictionSnapshot, SectorSnapshot
+
+def create_prediction_snapshot_tables():
+    """Create the prediction_snapshots and sector_snapshots tables"""
+    print("🔧 Creating prediction snapshot tables...")
+
+    try:
+        PredictionSnapshot.__table__.create(bind=engine, checkfirst=True)
+        SectorSnapshot.__table__.create(bind=engine, checkfirst=True)
+
+        print("✅ prediction_snapshots table created successfully!")
+        print("📊 Table schema:")
+        print("  - id (Primary Key)")
+        print("  - ticker (Unique, Indexed)")
+        print("  - name, sector, market, market_cap")
+        print("  - action (Indexed: BUY, SELL, HOLD)")
+        print("  - confidence, change_percent, predicted_price, current_price")
+        print("  - computed_at (Indexed)")
+
+        print("✅ sector_snapshots table created successfully!")
+        print("📊 Table schema:")
+        print("  - id (Primary Key)")
+        print("  - sector (Unique, Indexed)")
+        print("  - total_stocks, buy_count, sell_count, hold_count, us_count, kr_count")
+        print("  - avg_change_percent")
+        print("  - momentum_score (Indexed)")
+        print("  - recommendation")
+        print("  - top_picks (JSON)")
+        print("  - computed_at (Indexed)")
+
+    except Exception as e:
+        print(f"❌ Error creating tables: {e}")
+        raise
+
+if __name__ == "__main__":
+    create_prediction_snapshot_tables()
@@ -0,0 +1,31 @@
+"""Create recommendation score table in database"""
+import sys
+sys.path.append('.')
+
+from app.database import engine, Base
+from app.models.sector import RecommendationScore
+
+def create_recommendation_score_table():
+    """Create the recommendation_scores table"""
+    print("🔧 Creating recommendation_scores table...")
+
+    try:
+        RecommendationScore.__table__.create(bind=engine, checkfirst=True)
+
+        print("✅ recommendation_scores table created successfully!")
+        print("📊 Table schema:")
+        print("  - id (Primary Key)")
+        print("  - ticker (Unique, Indexed)")
+        print("  - ai_prediction_score")
+        print("  - technical_score")
+        print("  - momentum_score")
+        print("  - base_score (Indexed, weighted sum without diversification)")
+        print("  - current_price")
+        print("  - computed_at (Indexed)")
+
+    except Exception as e:
+        print(f"❌ Error creating table: {e}")
+        raise
+
+if __name__ == "__main__":
+    create_recommendation_score_table()
@@ -0,0 +1,27 @@
+"""Create scheduler leader lock table in database"""
+import sys
+sys.path.append('.')
+
+from app.database import engine, Base
+from app.models.scheduler_lock import SchedulerLock
+
+def create_scheduler_lock_table():
+    """Create the scheduler_locks table"""
+    print("🔧 Creating scheduler lock table...")
+
+    try:
+        SchedulerLock.__table__.create(bind=engine, checkfirst=True)
+
+        print("✅ scheduler_locks table created successfully!")
+        print("📊 Table schema:")
+        print("  - name (Primary Key, e.g. 'scheduler')")
+        print("  - holder (host:pid:token of the leader)")
+        print("  - acquired_at, heartbeat_at")
+        print("  - expires_at (lease end, renewed by heartbeats)")
+
+    except Exception as e:
+        print(f"❌ Error creating table: {e}")
+        raise
+
+if __name__ == "__main__":
+    create_scheduler_lock_table()
@@ -0,0 +1,34 @@
+"""Add run ownership (worker_id, heartbeat_at) columns to backtest_runs"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import inspect, text, DateTime, String
+
+from app.database import engine
+
+
+def migrate_backtest_ownership():
+    """backtest_runs에 worker_id/heartbeat_at 컬럼 추가"""
+    columns = [col['name'] for col in inspect(engine).get_columns('backtest_runs')]
+    print(f"Current columns: {columns}")
+
+    new_columns = {
+        "worker_id": String(100).compile(dialect=engine.dialect),
+        "heartbeat_at": DateTime().compile(dialect=engine.dialect),
+    }
+    with engine.begin() as conn:
+        for col_name, col_type in new_columns.items():
+            if col_name not in columns:
+                print(f"Adding column: {col_name}")
+                conn.execute(text(f"ALTER TABLE backtest_runs ADD COLUMN {col_name} {col_type}"))
+                print(f"✅ Added {col_name}")
+            else:
+                print(f"⏭️  Column {col_name} already exists")
+
+    # Unfinished runs without an owner are failed by the next heartbeat of any API process
+    print("\n✅ Backtest run ownership migration complete")
+
+
+if __name__ == "__main__":
+    migrate_backtest_ownership()
@@ -0,0 +1,53 @@
+"""Add binary equity curve columns to backtest_runs and convert legacy JSON"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import json
+from sqlalchemy import inspect, text, LargeBinary
+
+from app.database import engine, SessionLocal
+from app.models.backtest import BacktestRun
+from app.services.series_storage import encode_values, series_from_points
+
+
+def migrate_backtest_series():
+    """backtest_runs에 equity_dates/equity_values 컬럼 추가 후 기존 JSON 변환"""
+    columns = [col['name'] for col in inspect(engine).get_columns('backtest_runs')]
+    print(f"Current columns: {columns}")
+
+    blob_type = LargeBinary().compile(dialect=engine.dialect)
+    with engine.begin() as conn:
+        for col_name in ("equity_dates", "equity_values"):
+            if col_name not in columns:
+                print(f"Adding column: {col_name}")
+                conn.execute(text(f"ALTER TABLE backtest_runs ADD COLUMN {col_name} {blob_type}"))
+                print(f"✅ Added {col_name}")
+            else:
+                print(f"⏭️  Column {col_name} already exists")
+
+    db = SessionLocal()
+    try:
+        runs = db.query(BacktestRun).filter(
+            BacktestRun.equity_values.is_(None),
+            BacktestRun.equity_curve.isnot(None)
+        ).all()
+
+        for run in runs:
+            days, values = series_from_points(json.loads(run.equity_curve))
+            run.equity_dates = days.astype('<i4').tobytes()
+            run.equity_values = encode_values(values)
+            run.equity_curve = None
+
+        db.commit()
+        print(f"\n✅ Converted {len(runs)} equity curves to binary storage")
+    except Exception as e:
+        print(f"❌ Migration error: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    migrate_backtest_series()
@@ -483,8 +483,29 @@ export const stockApi = {
 
   getQuote: (ticker: string) => api.get<StockQuote>(`/api/v1/stocks/${ticker}/quote`),
 
-  getHistory: (ticker: string, period: string = '1mo') =>
-    api.get(`/api/v1/stocks/${ticker}/history`, { params: { period } }),
+  getInfos: (tickers: string[]) =>
+    api.get<{ infos: Record<string, StockInfo>; missing: string[] }>(
+      '/api/v1/stocks/infos',
+      { params: { tickers: tickers.join(',') } }
+    ),
+
+  getQuotes: (tickers: string[]) =>
+    api.get<{ quotes: Record<string, StockQuote>; missing: string[] }>(
+      '/api/v1/stocks/quotes',
+      { params: { tickers: tickers.join(',') } }
+    ),
+
+  getHistory: (
+    ticker: string,
+    period: string = '1mo',
+    options?: {
+      start?: string
+      end?: string
+      interval?: '1d' | '1wk' | '1mo'
+      max_points?: number
+      format?: 'records' | 'columnar'
+    }
+  ) => api.get(`/api/v1/stocks/${ticker}/history`, { params: { period, ...options } }),
 
   getPrediction: (ticker: string) => predictionApi.getPrediction(ticker),
 
@@ -583,8 +604,19 @@ export interface ChatMessage {
 
 // Education API
 export const educationApi = {
-  getArticles: (params?: { level?: string; category?: string }) =>
-    api.get<EducationArticle[]>('/api/v1/education/articles', { params }),
+  // The endpoint is paged; follow X-Next-Cursor until every matching article is loaded
+  getArticles: async (params?: { level?: string; category?: string }) => {
+    const articles: EducationArticle[] = []
+    let cursor: string | undefined
+    do {
+      const res = await api.get<EducationArticle[]>('/api/v1/education/articles', {
+        params: { ...params, limit: 100, cursor },
+      })
+      articles.push(...res.data)
+      cursor = res.headers['x-next-cursor'] || undefined
+    } while (cursor)
+    return { data: articles }
+  },
 
   getArticle: (id: number) =>
     api.get<EducationArticle>(`/api/v1/education/articles/${id}`),
@@ -242,30 +242,35 @@ export const portfolioManager = {
    * Update current prices for all positions
    */
   updatePrices: async (positions: PortfolioPosition[]): Promise<PortfolioPosition[]> => {
-    const updatedPositions = await Promise.all(
-      positions.map(async (position) => {
-        try {
-          const response = await fetch(`http://localhost:8001/api/v1/stocks/${position.ticker}/quote`)
-          const data = await response.json()
-
-          const currentPrice = data.data?.current_price || position.currentPrice
-          const currentValue = position.shares * currentPrice
-          const profit = currentValue - position.totalCost
-          const profitPercent = (profit / position.totalCost) * 100
-
-          return {
-            ...position,
-            currentPrice,
-            currentValue,
-            profit,
-            profitPercent
-          }
-        } catch (error) {
-          console.error(`Failed to update price for ${position.ticker}:`, error)
-          return position
-        }
-      })
-    )
+    if (positions.length === 0) return positions
+
+    // One batched request for every position instead of one per row
+    let quotes: Record<string, { current_price: number }> = {}
+    try {
+      const tickers = Array.from(new Set(positions.map((position) => position.ticker)))
+      const response = await fetch(
+        `http://localhost:8001/api/v1/stocks/quotes?tickers=${encodeURIComponent(tickers.join(','))}`
+      )
+      const data = await response.json()
+      quotes = data.quotes || {}
+    } catch (error) {
+      console.error('Failed to update prices:', error)
+    }
+
+    const updatedPositions = positions.map((position) => {
+      const currentPrice = quotes[position.ticker]?.current_price || position.currentPrice
+      const currentValue = position.shares * currentPrice
+      const profit = currentValue - position.totalCost
+      const profitPercent = (profit / position.totalCost) * 100
+
+      return {
+        ...position,
+        currentPrice,
+        currentValue,
+        profit,
+        profitPercent
+      }
+    })
 
     return updatedPositions
   },